@@ -1,19 +1,26 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox, scrolledtext
-import xml.etree.ElementTree as ET
+from tkinter import filedialog, messagebox, scrolledtext, ttk
 import os
-import re
-import subprocess
-import tempfile
-import shutil
-import sys
-
-# Try to import tkinterdnd2 for drag and drop functionality
-try:
-    import tkinterdnd2 as tkdnd
-    DND_AVAILABLE = True
-except ImportError:
-    DND_AVAILABLE = False
+import sqlite3
+
+from foxsubp import batch, codec, lng, xmlstream
+from foxsubp.ffnt import check_translations, load_font_coverage
+from foxsubp.resultview import ResultView
+from foxsubp.incremental import count_effective_changes, iter_entry_texts
+from foxsubp.memory import TranslationMemory, collect_pairs, suggest_for_entries
+# The SUBP/XML pipeline lives in foxsubp.pipeline (importable without tkinter);
+# its functions are re-exported here for scripts written against Translator
+from foxsubp.pipeline import (STREAMING_MERGE_THRESHOLD, SUBP_TOOL_ENV, convert_xml_to_subp,
+                              convert_xml_to_subp_with_tool, create_temp_directory,
+                              decode_subp_file, extract_subp_to_xml,
+                              extract_subp_to_xml_with_tool, get_decode_cache,
+                              get_subp_tool_path, get_subp_tool_pool, load_subp_model,
+                              merge_translation_to_xml, parse_manual_translation,
+                              run_subp_tool, save_subp_model)
+from foxsubp.profiling import TRACE_PATH_ENV, get_recorder, profile_job, stage, write_chrome_trace
+from foxsubp.tasks import TaskCancelled, TaskRunner
+from foxsubp.translations import TranslationReport, load_translations
+from foxsubp.workspace import workspaces
 
 # ============================================================================
 # GLOBAL VARIABLES
@@ -21,6 +28,18 @@ except ImportError:
 xml_file_path = ""
 subp_file_path = ""
 temp_xml_path = ""
+subp_model = None
+# Language of the opened file (batch.resolve_language): its text encoding and memory scope
+file_language = None
+loaded_translations = {}
+loaded_translations_path = ""
+font_coverage = None
+current_workspace = None
+retired_workspaces = []
+open_request_number = 0
+task_runner = None
+task_poll_scheduled = False
+idle_status = "Siap"
 dark_mode = True
 
 # ============================================================================
@@ -85,190 +104,289 @@ def apply_theme():
     
     # Special label handling
     label_xml.configure(bg=theme["bg"], fg="gray")
+    label_translations.configure(bg=theme["bg"], fg="gray")
+    label_translations.master.configure(bg=theme["bg"])
+    label_font.configure(bg=theme["bg"], fg="gray")
     
     # Text boxes
     input_box.configure(bg=theme["entry_bg"], fg=theme["entry_fg"], insertbackground=theme["fg"])
-    result_box.configure(bg=theme["entry_bg"], fg=theme["entry_fg"], insertbackground=theme["fg"])
+    result_view.set_colors(theme["bg"], theme["fg"], theme["entry_bg"], theme["entry_fg"])
     
     # Buttons
     browse_btn.configure(bg=theme["button_bg"], fg=theme["button_fg"])
+    load_translations_btn.configure(bg=theme["button_bg"], fg=theme["button_fg"])
+    load_font_btn.configure(bg=theme["button_bg"], fg=theme["button_fg"])
+    cancel_btn.configure(bg=theme["button_bg"], fg=theme["button_fg"])
     dark_mode_btn.configure(text="Light Mode" if dark_mode else "Dark Mode")
 
 # ============================================================================
-# SUBP PROCESSING FUNCTIONS
+# BACKGROUND JOBS
 # ============================================================================
-def get_subp_tool_path():
-    """Get the path to SubpTool.exe"""
-    # Get the directory where the current script/executable is located
-    if getattr(sys, 'frozen', False):
-        # If running as compiled executable
-        script_dir = os.path.dirname(sys.executable)
-    else:
-        # If running as script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    subp_tool = os.path.join(script_dir, "FoxEngine", "SubpTool.exe")
-    
-    if not os.path.exists(subp_tool):
-        raise FileNotFoundError(f"SubpTool.exe tidak ditemukan di: {subp_tool}")
+# How often the Tk thread collects finished jobs and refreshes the progress bar
+TASK_POLL_INTERVAL_MS = 50
+
+def get_task_runner():
+    """Get the worker threads that run extract/merge/convert jobs"""
+    global task_runner
+    if task_runner is None:
+        task_runner = TaskRunner(workers=2)
+    return task_runner
+
+def run_in_background(name, func, *args, key=None, on_done=None, on_error=None):
+    """Run func(task, *args) on a worker; on_done/on_error are called on the Tk thread"""
+    global idle_status
+    idle_status = "Siap"
+    
+    def job(task, *job_args):
+        # Each job is one "job" stage; FOXSUBP_PROFILE adds a cProfile dump of it
+        with profile_job(func.__name__), stage("job", task=name):
+            return func(task, *job_args)
+    
+    task = get_task_runner().submit(name, job, *args, key=key,
+                                    on_done=on_done, on_error=on_error)
+    update_task_progress()
+    schedule_task_poll()
+    return task
+
+def schedule_task_poll():
+    """Poll for finished jobs soon, unless a poll is already pending"""
+    global task_poll_scheduled
+    if not task_poll_scheduled:
+        task_poll_scheduled = True
+        root.after(TASK_POLL_INTERVAL_MS, poll_tasks)
+
+def poll_tasks():
+    """Run callbacks of finished jobs and keep polling while any are running"""
+    global task_poll_scheduled
+    task_poll_scheduled = False
+    runner = get_task_runner()
+    try:
+        runner.poll()
+    finally:
+        release_retired_workspaces()
+        update_task_progress()
+        if runner.active:
+            schedule_task_poll()
+
+def update_task_progress():
+    """Show the newest running job in the progress bar and status line"""
+    active = get_task_runner().active
+    if not active:
+        progress_bar.stop()
+        progress_bar.configure(mode="determinate", value=0)
+        status_label.config(text=idle_status)
+        cancel_btn.config(state=tk.DISABLED)
+        return
     
-    return subp_tool
-
-def create_temp_directory():
-    """Create temporary directory for SUBP processing"""
-    # Get the directory where the current script/executable is located
-    if getattr(sys, 'frozen', False):
-        # If running as compiled executable
-        script_dir = os.path.dirname(sys.executable)
+    task = active[-1]
+    status = task.message
+    if len(active) > 1:
+        status += f" (+{len(active) - 1} proses lain)"
+    status_label.config(text=status)
+    cancel_btn.config(state=tk.NORMAL)
+    
+    if task.progress is None:
+        if str(progress_bar.cget("mode")) != "indeterminate":
+            progress_bar.configure(mode="indeterminate")
+            progress_bar.start(10)
     else:
-        # If running as script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    temp_dir = os.path.join(script_dir, "temp")
-    if not os.path.exists(temp_dir):
-        os.makedirs(temp_dir)
-    return temp_dir
-
-def extract_subp_to_xml(subp_path):
-    """Extract SUBP file to XML using SubpTool.exe"""
-    try:
-        subp_tool = get_subp_tool_path()
-        temp_dir = create_temp_directory()
-        
-        # Copy SUBP file to temp directory first
-        subp_filename = os.path.basename(subp_path)
-        temp_subp = os.path.join(temp_dir, subp_filename)
-        shutil.copy2(subp_path, temp_subp)
-        
-        # Run SubpTool.exe with only the SUBP file path
-        cmd = [subp_tool, temp_subp]
-        print(f"Running command: {' '.join(cmd)}")  # Debug output
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, 
-                              cwd=os.path.dirname(subp_tool))
-        
-        print(f"Command output: {result.stdout}")  # Debug output
-        print(f"Command errors: {result.stderr}")  # Debug output
-        
-        if result.returncode != 0:
-            raise Exception(f"SubpTool error (code {result.returncode}): {result.stderr}")
-        
-        # Check for generated XML file in temp directory
-        subp_name_without_ext = os.path.splitext(subp_filename)[0]
-        temp_xml = os.path.join(temp_dir, f"{subp_name_without_ext}.xml")
-        
-        if not os.path.exists(temp_xml):
-            raise Exception("XML file tidak berhasil dibuat dari SUBP")
-        
-        return temp_xml
-        
-    except Exception as e:
-        raise Exception(f"Error saat ekstrak SUBP: {str(e)}")
+        if str(progress_bar.cget("mode")) != "determinate":
+            progress_bar.stop()
+            progress_bar.configure(mode="determinate")
+        progress_bar.configure(value=task.progress * 100)
+
+def cancel_tasks():
+    """Cancel every running job at its next checkpoint"""
+    get_task_runner().cancel_all()
+    status_label.config(text="Membatalkan...")
+
+def show_task_error(title, error):
+    """Report a failed or cancelled job (runs on the Tk thread)"""
+    global idle_status
+    if isinstance(error, TaskCancelled):
+        idle_status = f"Dibatalkan: {error}"
+        return
+    messagebox.showerror("Error", f"{title}:\n{str(error)}")
 
-def convert_xml_to_subp(xml_path, output_subp_path):
-    """Convert XML back to SUBP using SubpTool.exe"""
+# ============================================================================
+# SUBP PROCESSING FUNCTIONS
+# ============================================================================
+def release_workspace():
+    """Remove the workspace of the currently opened SUBP file, if any"""
+    global current_workspace
+    if current_workspace is not None:
+        if task_runner is not None and task_runner.uses(current_workspace):
+            # A background job still writes there; poll_tasks removes it afterwards
+            retired_workspaces.append(current_workspace)
+        else:
+            current_workspace.cleanup()
+        current_workspace = None
+
+def release_retired_workspaces():
+    """Remove released workspaces whose background jobs have finished"""
+    for workspace in list(retired_workspaces):
+        if not task_runner.uses(workspace):
+            workspace.cleanup()
+            retired_workspaces.remove(workspace)
+
+def load_subp_for_editing(task, subp_path, request_number, language=None):
+    """Background part of process_subp_file: load the model and export it to XML"""
+    workspace = workspaces.create()
+    task.resources.append(workspace)
     try:
-        subp_tool = get_subp_tool_path()
-        
-        # Run SubpTool.exe with only the XML file path
-        cmd = [subp_tool, xml_path]
-        print(f"Converting XML to SUBP: {' '.join(cmd)}")  # Debug output
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, 
-                              cwd=os.path.dirname(subp_tool))
-        
-        print(f"Conversion output: {result.stdout}")  # Debug output
-        print(f"Conversion errors: {result.stderr}")  # Debug output
-        
-        if result.returncode != 0:
-            raise Exception(f"SubpTool error (code {result.returncode}): {result.stderr}")
+        task.report(0.1, f"Membaca {os.path.basename(subp_path)}...")
         
-        # Check for generated SUBP file in the same directory as XML
-        xml_dir = os.path.dirname(xml_path)
-        xml_name_without_ext = os.path.splitext(os.path.basename(xml_path))[0]
-        generated_subp = os.path.join(xml_dir, f"{xml_name_without_ext}.subp")
-        
-        if not os.path.exists(generated_subp):
-            raise Exception("SUBP file tidak berhasil dibuat dari XML")
+        # The loaded model serves extract and merge; the XML is kept as an export
+        if lng.is_lng_path(subp_path):
+            with stage("decode", path=subp_path) as s:
+                s.read(os.path.getsize(subp_path))
+                model = lng.read_lng(subp_path, lng.load_lang_dictionary())
+        else:
+            model = load_subp_model(subp_path, temp_dir=workspace.path, language=language)
+        task.check_cancelled()
         
-        # Copy the generated SUBP to the final output location
-        shutil.copy2(generated_subp, output_subp_path)
+        task.report(0.7, "Menulis XML temporary...")
+        subp_name_without_ext = os.path.splitext(os.path.basename(subp_path))[0]
+        extracted_xml = workspace.file(f"{subp_name_without_ext}.xml")
+        with stage("xml_write", path=extracted_xml) as s:
+            if isinstance(model, lng.LangFile):
+                lng.write_lng_xml(model, extracted_xml)
+            else:
+                codec.write_subp_xml(model, extracted_xml)
+            s.wrote(os.path.getsize(extracted_xml))
+        task.check_cancelled()
         
-        return output_subp_path
+        return request_number, subp_path, workspace, model, extracted_xml, language
         
-    except Exception as e:
-        raise Exception(f"Error saat konversi XML ke SUBP: {str(e)}")
+    except BaseException:
+        workspace.cleanup()
+        raise
+
+def finish_process_subp_file(result):
+    """Make a loaded SUBP file the current one (runs on the Tk thread)"""
+    global xml_file_path, subp_file_path, temp_xml_path, subp_model, current_workspace
+    global file_language
+    
+    request_number, subp_path, workspace, model, extracted_xml, language = result
+    if request_number != open_request_number:
+        # Another file was opened in the meantime
+        workspace.cleanup()
+        return
+    
+    # Replace the previously opened file's workspace
+    release_workspace()
+    current_workspace = workspace
+    
+    # Set paths
+    temp_xml_path = extracted_xml
+    subp_file_path = subp_path
+    subp_model = model
+    file_language = language
+    xml_file_path = temp_xml_path
+    
+    # Update UI
+    kind = "LNG" if lng.is_lng_path(subp_path) else "SUBP"
+    label_xml.config(text=f"{os.path.basename(subp_path)} ({kind} → XML)")
+    
+    # Show success message
+    messagebox.showinfo("Berhasil", 
+                       f"File {kind} berhasil diekstrak ke XML temporary:\n"
+                       f"{kind}: {os.path.basename(subp_path)}\n"
+                       f"XML: {os.path.basename(temp_xml_path)}")
 
 def process_subp_file(subp_path):
-    """Process SUBP file: extract to XML and load for editing"""
-    global xml_file_path, subp_file_path, temp_xml_path
-    
-    try:
-        # Extract SUBP to XML
-        temp_xml_path = extract_subp_to_xml(subp_path)
-        
-        # Set paths
-        subp_file_path = subp_path
-        xml_file_path = temp_xml_path
-        
-        # Update UI
-        label_xml.config(text=f"{os.path.basename(subp_path)} (SUBP → XML)")
-        
-        # Show success message
-        messagebox.showinfo("Berhasil", 
-                           f"File SUBP berhasil diekstrak ke XML temporary:\n"
-                           f"SUBP: {os.path.basename(subp_path)}\n"
-                           f"XML: {os.path.basename(temp_xml_path)}")
-        
-        return True
-        
-    except Exception as e:
-        messagebox.showerror("Error", f"Gagal memproses file SUBP:\n{str(e)}")
-        return False
+    """Process SUBP/LNG file: load and extract it on a background worker"""
+    global open_request_number
+    
+    # Only the most recently opened file becomes current when its job finishes
+    open_request_number += 1
+    run_in_background(f"Membuka {os.path.basename(subp_path)}", load_subp_for_editing,
+                      subp_path, open_request_number, batch.resolve_language(subp_path),
+                      on_done=finish_process_subp_file,
+                      on_error=lambda e: show_task_error("Gagal memproses file SUBP", e))
+    return True
+
+def open_xml_file(file_path):
+    """Make a plain XML file the current one"""
+    global xml_file_path, subp_file_path, temp_xml_path, subp_model, open_request_number
+    global file_language
+    
+    # Supersedes any SUBP file still being opened
+    open_request_number += 1
+    release_workspace()
+    xml_file_path = file_path
+    subp_file_path = ""
+    temp_xml_path = ""
+    subp_model = None
+    file_language = batch.resolve_language(file_path)
+    label_xml.config(text=os.path.basename(file_path))
 
 # ============================================================================
 # XML PROCESSING FUNCTIONS
 # ============================================================================
-def parse_manual_translation(text_input):
-    """Parse manual translation input text into dictionary"""
-    translations = {}
-    lines = text_input.strip().splitlines()
-    for line in lines:
-        match = re.match(r"\[ID (\d+)\]\s+(.+)", line.strip())
-        if match:
-            entry_id, translated = match.groups()
-            translations[entry_id] = translated
-    return translations
-
-def merge_translation_to_xml(xml_path, translations_dict):
-    """Merge translations into XML file"""
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-
-    # Clean namespace
-    for elem in root.iter():
-        if "}" in elem.tag:
-            elem.tag = elem.tag.split("}", 1)[1]
-
-    modified_count = 0
-    modified_ids = []
-
-    # Update entries
-    for entry in root.findall(".//Entry"):
-        entry_id = entry.get("Id")
-        if entry_id in translations_dict:
-            lines = entry.find("Lines")
-            if lines is not None:
-                for line in lines.findall("Line"):
-                    old_text = line.get("Text")
-                    if old_text is not None:
-                        line.set("Text", translations_dict[entry_id])
-                        modified_count += 1
-                        modified_ids.append(f"[ID {entry_id}] => {translations_dict[entry_id]}")
-
-    # Save file
-    tree.write(xml_path, encoding="utf-8", xml_declaration=True)
-    return modified_count, xml_path, modified_ids
+# Example lines shown in the empty text box; they are not real translations
+EXAMPLE_TRANSLATIONS = "[ID 600831] Tembakan lengan.\n[ID 7158447] Mode Senjata."
+
+# Failures of the translation memory never stop an extract or a merge
+MEMORY_ERRORS = (sqlite3.Error, OSError, ValueError)
+
+def show_translation_report(report):
+    """Append duplicate/malformed translation lines to the result view"""
+    if not report.ok:
+        result_view.append_lines([""] + report.format().splitlines())
+
+def collect_text_lines(task, model, xml_path, translated_ids=frozenset(), language=None):
+    """Background part of extract_text_lines_from_xml: list every "[ID n] text" line.
+
+    Returns (lines, suggestions); suggestions are (entry id, Suggestion) from
+    the translation memory of language for entries not in translated_ids,
+    in file order.
+    """
+    # Opened SUBP files are read from the loaded model, XML files in one streaming pass
+    if model is not None:
+        line_texts = model.iter_line_texts()
+    else:
+        line_texts = xmlstream.iter_line_texts(xml_path)
+    
+    extracted_lines = []
+    append = extracted_lines.append
+    for i, (entry_id, text) in enumerate(line_texts):
+        if not i % 10000:
+            task.check_cancelled()
+        append(f"[ID {entry_id}] {text}")
+    
+    task.report(0.9, "Mencari saran di memori terjemahan...")
+    try:
+        with TranslationMemory(language=language) as memory:
+            found = suggest_for_entries(memory, iter_entry_texts(model, xml_path), translated_ids)
+    except MEMORY_ERRORS:
+        found = {}
+    return extracted_lines, list(found.items())
+
+def format_suggestions(suggestions):
+    """Text box lines for memory suggestions; "#" lines are ignored when merging"""
+    lines = ["# Saran memori terjemahan (periksa sebelum menggabungkan)"]
+    for entry_id, suggestion in suggestions:
+        if not suggestion.exact:
+            lines.append(f"# {suggestion.score:.0%} mirip: {suggestion.source}")
+        lines.append(f"[ID {entry_id}] {suggestion.target}")
+    return "\n".join(lines)
+
+def show_extracted_lines(result):
+    """Display extracted lines and pre-fill memory suggestions (runs on the Tk thread)"""
+    extracted_lines, suggestions = result
+    # The view renders only the visible rows, so the size of the list does not matter
+    header = [f"Berhasil mengambil {len(extracted_lines)} baris teks dari XML."]
+    if suggestions:
+        exact = sum(1 for _, suggestion in suggestions if suggestion.exact)
+        header.append(f"Saran memori terjemahan: {exact} persis, {len(suggestions) - exact} mirip "
+                      f"(dimasukkan ke kotak terjemahan).")
+        if input_box.get("1.0", tk.END).strip() == EXAMPLE_TRANSLATIONS:
+            input_box.delete("1.0", tk.END)
+        if input_box.get("1.0", tk.END).strip():
+            input_box.insert(tk.END, "\n")
+        input_box.insert(tk.END, format_suggestions(suggestions))
+    result_view.set_lines(header + [""] + extracted_lines)
 
 def extract_text_lines_from_xml():
     """Extract all text lines from XML file"""
@@ -276,113 +394,238 @@ def extract_text_lines_from_xml():
         messagebox.showwarning("Peringatan", "Pilih file XML terlebih dahulu.")
         return
 
-    try:
-        tree = ET.parse(xml_file_path)
-        root = tree.getroot()
-
-        # Clean namespace
-        for elem in root.iter():
-            if "}" in elem.tag:
-                elem.tag = elem.tag.split("}", 1)[1]
-
-        # Extract lines
-        extracted_lines = []
-        for entry in root.findall(".//Entry"):
-            entry_id = entry.get("Id")
-            lines = entry.find("Lines")
-            if lines is not None:
-                for line in lines.findall("Line"):
-                    text = line.get("Text")
-                    if text:
-                        extracted_lines.append(f"[ID {entry_id}] {text}")
-
-        # Display results
-        result_box.delete("1.0", tk.END)
-        result_box.insert(tk.END, f"Berhasil mengambil {len(extracted_lines)} baris teks dari XML.\n\n")
-        for line in extracted_lines:
-            result_box.insert(tk.END, line + "\n")
-
-    except Exception as e:
-        messagebox.showerror("Error", str(e))
+    # Entries already translated (file or text box) get no memory suggestion
+    manual_text = input_box.get("1.0", tk.END)
+    translated_ids = set(loaded_translations)
+    if manual_text.strip() != EXAMPLE_TRANSLATIONS:
+        translated_ids.update(parse_manual_translation(manual_text))
+    
+    run_in_background(f"Mengambil teks {os.path.basename(subp_file_path or xml_file_path)}",
+                      collect_text_lines, subp_model, xml_file_path, translated_ids,
+                      file_language,
+                      on_done=show_extracted_lines,
+                      on_error=lambda e: show_task_error("Gagal mengambil teks", e))
 
 # ============================================================================
 # UI EVENT HANDLERS
 # ============================================================================
 def browse_xml():
-    """Browse and select XML or SUBP file"""
-    global xml_file_path, subp_file_path, temp_xml_path
-    
+    """Browse and select XML, SUBP or LNG file"""
     file_path = filedialog.askopenfilename(
-        filetypes=[("XML Files", "*.xml"), ("SUBP Files", "*.subp"), ("All Files", "*.*")]
+        filetypes=[("XML Files", "*.xml"), ("SUBP Files", "*.subp"), ("LNG Files", "*.lng *.lng2"),
+                   ("All Files", "*.*")]
     )
     
     if file_path:
-        if file_path.lower().endswith(".subp"):
+        if file_path.lower().endswith(".subp") or lng.is_lng_path(file_path):
             # Process SUBP file
             if process_subp_file(file_path):
                 # SUBP processed successfully, paths are set in process_subp_file
                 pass
         elif file_path.lower().endswith(".xml"):
             # Regular XML file
-            xml_file_path = file_path
-            subp_file_path = ""
-            temp_xml_path = ""
-            label_xml.config(text=os.path.basename(file_path))
+            open_xml_file(file_path)
         else:
-            messagebox.showwarning("File Tidak Valid", "Hanya file XML dan SUBP yang didukung.")
-
-def start_merge():
+            messagebox.showwarning("File Tidak Valid", "Hanya file XML, SUBP dan LNG yang didukung.")
+
+def merge_translations_job(task, manual_text, base_translations, xml_path, subp_path,
+                           temp_xml, model, coverage=None, ignore_missing_glyphs=False,
+                           language=None):
+    """Background part of start_merge; returns a result dict for finish_merge"""
+    task.report(0.05, "Membaca terjemahan...")
+    
+    # Lines typed in the text box override the loaded translation file
+    report = TranslationReport()
+    translations = dict(base_translations)
+    translations.update(parse_manual_translation(manual_text, report))
+    task.check_cancelled()
+    
+    # Skip rewriting (and re-encoding the SUBP) when no line text would change
+    task.report(0.3, "Memeriksa perubahan...")
+    _, changed_lines = count_effective_changes(iter_entry_texts(model, xml_path), translations)
+    result = {"report": report, "changed": bool(changed_lines), "subp_path": subp_path,
+              "temp_xml": temp_xml, "count": 0, "output_file": xml_path, "updated": [],
+              "glyph_report": None, "blocked": False, "memory_added": 0, "memory_error": None}
+    if not changed_lines:
+        return result
+    task.check_cancelled()
+    
+    # Characters the loaded font cannot draw are reported before anything is written
+    if coverage is not None:
+        task.report(0.4, "Memeriksa glyph font...")
+        entry_ids = {entry_id for entry_id, _ in iter_entry_texts(model, xml_path)}
+        glyph_report = check_translations(coverage, translations, entry_ids)
+        result["glyph_report"] = glyph_report
+        if not glyph_report.ok and not ignore_missing_glyphs:
+            result["blocked"] = True
+            return result
+        task.check_cancelled()
+    
+    # Original texts are taken before the model is updated
+    pairs = collect_pairs(iter_entry_texts(model, xml_path), translations)
+    
+    # Past this point the job runs to completion so file and model stay consistent
+    task.report(0.5, "Menggabungkan terjemahan...")
+    if subp_path:
+        # Working with a SUBP/LNG file: update the loaded model and encode it directly
+        count, updated = model.apply_translations(translations)
+        task.report(0.7, f"Menulis {os.path.basename(subp_path)}...")
+        try:
+            if isinstance(model, lng.LangFile):
+                lng.write_lng_xml(model, temp_xml)
+                lng.write_lng(model, subp_path)
+            else:
+                codec.write_subp_xml(model, temp_xml)
+                save_subp_model(model, subp_path, xml_path=temp_xml, language=language)
+        except Exception as e:
+            kind = "LNG" if isinstance(model, lng.LangFile) else "SUBP"
+            raise Exception(f"Gagal mengkonversi kembali ke {kind}:\n{str(e)}")
+        result.update(count=count, output_file=subp_path, updated=updated)
+    else:
+        count, output_file, updated = merge_translation_to_xml(xml_path, translations)
+        result.update(count=count, output_file=output_file, updated=updated)
+    
+    task.report(0.9, "Menyimpan ke memori terjemahan...")
+    try:
+        with TranslationMemory(language=language) as memory:
+            result["memory_added"] = memory.add(pairs)
+    except MEMORY_ERRORS as e:
+        result["memory_error"] = str(e)
+    return result
+
+def finish_merge(result):
+    """Report a finished merge (runs on the Tk thread)"""
+    glyph_report = result["glyph_report"]
+    if result["blocked"]:
+        result_view.set_lines(glyph_report.format().splitlines())
+        characters = "".join(sorted(glyph_report.characters))
+        if messagebox.askyesno("Glyph Tidak Tersedia",
+                               f"{glyph_report.entry_count} entri memakai karakter yang tidak ada "
+                               f"di font:\n{characters}\n\nDetail ada di kotak hasil. Tetap tulis file?"):
+            start_merge(ignore_missing_glyphs=True)
+        return
+    
+    if not result["changed"]:
+        messagebox.showinfo("Tidak Ada Perubahan",
+                           "Terjemahan tidak mengubah teks apa pun.\nFile tidak ditulis ulang.")
+        return
+    
+    count = result["count"]
+    if result["subp_path"]:
+        kind = "LNG" if lng.is_lng_path(result["subp_path"]) else "SUBP"
+        messagebox.showinfo("Sukses", 
+                           f"{count} baris berhasil diperbarui.\n"
+                           f"File {kind} telah diperbarui: {os.path.basename(result['subp_path'])}")
+        
+        # Display results
+        lines = [f"File {kind} diperbarui: {os.path.basename(result['subp_path'])}",
+                 f"XML temporary: {os.path.basename(result['temp_xml'])}"]
+    else:
+        # Regular XML file processing
+        messagebox.showinfo("Sukses", f"{count} baris berhasil diperbarui.\n"
+                                      f"File ditimpa: {result['output_file']}")
+        
+        # Display results
+        lines = [f"File ditulis ulang: {result['output_file']}"]
+    
+    lines.append(f"Total diterjemahkan: {count} baris")
+    if result["memory_error"]:
+        lines.append(f"Memori terjemahan tidak diperbarui: {result['memory_error']}")
+    elif result["memory_added"]:
+        lines.append(f"Memori terjemahan: {result['memory_added']} teks baru/diperbarui")
+    lines.append("")
+    if glyph_report is not None and not glyph_report.ok:
+        lines += glyph_report.format().splitlines() + [""]
+    result_view.set_lines(lines + result["updated"])
+    show_translation_report(result["report"])
+
+def start_merge(ignore_missing_glyphs=False):
     """Start the translation merge process"""
     if not xml_file_path:
         messagebox.showwarning("Peringatan", "Pilih file XML atau SUBP terlebih dahulu.")
         return
 
     manual_text = input_box.get("1.0", tk.END)
-    if not manual_text.strip():
-        messagebox.showwarning("Peringatan", "Masukkan terjemahan manual di kotak teks.")
+    if not manual_text.strip() and not loaded_translations:
+        messagebox.showwarning("Peringatan", "Masukkan terjemahan manual di kotak teks "
+                                             "atau muat file terjemahan.")
+        return
+    
+    # One merge per file at a time; other files can be opened meanwhile
+    key = ("merge", subp_file_path or xml_file_path)
+    if get_task_runner().find(key):
+        messagebox.showwarning("Peringatan", "File ini masih diproses. Tunggu sampai selesai.")
         return
 
-    try:
-        translations = parse_manual_translation(manual_text)
-        count, output_file, updated = merge_translation_to_xml(xml_file_path, translations)
-        
-        # If we're working with a SUBP file, convert back to SUBP
-        if subp_file_path:
-            try:
-                # Convert the modified XML back to SUBP
-                final_subp_path = convert_xml_to_subp(temp_xml_path, subp_file_path)
-                
-                messagebox.showinfo("Sukses", 
-                                   f"{count} baris berhasil diperbarui.\n"
-                                   f"File SUBP telah diperbarui: {os.path.basename(subp_file_path)}")
-                
-                # Display results
-                result_box.delete("1.0", tk.END)
-                result_box.insert(tk.END, f"File SUBP diperbarui: {os.path.basename(subp_file_path)}\n")
-                result_box.insert(tk.END, f"XML temporary: {os.path.basename(temp_xml_path)}\n")
-                result_box.insert(tk.END, f"Total diterjemahkan: {count} baris\n\n")
-                for line in updated:
-                    result_box.insert(tk.END, line + "\n")
-                    
-            except Exception as e:
-                messagebox.showerror("Error", f"Gagal mengkonversi kembali ke SUBP:\n{str(e)}")
-        else:
-            # Regular XML file processing
-            messagebox.showinfo("Sukses", f"{count} baris berhasil diperbarui.\nFile ditimpa: {output_file}")
-            
-            # Display results
-            result_box.delete("1.0", tk.END)
-            result_box.insert(tk.END, f"File ditulis ulang: {output_file}\n")
-            result_box.insert(tk.END, f"Total diterjemahkan: {count} baris\n\n")
-            for line in updated:
-                result_box.insert(tk.END, line + "\n")
-                
-    except Exception as e:
-        messagebox.showerror("Error", str(e))
+    task = run_in_background(f"Menggabungkan ke {os.path.basename(subp_file_path or xml_file_path)}",
+                             merge_translations_job, manual_text, loaded_translations,
+                             xml_file_path, subp_file_path, temp_xml_path, subp_model,
+                             font_coverage, ignore_missing_glyphs,
+                             file_language,
+                             key=key, on_done=finish_merge,
+                             on_error=lambda e: show_task_error("Gagal menggabungkan terjemahan", e))
+    if current_workspace is not None:
+        task.resources.append(current_workspace)
+
+def finish_browse_translations(result):
+    """Keep a loaded translation file and show its report (runs on the Tk thread)"""
+    global loaded_translations, loaded_translations_path
+    
+    file_path, translations, report = result
+    loaded_translations = translations
+    loaded_translations_path = file_path
+    label_translations.config(text=f"{os.path.basename(file_path)} ({len(translations)} ID)")
+    
+    # The example lines in the text box would otherwise override the file
+    input_box.delete("1.0", tk.END)
+    
+    result_view.set_lines(report.format().splitlines())
+    if not report.ok:
+        messagebox.showwarning("Peringatan",
+                               f"{report.duplicate_count} ID duplikat dan "
+                               f"{report.malformed_count} baris tidak valid ditemukan.\n"
+                               f"Lihat detail di kotak hasil.")
+
+def browse_translations():
+    """Load translations from a file instead of pasting them into the text box"""
+    file_path = filedialog.askopenfilename(
+        filetypes=[("File Terjemahan", "*.txt *.tsv *.csv *.jsonl *.po"), ("All Files", "*.*")]
+    )
+    if not file_path:
+        return
+    
+    def load(task):
+        report = TranslationReport()
+        return file_path, load_translations(file_path, report=report), report
+    
+    run_in_background(f"Memuat {os.path.basename(file_path)}", load,
+                      on_done=finish_browse_translations,
+                      on_error=lambda e: show_task_error("Gagal memuat file terjemahan", e))
+
+def finish_browse_fonts(coverage):
+    """Check later merges against the loaded fonts (runs on the Tk thread)"""
+    global font_coverage
+    
+    font_coverage = coverage
+    names = ", ".join(os.path.basename(path) for path in coverage.sources)
+    label_font.config(text=f"{names} ({len(coverage)} karakter)")
+
+def browse_fonts():
+    """Load one or more .ffnt fonts whose glyphs merged translations must use"""
+    file_paths = filedialog.askopenfilenames(
+        filetypes=[("Font Fox Engine", "*.ffnt"), ("All Files", "*.*")]
+    )
+    if not file_paths:
+        return
+    
+    run_in_background("Memuat font", lambda task: load_font_coverage(file_paths),
+                      on_done=finish_browse_fonts,
+                      on_error=lambda e: show_task_error("Gagal memuat font", e))
 
 def copy_result_to_clipboard():
-    """Copy result text to clipboard"""
-    result = result_box.get("1.0", tk.END)
+    """Copy result text (the lines matching the filter) to clipboard"""
+    # The full text is only joined here, never kept in a widget
+    result = result_view.get_text()
     if not result.strip():
         messagebox.showwarning("Peringatan", "Tidak ada teks untuk disalin.")
         return
@@ -393,27 +636,22 @@ def copy_result_to_clipboard():
 
 def on_drop(event):
     """Handle drag and drop file event"""
-    global xml_file_path, subp_file_path, temp_xml_path
-    
     dropped_files = root.tk.splitlist(event.data)
     if dropped_files:
         file_path = dropped_files[0]
         file_extension = file_path.lower()
         
-        if file_extension.endswith(".subp"):
-            # Process SUBP file
+        if file_extension.endswith(".subp") or lng.is_lng_path(file_extension):
+            # Process SUBP/LNG file
             if process_subp_file(file_path):
                 # File processed successfully, no need for additional message
                 pass
         elif file_extension.endswith(".xml"):
             # Regular XML file
-            xml_file_path = file_path
-            subp_file_path = ""
-            temp_xml_path = ""
-            label_xml.config(text=os.path.basename(file_path))
+            open_xml_file(file_path)
             messagebox.showinfo("Berhasil", f"File XML dimuat: {os.path.basename(file_path)}")
         else:
-            messagebox.showwarning("File Tidak Valid", "Hanya file XML dan SUBP yang didukung.")
+            messagebox.showwarning("File Tidak Valid", "Hanya file XML, SUBP dan LNG yang didukung.")
 
 # ============================================================================
 # GUI SETUP FUNCTIONS
@@ -433,8 +671,10 @@ def setup_drag_drop():
 
 def create_widgets():
     """Create all GUI widgets"""
-    global frame_drop, label_xml, input_box, result_box, button_frame
+    global frame_drop, label_xml, input_box, result_view, button_frame
     global browse_btn, merge_btn, extract_btn, copy_btn, dark_mode_btn
+    global load_translations_btn, label_translations, load_font_btn, label_font
+    global progress_bar, status_label, cancel_btn
     
     # Configure root window for responsive resizing
     root.geometry("900x800")  # Set initial size
@@ -448,6 +688,7 @@ def create_widgets():
     root.grid_rowconfigure(3, weight=1)  # Input box - expandable
     root.grid_rowconfigure(4, weight=0)  # Buttons - fixed
     root.grid_rowconfigure(5, weight=2)  # Result box - more expandable
+    root.grid_rowconfigure(6, weight=0)  # Progress bar - fixed
     root.grid_columnconfigure(0, weight=1)  # Full width
     
     # Title
@@ -459,7 +700,7 @@ def create_widgets():
     dark_mode_btn.grid(row=0, column=0, pady=5)
     
     # Drag & drop area
-    frame_drop = tk.Label(root, text="(Atau drag & drop file XML/SUBP ke sini)", 
+    frame_drop = tk.Label(root, text="(Atau drag & drop file XML/SUBP/LNG ke sini)", 
                          bg="#e0e0e0", relief="groove", padx=10, pady=10)
     frame_drop.grid(row=1, column=0, sticky="ew", padx=10, pady=5)
     
@@ -467,8 +708,8 @@ def create_widgets():
     file_section = tk.Frame(root)
     file_section.grid(row=2, column=0, pady=5)
     
-    tk.Label(file_section, text="1. Pilih File XML atau SUBP", font=("Arial", 10, "bold")).pack(pady=5)
-    browse_btn = tk.Button(file_section, text="Pilih File XML/SUBP", command=browse_xml, width=20, height=1)
+    tk.Label(file_section, text="1. Pilih File XML, SUBP atau LNG", font=("Arial", 10, "bold")).pack(pady=5)
+    browse_btn = tk.Button(file_section, text="Pilih File XML/SUBP/LNG", command=browse_xml, width=24, height=1)
     browse_btn.pack()
     label_xml = tk.Label(file_section, text="Belum dipilih", fg="gray")
     label_xml.pack()
@@ -482,7 +723,23 @@ def create_widgets():
     tk.Label(input_section, text="2. Masukkan Terjemahan Manual", font=("Arial", 10, "bold")).grid(row=0, column=0, pady=(0, 8))
     input_box = scrolledtext.ScrolledText(input_section, width=80, height=8, wrap=tk.WORD)
     input_box.grid(row=1, column=0, sticky="nsew")
-    input_box.insert(tk.END, "[ID 600831] Tembakan lengan.\n[ID 7158447] Mode Senjata.")
+    input_box.insert(tk.END, EXAMPLE_TRANSLATIONS)
+    
+    # Large translation sets are loaded from a file (TXT/TSV/CSV/JSONL/PO)
+    translations_file_frame = tk.Frame(input_section)
+    translations_file_frame.grid(row=2, column=0, pady=(5, 0))
+    load_translations_btn = tk.Button(translations_file_frame, text="Muat File Terjemahan",
+                                      command=browse_translations, width=20, height=1)
+    load_translations_btn.pack(side=tk.LEFT, padx=5)
+    label_translations = tk.Label(translations_file_frame, text="Belum dimuat", fg="gray")
+    label_translations.pack(side=tk.LEFT)
+    
+    # Optional font check: merges report characters the game font cannot draw
+    load_font_btn = tk.Button(translations_file_frame, text="Muat Font (FFNT)",
+                              command=browse_fonts, width=16, height=1)
+    load_font_btn.pack(side=tk.LEFT, padx=(15, 5))
+    label_font = tk.Label(translations_file_frame, text="Tanpa cek glyph", fg="gray")
+    label_font.pack(side=tk.LEFT)
     
     # Buttons section container
     buttons_section = tk.Frame(root)
@@ -515,8 +772,21 @@ def create_widgets():
     result_section.grid_rowconfigure(0, weight=1)
     result_section.grid_columnconfigure(0, weight=1)
     
-    result_box = scrolledtext.ScrolledText(result_section, width=90, height=12, wrap=tk.WORD)
-    result_box.grid(row=0, column=0, sticky="nsew")
+    result_view = ResultView(result_section, width=90, height=12)
+    result_view.grid(row=0, column=0, sticky="nsew")
+    
+    # Progress of background jobs
+    progress_section = tk.Frame(root)
+    progress_section.grid(row=6, column=0, sticky="ew", padx=10, pady=(0, 10))
+    progress_section.grid_columnconfigure(1, weight=1)
+    
+    status_label = tk.Label(progress_section, text=idle_status, anchor="w", width=40)
+    status_label.grid(row=0, column=0, sticky="w")
+    progress_bar = ttk.Progressbar(progress_section, mode="determinate", maximum=100)
+    progress_bar.grid(row=0, column=1, sticky="ew", padx=5)
+    cancel_btn = tk.Button(progress_section, text="Batal", command=cancel_tasks,
+                          width=10, state=tk.DISABLED)
+    cancel_btn.grid(row=0, column=2)
 
 def setup_drag_drop_events(dnd_available):
     """Setup drag and drop events if available"""
@@ -547,7 +817,7 @@ def main():
     # Setup cleanup on window close
     root.protocol("WM_DELETE_WINDOW", on_closing)
     
-    # Verify SubpTool.exe exists on startup
+    # Check whether the SubpTool.exe fallback is available
     verify_subp_tool()
     
     # Start main loop
@@ -555,37 +825,40 @@ def main():
 
 def on_closing():
     """Handle application closing"""
+    if task_runner is not None:
+        # Running jobs stop at their next checkpoint; their workspaces go below
+        task_runner.shutdown(wait=False)
+    save_trace()
     cleanup_temp_files()
     root.destroy()
 
+def save_trace():
+    """Write the stages of this session as a Chrome trace to FOXSUBP_TRACE, if set"""
+    trace_path = os.environ.get(TRACE_PATH_ENV)
+    if trace_path:
+        try:
+            write_chrome_trace(trace_path, get_recorder().events())
+        except OSError as e:
+            print(f"Trace tidak bisa disimpan: {e}")  # Debug output
+
 def cleanup_temp_files():
     """Clean up temporary files on application exit"""
+    global current_workspace
     try:
-        # Get the directory where the current script/executable is located
-        if getattr(sys, 'frozen', False):
-            # If running as compiled executable
-            script_dir = os.path.dirname(sys.executable)
-        else:
-            # If running as script
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        temp_dir = os.path.join(script_dir, "temp")
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
+        # Remove every per-job workspace that is still alive
+        current_workspace = None
+        workspaces.cleanup_all()
     except:
         pass  # Ignore cleanup errors
 
 def verify_subp_tool():
-    """Verify that SubpTool.exe exists and show warning if not"""
+    """Check whether SubpTool.exe is available as a fallback for the native SUBP codec"""
     try:
         get_subp_tool_path()
         return True
     except FileNotFoundError as e:
-        messagebox.showwarning("Peringatan", 
-                             f"SubpTool.exe tidak ditemukan!\n\n"
-                             f"Pastikan SubpTool.exe ada di folder FoxEngine.\n"
-                             f"Fitur SUBP akan dinonaktifkan.\n\n"
-                             f"Detail: {str(e)}")
+        # The native codec handles SUBP files on its own; only the fallback is lost
+        print(f"SubpTool.exe fallback unavailable: {e}")  # Debug output
         return False
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Benchmarks for the SUBP/XML pipeline; benchmarks.suite runs them against JSON baselines."""
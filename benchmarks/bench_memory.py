@@ -0,0 +1,89 @@
+"""Benchmark: translation memory fill, exact and fuzzy suggestion for a pack.
+
+A memory is filled with synthetic lines, then a pack is looked up in which
+a third of the lines are stored verbatim, a third have one word changed and
+a third are new. Fuzzy recall is checked against a brute-force scan over a
+sample. Usage (from the repository root):
+
+    python benchmarks/bench_memory.py --units 40000 --lines 5000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from foxsubp import memory
+
+WORDS = ("Snake Boss Ocelot Miller Quiet Huey Code Talker Skull Face Mother Base Afghanistan "
+         "Africa outpost target extract eliminate recover interrogate prisoner soldier guard "
+         "patrol helicopter supply drop weapon rifle pistol sniper ammo fulton balloon intel "
+         "file tape radio mission objective area reached secured the a an of to in on at "
+         "with from is are was will be has have not enemy our your his their this that now "
+         "quickly carefully before after during night day morning storm sandstorm rain").split()
+
+
+def synthetic_line(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 16))).capitalize() + "."
+
+
+def change_one_word(rng, line):
+    words = line.split()
+    words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, default=40000, help="lines stored in the memory")
+    parser.add_argument("--lines", type=int, default=5000, help="lines in the looked-up pack")
+    parser.add_argument("--threshold", type=float, default=memory.DEFAULT_THRESHOLD)
+    parser.add_argument("--sample", type=int, default=300,
+                        help="changed lines checked against a brute-force scan")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    stored = list(dict.fromkeys(synthetic_line(rng) for _ in range(args.units)))
+    third = args.lines // 3
+    changed = [change_one_word(rng, line) for line in stored[third:2 * third]]
+    pack = stored[:third] + changed + [synthetic_line(rng) for _ in range(args.lines - 2 * third)]
+
+    with tempfile.TemporaryDirectory(prefix="foxsubp-bench-") as work_dir:
+        with memory.TranslationMemory(os.path.join(work_dir, "tm.sqlite")) as tm:
+            started = time.perf_counter()
+            tm.add((line, f"Terjemahan: {line}") for line in stored)
+            print(f"Memory: {len(tm)} units, filled in {time.perf_counter() - started:.2f}s")
+
+            started = time.perf_counter()
+            exact = tm.exact(pack)
+            exact_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            found = tm.suggest(pack, args.threshold)
+            seconds = time.perf_counter() - started
+            fuzzy = len(found) - sum(1 for suggestion in found.values() if suggestion.exact)
+            print(f"Pack: {len(pack)} lines, exact lookup {exact_seconds:.3f}s ({len(exact)} hits), "
+                  f"suggest {seconds:.3f}s ({len(exact)} exact, {fuzzy} fuzzy)")
+
+            # Best stored match of each sampled line by scanning everything
+            all_grams = [memory.text_grams(line) for line in stored]
+            expected = 0
+            hits = 0
+            for line in changed[:args.sample]:
+                grams = memory.text_grams(line)
+                best = max(memory.dice(grams, other) for other in all_grams)
+                if best >= args.threshold:
+                    expected += 1
+                    suggestion = found.get(line)
+                    hits += suggestion is not None and abs(suggestion.score - best) < 1e-9
+            if expected:
+                print(f"Fuzzy recall: {hits}/{expected} ({hits / expected:.1%}) of sampled "
+                      f"changed lines got their best match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark: read()+decode SUBP extract vs memory-mapped lazy decoding.
+
+Each variant runs in a fresh child process so that peak RSS is measured
+independently. "read" is the previous path (read the whole file, decode
+every entry); "mmap" is foxsubp.mapped.MappedSubp. Usage (from the
+repository root):
+
+    python benchmarks/bench_mmap.py --entries 32767 --line-length 400
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_xml_merge import peak_rss_kb
+
+OPERATIONS = ("ids", "lookup", "extract")
+VARIANTS = [f"{reader}-{operation}" for operation in OPERATIONS for reader in ("read", "mmap")]
+FIRST_ID = 100000
+
+
+def write_synthetic_subp(path, entries, lines_per_entry=3, line_length=400, seed=0):
+    """Write a SUBP pack with long lines so text dominates the file size"""
+    from foxsubp import codec
+    from foxsubp.model import SubpEntry, SubpFile, SubpLine, SubpTiming
+
+    rng = random.Random(seed)
+    words = ["Snake", "Boss", "Ocelot", "Miller", "target", "extract", "Mother", "Base", "the", "a"]
+    subp = SubpFile()
+    for i in range(entries):
+        lines = []
+        for _ in range(lines_per_entry):
+            text = ""
+            while len(text) < line_length:
+                text += rng.choice(words) + " "
+            lines.append(SubpLine(text[:line_length].strip(), SubpTiming(0, 120)))
+        subp.entries.append(SubpEntry(FIRST_ID + i, lines=lines))
+    codec.write_subp(subp, path)
+
+
+def run_variant(variant, subp_path, lookup_id):
+    """Run one variant in this process and return its measurements"""
+    from foxsubp import codec
+    from foxsubp.mapped import MappedSubp
+
+    reader, operation = variant.split("-")
+    baseline_kb = peak_rss_kb()
+    started = time.perf_counter()
+    if reader == "read":
+        with open(subp_path, "rb") as f:
+            pack = codec.decode_subp(f.read())
+        if operation == "ids":
+            result = len([entry.subtitle_id for entry in pack.entries])
+        elif operation == "lookup":
+            result = len(pack.get(lookup_id).lines)
+        else:
+            result = len(list(pack.iter_line_texts()))
+    else:
+        with MappedSubp(subp_path) as pack:
+            if operation == "ids":
+                result = len(list(pack))
+            elif operation == "lookup":
+                result = len(pack.get(lookup_id).lines)
+            else:
+                result = len(list(pack.iter_line_texts()))
+    seconds = time.perf_counter() - started
+    return {
+        "variant": variant,
+        "seconds": round(seconds, 4),
+        "peak_rss_kb": peak_rss_kb(),
+        "baseline_rss_kb": baseline_kb,
+        "result": result,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    # A SUBP pack holds at most 32767 entries (int16 count)
+    parser.add_argument("--entries", type=int, default=32767)
+    parser.add_argument("--lines", type=int, default=3, help="lines per entry")
+    parser.add_argument("--line-length", type=int, default=400)
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--subp", help=argparse.SUPPRESS)
+    parser.add_argument("--lookup-id", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.subp, args.lookup_id)))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="foxsubp-bench-") as work_dir:
+        subp_path = os.path.join(work_dir, "source.subp")
+        write_synthetic_subp(subp_path, args.entries, args.lines, args.line_length)
+        size_mb = os.path.getsize(subp_path) / (1024 * 1024)
+        print(f"Synthetic pack: {args.entries} entries, {size_mb:.1f} MiB SUBP")
+
+        lookup_id = FIRST_ID + args.entries // 2
+        results = {}
+        for variant in VARIANTS:
+            completed = subprocess.run(
+                [sys.executable, __file__, "--variant", variant, "--subp", subp_path,
+                 "--lookup-id", str(lookup_id)],
+                capture_output=True, text=True, check=True)
+            result = results[variant] = json.loads(completed.stdout)
+            print(f"  {variant:13} {result['seconds']:8.4f}s  peak RSS "
+                  f"{result['peak_rss_kb']} KiB (startup {result['baseline_rss_kb']} KiB)")
+
+        for operation in OPERATIONS:
+            read, mapped = results[f"read-{operation}"], results[f"mmap-{operation}"]
+            print(f"  {operation}: same result {read['result'] == mapped['result']}, "
+                  f"{read['seconds'] / max(mapped['seconds'], 1e-6):.1f}x faster with mmap")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Microbenchmarks for the indexed entry model: load, lookup by ID and bulk update.
+
+Lookups and bulk updates are compared with the ElementTree findall scans the
+XML pipeline uses. Usage (from the repository root):
+
+    python benchmarks/bench_model.py --entries 30000 --lookups 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import timeit
+import xml.etree.ElementTree as ET
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_xml_merge import translations_for, write_synthetic_xml
+from foxsubp import codec
+
+
+def best_of(func, repeat):
+    """Fastest of repeat runs, in seconds"""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    # A SUBP pack holds at most 32767 entries (int16 count)
+    parser.add_argument("--entries", type=int, default=30000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--ratio", type=float, default=0.5,
+                        help="fraction of entries that receive a translation")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="foxsubp-bench-") as work_dir:
+        xml_path = os.path.join(work_dir, "source.xml")
+        subp_path = os.path.join(work_dir, "source.subp")
+        write_synthetic_xml(xml_path, args.entries)
+        codec.write_subp(codec.read_subp_xml(xml_path), subp_path)
+        with open(subp_path, "rb") as f:
+            data = f.read()
+
+        print(f"Synthetic pack: {args.entries} entries, {len(data) / 1024:.0f} KiB SUBP")
+
+        # Load
+        load_seconds = best_of(lambda: codec.decode_subp(data), args.repeat)
+        subp = codec.decode_subp(data)
+        index_seconds = best_of(lambda: (subp.reindex(), subp.index), args.repeat)
+        parse_seconds = best_of(lambda: ET.parse(xml_path), args.repeat)
+        print(f"  load      decode SUBP {load_seconds * 1000:9.2f} ms   "
+              f"build index {index_seconds * 1000:7.2f} ms   ET.parse XML {parse_seconds * 1000:9.2f} ms")
+
+        # Lookup by ID
+        rng = random.Random(0)
+        ids = [str(100000 + rng.randrange(args.entries)) for _ in range(args.lookups)]
+        root = ET.parse(xml_path).getroot()
+        for elem in root.iter():
+            if "}" in elem.tag:
+                elem.tag = elem.tag.split("}", 1)[1]
+
+        def scan_lookups(id_list):
+            for entry_id in id_list:
+                for entry in root.findall(".//Entry"):
+                    if entry.get("Id") == entry_id:
+                        break
+
+        def index_lookups(id_list):
+            get = subp.get
+            for entry_id in id_list:
+                get(entry_id)
+
+        # Full scans are slow, so time them on a slice of the IDs
+        scan_ids = ids[:max(1, len(ids) // 20)]
+        scan_seconds = best_of(lambda: scan_lookups(scan_ids), 1) / len(scan_ids)
+        index_seconds = best_of(lambda: index_lookups(ids), args.repeat) / len(ids)
+        print(f"  lookup    findall scan {scan_seconds * 1e6:10.1f} us/ID   "
+              f"index {index_seconds * 1e6:8.3f} us/ID   ({scan_seconds / index_seconds:,.0f}x)")
+
+        # Bulk update
+        translations = translations_for(args.entries, args.ratio)
+
+        def tree_update():
+            count = 0
+            for entry in root.findall(".//Entry"):
+                entry_id = entry.get("Id")
+                if entry_id in translations:
+                    for line in entry.find("Lines").findall("Line"):
+                        line.set("Text", translations[entry_id])
+                        count += 1
+            return count
+
+        tree_seconds = best_of(tree_update, args.repeat)
+        join_seconds = best_of(lambda: subp.apply_translations(translations, collect_ids=False),
+                               args.repeat)
+        print(f"  update    findall walk {tree_seconds * 1000:9.2f} ms   "
+              f"dict join {join_seconds * 1000:9.2f} ms   "
+              f"({len(translations)} IDs, {subp.apply_translations(translations, False)[0]} lines)")
+
+
+if __name__ == "__main__":
+    main()
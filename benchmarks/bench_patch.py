@@ -0,0 +1,73 @@
+"""Benchmark: applying a patch to a pack vs merging the full translation file again.
+
+The merge is what the batch pipeline does per pack (read the translation
+file, decode the pack, apply, encode and write); the patch is made from the
+same translated result with foxsubp.patch. Usage (from the repository root):
+
+    python benchmarks/bench_patch.py --entries 30000 --ratio 0.1
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks import corpus as corpus_module
+from foxsubp import codec, patch, translations as translation_formats
+
+
+def best_of(func, repeat):
+    """Fastest of repeat runs, in seconds"""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    # A SUBP pack holds at most 32767 entries (int16 count)
+    parser.add_argument("--entries", type=int, default=30000)
+    parser.add_argument("--ratio", type=float, default=0.1,
+                        help="fraction of entries that receive a translation")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="foxsubp-bench-") as work_dir:
+        shape = corpus_module.CorpusShape(args.entries, translated_ratio=args.ratio)
+        corpus = corpus_module.write_corpus(os.path.join(work_dir, "corpus"), shape)
+        source_path = corpus["packs"][0]
+        merged_path = os.path.join(work_dir, "merged.subp")
+        patched_path = os.path.join(work_dir, "patched.subp")
+        patch_path = os.path.join(work_dir, "pack.patch")
+
+        def merge():
+            translations = translation_formats.load_translations(corpus["translations"])
+            subp = codec.read_subp(source_path)
+            subp.apply_translations(translations, collect_ids=False)
+            codec.write_subp(subp, merged_path)
+
+        def apply():
+            _, ops = patch.read_patch(patch_path)
+            patch.apply_patch_to_file(source_path, ops, patched_path)
+
+        merge_seconds = best_of(merge, args.repeat)
+        diff_seconds = best_of(lambda: patch.diff_files(source_path, merged_path), args.repeat)
+        changes = patch.diff_files(source_path, merged_path)
+        patch.write_patch(patch_path, patch.make_patch(changes))
+        apply_seconds = best_of(apply, args.repeat)
+        with open(merged_path, "rb") as f, open(patched_path, "rb") as g:
+            identical = f.read() == g.read()
+
+        print(f"Pack: {args.entries} entries, {os.path.getsize(source_path) / 1024:.0f} KiB SUBP, "
+              f"{len(changes)} changed entries, patch {os.path.getsize(patch_path) / 1024:.0f} KiB, "
+              f"translations {os.path.getsize(corpus['translations']) / 1024:.0f} KiB")
+        print(f"  full merge   {merge_seconds * 1000:9.2f} ms")
+        print(f"  diff         {diff_seconds * 1000:9.2f} ms")
+        print(f"  apply patch  {apply_seconds * 1000:9.2f} ms   ({merge_seconds / apply_seconds:.1f}x faster, "
+              f"output {'identical' if identical else 'DIFFERENT'})")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
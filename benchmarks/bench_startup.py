@@ -0,0 +1,104 @@
+"""Benchmark: cold start of the headless path, checked against a time budget.
+
+Every scenario runs in fresh interpreters (median of --runs) and is
+reported as time over a bare "python -c pass". The headless modules must
+also import without any GUI module (tkinter, Translator.py). Exit status 1
+when a scenario is over its budget or a GUI module was imported. Usage
+(from the repository root):
+
+    python benchmarks/bench_startup.py --runs 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+HEADLESS_MODULES = ("foxsubp.pipeline", "foxsubp.batch", "foxsubp.fanout", "foxsubp.scan")
+GUI_MODULES = ("tkinter", "_tkinter", "tkinterdnd2", "Translator", "foxsubp.resultview")
+
+MERGE_ONE = """
+import sys
+from foxsubp.pipeline import load_subp_model, save_subp_model
+model = load_subp_model(sys.argv[1])
+model.apply_translations({"100000": "Halo"})
+save_subp_model(model, sys.argv[2])
+"""
+
+# Milliseconds over the bare interpreter; measured on a slow single-CPU VM with room to spare
+SCENARIOS = {
+    "import pipeline": (["-c", "import foxsubp.pipeline"], 40),
+    "import batch": (["-c", "import foxsubp.batch"], 100),
+    "batch --help": (["-m", "foxsubp", "--help"], 120),
+    "merge one pack": (["-c", MERGE_ONE, "{subp}", "{output}"], 80),
+}
+
+
+def time_command(args, runs, env):
+    """Median wall time of runs fresh interpreters, in milliseconds"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=REPO_ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def gui_modules_loaded(env):
+    """GUI modules found in sys.modules after importing every headless module"""
+    code = ("import json, sys\n"
+            + "".join(f"import {name}\n" for name in HEADLESS_MODULES)
+            + "print(json.dumps(sorted(sys.modules)))")
+    completed = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env,
+                               check=True, capture_output=True, text=True)
+    return [name for name in json.loads(completed.stdout)
+            if name.split(".")[0] in GUI_MODULES or name in GUI_MODULES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=11)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply every budget (e.g. 0.5 on a fast machine)")
+    args = parser.parse_args()
+
+    from benchmarks.bench_mmap import write_synthetic_subp
+
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="foxsubp-bench-") as work_dir:
+        subp_path = os.path.join(work_dir, "source.subp")
+        write_synthetic_subp(subp_path, 200, line_length=40)
+        env = dict(os.environ, FOXSUBP_CACHE_DIR=os.path.join(work_dir, "cache"))
+        # Compiled modules are written once, so every scenario measures a warm .pyc cache
+        time_command(["-c", "\n".join(f"import {name}" for name in HEADLESS_MODULES)], 1, env)
+
+        gui = gui_modules_loaded(env)
+        if gui:
+            failed = True
+            print(f"GUI modules imported by the headless path: {', '.join(gui)}")
+
+        interpreter = time_command(["-c", "pass"], args.runs, env)
+        print(f"python -c pass: {interpreter:.1f} ms")
+        for name, (command, budget) in SCENARIOS.items():
+            paths = {"{subp}": subp_path, "{output}": os.path.join(work_dir, "out.subp")}
+            command = [paths.get(part, part) for part in command]
+            overhead = time_command(command, args.runs, env) - interpreter
+            budget *= args.scale
+            over = overhead > budget
+            failed |= over
+            print(f"  {name:16} +{overhead:6.1f} ms  (budget {budget:.0f} ms){'  OVER' if over else ''}")
+
+    if failed:
+        print("Import costs per module: python -X importtime -c \"import foxsubp.batch\"")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Benchmark: translation loader throughput per format.
+
+Writes one synthetic translation file per format, loads each with
+foxsubp.translations and reports lines per second. The "[ID n]" format is
+also timed with the old text-box parser (re.match with an uncompiled pattern
+on a fully split string). Usage (from the repository root):
+
+    python benchmarks/bench_translations.py --lines 10000000
+"""
+import argparse
+import gc
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_xml_merge import peak_rss_kb
+from foxsubp.translations import FORMATS, TranslationReport, load_translations
+
+EXTENSIONS = {"manual": ".txt", "tsv": ".tsv", "csv": ".csv", "jsonl": ".jsonl", "po": ".po"}
+
+
+def write_corpus(path, fmt, lines):
+    """Write `lines` translations (PO uses 4 lines per entry, so fewer entries)"""
+    entries = lines // 4 if fmt == "po" else lines
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for i in range(entries):
+            entry_id = 100000 + i
+            text = f"Terjemahan baris nomor {i}, \"dengan\" tanda baca."
+            if fmt == "manual":
+                f.write(f"[ID {entry_id}] {text}\n")
+            elif fmt == "tsv":
+                f.write(f"{entry_id}\t{text}\n")
+            elif fmt == "csv":
+                quoted = text.replace('"', '""')
+                f.write(f'{entry_id},"{quoted}"\n')
+            elif fmt == "jsonl":
+                f.write(json.dumps({"id": entry_id, "text": text}, ensure_ascii=False) + "\n")
+            else:
+                escaped = text.replace('"', '\\"')
+                f.write(f'msgctxt "{entry_id}"\nmsgid "Line {i}"\nmsgstr "{escaped}"\n\n')
+
+
+def legacy_parse(text_input):
+    """parse_manual_translation as it was before foxsubp.translations"""
+    translations = {}
+    lines = text_input.strip().splitlines()
+    for line in lines:
+        match = re.match(r"\[ID (\d+)\]\s+(.+)", line.strip())
+        if match:
+            entry_id, translated = match.groups()
+            translations[entry_id] = translated
+    return translations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=10000000)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="foxsubp-bench-") as work_dir:
+        for fmt in args.formats:
+            path = os.path.join(work_dir, "translations" + EXTENSIONS[fmt])
+            write_corpus(path, fmt, args.lines)
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+
+            report = TranslationReport()
+            started = time.perf_counter()
+            translations = load_translations(path, report=report)
+            seconds = time.perf_counter() - started
+            print(f"  {fmt:7} {size_mb:8.1f} MiB  {seconds:8.2f}s  "
+                  f"{report.lines / seconds:12,.0f} baris/s  {report.loaded:,} ID  "
+                  f"peak RSS {peak_rss_kb()} KiB")
+
+            if fmt == "manual":
+                del translations
+                gc.collect()
+                started = time.perf_counter()
+                with open(path, "r", encoding="utf-8") as f:
+                    translations = legacy_parse(f.read())
+                seconds = time.perf_counter() - started
+                print(f"  {'legacy':7} {size_mb:8.1f} MiB  {seconds:8.2f}s  "
+                      f"{report.lines / seconds:12,.0f} baris/s  {len(translations):,} ID")
+
+            del translations
+            gc.collect()
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark: batched text validation vs checking every text on its own.
+
+Runs foxsubp.validate over the line texts of a synthetic corpus (with the
+source texts for the markup check) once with the default batch size and
+once with batches of one text, which is what a per-entry loop costs. A
+clean corpus is the common case; --dirty adds a problem to that share of
+the texts. Usage (from the repository root):
+
+    python benchmarks/bench_validate.py --entries 100k --dirty 0.01
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks import corpus as corpus_module
+from foxsubp import codec, validate
+
+# One of each error class the checks look for
+PROBLEMS = ("\x07", "$", "П", "<b>")
+
+
+def best_of(func, repeat):
+    """Fastest of repeat runs, in seconds"""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", default="100k", help="entry count (e.g. 10k, 100k)")
+    parser.add_argument("--dirty", type=float, default=0.0,
+                        help="fraction of texts that get a problem")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="foxsubp-bench-") as work_dir:
+        shape = corpus_module.CorpusShape(corpus_module.parse_count(args.entries))
+        corpus = corpus_module.write_corpus(os.path.join(work_dir, "corpus"), shape)
+        source = []
+        for path in corpus["packs"]:
+            source.extend(codec.read_subp(path).iter_line_texts())
+
+    rng = random.Random(0)
+    texts = [(entry_id, text + rng.choice(PROBLEMS) if rng.random() < args.dirty else text)
+             for entry_id, text in source]
+    rules = validate.ValidationRules(max_line_length=120, max_width=120)
+
+    def run():
+        return validate.validate_texts(texts, source, rules)
+
+    report = run()
+    batched = best_of(run, args.repeat)
+    batch_size = validate.BATCH_SIZE
+    validate.BATCH_SIZE = 1
+    try:
+        single = best_of(run, args.repeat)
+    finally:
+        validate.BATCH_SIZE = batch_size
+
+    print(f"Corpus: {len(texts)} texts, {sum(map(len, (t for _, t in texts))) / 1024:.0f} KiB, "
+          f"{args.dirty:.1%} with a problem ({report.summary()})")
+    print(f"  per text     {single * 1000:9.2f} ms  {len(texts) / single:12,.0f} texts/s")
+    print(f"  batched      {batched * 1000:9.2f} ms  {len(texts) / batched:12,.0f} texts/s"
+          f"   ({single / batched:.1f}x faster)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
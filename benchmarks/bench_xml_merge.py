@@ -0,0 +1,126 @@
+"""Benchmark: ElementTree merge vs streaming (iterparse) merge on a synthetic pack.
+
+Each variant runs in a fresh child process so that peak RSS is measured
+independently. Usage (from the repository root):
+
+    python benchmarks/bench_xml_merge.py --entries 1000000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def write_synthetic_xml(path, entries, lines_per_entry=2, seed=0):
+    """Write a SubpTool-style XML file with the given number of entries"""
+    rng = random.Random(seed)
+    words = ["Snake", "Boss", "Ocelot", "Miller", "target", "extract", "Mother", "Base", "the", "a"]
+    with open(path, "w", encoding="utf-8-sig", newline="\n") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n'
+                '<SubpFile xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                'xmlns:xsd="http://www.w3.org/2001/XMLSchema">\n  <Entries>\n')
+        for i in range(entries):
+            f.write(f'    <Entry Id="{100000 + i}" Priority="0" Flags="0" Unknown="0" AdditionalLength="0">\n'
+                    "      <Lines>\n")
+            for _ in range(lines_per_entry):
+                text = " ".join(rng.choice(words) for _ in range(8))
+                f.write(f'        <Line Text="{text}">\n'
+                        '          <Timing Start="0" End="120" />\n'
+                        "        </Line>\n")
+            f.write("      </Lines>\n    </Entry>\n")
+        f.write("  </Entries>\n</SubpFile>")
+
+
+def translations_for(entries, ratio):
+    """Translate every 1/ratio-th entry"""
+    step = max(1, int(1 / ratio)) if ratio else entries + 1
+    return {str(100000 + i): f"Terjemahan {i}" for i in range(0, entries, step)}
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB (None where unsupported)"""
+    # Linux carries ru_maxrss over from the parent across exec; VmHWM does not
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_variant(variant, xml_path, entries, ratio):
+    """Run one merge variant in this process and return its measurements"""
+    from foxsubp.pipeline import merge_translation_to_xml
+
+    translations = translations_for(entries, ratio)
+    baseline_kb = peak_rss_kb()
+    started = time.perf_counter()
+    count, _, _ = merge_translation_to_xml(xml_path, translations,
+                                           streaming=(variant == "streaming"))
+    seconds = time.perf_counter() - started
+    return {
+        "variant": variant,
+        "seconds": round(seconds, 3),
+        "peak_rss_kb": peak_rss_kb(),
+        "baseline_rss_kb": baseline_kb,
+        "lines_updated": count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--ratio", type=float, default=0.5,
+                        help="fraction of entries that receive a translation")
+    parser.add_argument("--variant", choices=["tree", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--xml", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.xml, args.entries, args.ratio)))
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="foxsubp-bench-")
+    try:
+        source = os.path.join(work_dir, "source.xml")
+        write_synthetic_xml(source, args.entries)
+        size_mb = os.path.getsize(source) / (1024 * 1024)
+        print(f"Synthetic pack: {args.entries} entries, {size_mb:.1f} MiB")
+
+        outputs = {}
+        for variant in ("tree", "streaming"):
+            target = os.path.join(work_dir, f"{variant}.xml")
+            shutil.copyfile(source, target)
+            completed = subprocess.run(
+                [sys.executable, __file__, "--variant", variant, "--xml", target,
+                 "--entries", str(args.entries), "--ratio", str(args.ratio)],
+                capture_output=True, text=True, check=True)
+            result = json.loads(completed.stdout)
+            outputs[variant] = target
+            print(f"  {variant:9} {result['seconds']:8.3f}s  peak RSS "
+                  f"{result['peak_rss_kb']} KiB (startup {result['baseline_rss_kb']} KiB)  "
+                  f"{result['lines_updated']} lines")
+
+        with open(outputs["tree"], "rb") as a, open(outputs["streaming"], "rb") as b:
+            print("  identical output:", a.read() == b.read())
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Synthetic subtitle corpus: SUBP packs, the same entries as one XML file, translations.
+
+The shape (entry count, lines per entry, words per line, share of entries
+translated) is configurable and the output only depends on the shape and
+seed, so every machine benchmarks the same data. A corpus directory holds:
+
+    corpus.json        shape and file list (the corpus is reused when it matches)
+    subp/pack-NNN.subp SUBP packs of at most pack_size entries (the format's limit is 32767)
+    corpus.xml         every entry in one SubpTool-style XML file
+    translations.txt   "[ID n] text" lines for the translated share
+
+Usage (from the repository root):
+
+    python -m benchmarks.corpus /tmp/corpus --entries 100k
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from foxsubp import codec
+from foxsubp.model import SubpEntry, SubpFile, SubpLine, SubpTiming
+
+CORPUS_VERSION = 1
+FIRST_ID = 100000
+MAX_PACK_SIZE = 32767
+_ENTRIES_END = "  </Entries>"
+
+# Latin-1 only, so packs encode with the default (eng) encoding; a few need XML escaping
+WORDS = ("Snake Boss Ocelot Miller Quiet Huey Skull Face Mother Base Afghanistan Africa "
+         "outpost target extract eliminate recover interrogate prisoner soldier guard patrol "
+         "helicopter supply drop weapon rifle fulton intel tape radio mission the a of to in "
+         "on with from is are was will not enemy our your this that now night day "
+         "café señor über naïve & <over> \"Kept\" it's").split()
+TRANSLATED_WORDS = ("target tentara penjaga helikopter senjata misi malam siang markas "
+                    "musuh kita sekarang dengan dari di ke yang tidak akan sudah").split()
+
+
+def parse_count(text):
+    """Entry count from "1000", "10k" or "1m" """
+    text = text.strip().lower()
+    scale = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+class CorpusShape:
+    """Size and shape of a synthetic corpus"""
+
+    def __init__(self, entries, lines_per_entry=(1, 3), words_per_line=(4, 14),
+                 translated_ratio=0.5, pack_size=MAX_PACK_SIZE, seed=0):
+        if not 0 < pack_size <= MAX_PACK_SIZE:
+            raise ValueError(f"pack_size must be 1..{MAX_PACK_SIZE}")
+        self.entries = entries
+        self.lines_per_entry = tuple(lines_per_entry)
+        self.words_per_line = tuple(words_per_line)
+        self.translated_ratio = translated_ratio
+        self.pack_size = pack_size
+        self.seed = seed
+
+    def to_dict(self):
+        return {
+            "version": CORPUS_VERSION,
+            "entries": self.entries,
+            "lines_per_entry": list(self.lines_per_entry),
+            "words_per_line": list(self.words_per_line),
+            "translated_ratio": self.translated_ratio,
+            "pack_size": self.pack_size,
+            "seed": self.seed,
+        }
+
+    @property
+    def pack_count(self):
+        return (self.entries + self.pack_size - 1) // self.pack_size
+
+
+def iter_packs(shape):
+    """Yield one SubpFile per pack, in ID order"""
+    rng = random.Random(shape.seed)
+    for start in range(0, shape.entries, shape.pack_size):
+        pack = SubpFile()
+        for i in range(start, min(start + shape.pack_size, shape.entries)):
+            lines = []
+            for _ in range(rng.randint(*shape.lines_per_entry)):
+                text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(*shape.words_per_line)))
+                timing = SubpTiming(rng.randrange(0, 60000), rng.randrange(500, 6000))
+                lines.append(SubpLine(text.capitalize(), timing))
+            pack.entries.append(SubpEntry(FIRST_ID + i, lines=lines))
+        yield pack
+
+
+def iter_translations(shape):
+    """Yield (id, text) for the translated share of the entries, spread evenly"""
+    rng = random.Random(shape.seed + 1)
+    for i in range(shape.entries):
+        # Bresenham-style spread: exactly round(entries * ratio) entries, evenly spaced
+        if int((i + 1) * shape.translated_ratio) > int(i * shape.translated_ratio):
+            words = " ".join(rng.choice(TRANSLATED_WORDS) for _ in range(rng.randint(3, 12)))
+            yield str(FIRST_ID + i), words.capitalize() + "."
+
+
+def load_corpus(directory):
+    """corpus.json of an existing corpus, or None"""
+    try:
+        with open(os.path.join(directory, "corpus.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_corpus(directory, shape):
+    """Write the corpus for shape into directory (reused if already there) and return its description"""
+    existing = load_corpus(directory)
+    if existing and existing["shape"] == shape.to_dict():
+        return existing
+
+    subp_dir = os.path.join(directory, "subp")
+    os.makedirs(subp_dir, exist_ok=True)
+    for name in os.listdir(subp_dir):
+        os.remove(os.path.join(subp_dir, name))
+
+    packs = []
+    line_count = 0
+    xml_path = os.path.join(directory, "corpus.xml")
+    with open(xml_path, "w", encoding="utf-8-sig", newline="\n") as xml:
+        # The entries of each pack are cut out of its XML and spliced into one document
+        empty = codec.subp_to_xml_string(SubpFile())
+        head, tail = empty[:empty.index(_ENTRIES_END)], empty[empty.index(_ENTRIES_END):]
+        xml.write(head)
+        for number, pack in enumerate(iter_packs(shape)):
+            pack_path = os.path.join(subp_dir, f"pack-{number:03}.subp")
+            codec.write_subp(pack, pack_path)
+            packs.append(pack_path)
+            line_count += sum(len(entry.lines) for entry in pack.entries)
+            text = codec.subp_to_xml_string(pack)
+            xml.write(text[len(head):text.rindex(_ENTRIES_END)])
+        xml.write(tail)
+
+    translations_path = os.path.join(directory, "translations.txt")
+    translated = 0
+    with open(translations_path, "w", encoding="utf-8", newline="\n") as f:
+        for entry_id, text in iter_translations(shape):
+            f.write(f"[ID {entry_id}] {text}\n")
+            translated += 1
+
+    corpus = {
+        "shape": shape.to_dict(),
+        "packs": packs,
+        "xml": xml_path,
+        "translations": translations_path,
+        "translated": translated,
+        "lines": line_count,
+    }
+    # Written last: a corpus interrupted half-way is regenerated next time
+    with open(os.path.join(directory, "corpus.json"), "w", encoding="utf-8") as f:
+        json.dump(corpus, f, indent=1)
+    return corpus
+
+
+def add_shape_arguments(parser):
+    """Command line options describing a CorpusShape (except the entry count)"""
+    parser.add_argument("--lines-per-entry", default="1-3", help="range of lines per entry")
+    parser.add_argument("--words-per-line", default="4-14", help="range of words per line")
+    parser.add_argument("--translated", type=float, default=0.5,
+                        help="share of entries with a translation")
+    parser.add_argument("--pack-size", type=int, default=MAX_PACK_SIZE, help="entries per SUBP pack")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def parse_range(text):
+    low, _, high = text.partition("-")
+    return int(low), int(high or low)
+
+
+def shape_from_args(args, entries):
+    return CorpusShape(entries, parse_range(args.lines_per_entry), parse_range(args.words_per_line),
+                       args.translated, args.pack_size, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--entries", default="10k", help="entry count (1000, 10k, 1m, ...)")
+    add_shape_arguments(parser)
+    args = parser.parse_args()
+    corpus = write_corpus(args.directory, shape_from_args(args, parse_count(args.entries)))
+    size_mb = (sum(os.path.getsize(path) for path in corpus["packs"]) / (1024 * 1024))
+    print(f"{corpus['shape']['entries']} entries, {corpus['lines']} lines in "
+          f"{len(corpus['packs'])} packs ({size_mb:.1f} MiB SUBP, "
+          f"{os.path.getsize(corpus['xml']) / (1024 * 1024):.1f} MiB XML), "
+          f"{corpus['translated']} translations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Benchmark suite: pipeline stages over synthetic corpora, with JSON baselines.
+
+For every size a corpus is generated (benchmarks.corpus) and each case runs
+in a fresh child process, best of --repeat runs:
+
+    parse_translations  parse_manual_translation on the "[ID n]" text
+    extract             SUBP -> XML with the native codec (cold decode cache)
+    extract_tool        SUBP -> XML through SubpTool (tools/fake_subptool.py stands in)
+    merge_xml           merge_translation_to_xml on the single corpus XML
+    merge_subp          apply_translations on the loaded SUBP models
+    write_subp          encode and write the translated SUBP packs
+    write_xml           write the SUBP models as XML
+
+Results can be saved as a baseline and later runs checked against it; the
+exit status is 1 when a case got slower than the tolerance allows. Usage
+(from the repository root):
+
+    python -m benchmarks.suite --sizes 1k,10k,100k --save-baseline benchmarks/baselines/local.json
+    python -m benchmarks.suite --sizes 1k,10k,100k --baseline benchmarks/baselines/local.json
+
+Baselines are only comparable on the same machine and Python version.
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks import corpus as corpus_module
+from foxsubp import profiling
+
+RESULTS_VERSION = 1
+CASES = ("parse_translations", "extract", "extract_tool", "merge_xml", "merge_subp",
+         "write_subp", "write_xml")
+DEFAULT_SIZES = "1k,10k,100k"
+FAKE_SUBP_TOOL = os.path.join(REPO_ROOT, "tools", "fake_subptool.py")
+# Slower than the baseline by more than this share (and MIN_DELTA seconds) is a regression
+DEFAULT_TOLERANCE = 0.25
+MIN_DELTA = 0.01
+
+# ============================================================================
+# CASES (run in the child process)
+# ============================================================================
+def _load_models(corpus):
+    from foxsubp import codec
+    return [codec.read_subp(path) for path in corpus["packs"]]
+
+
+def _read_translations(corpus):
+    from foxsubp import pipeline
+    with open(corpus["translations"], "r", encoding="utf-8") as f:
+        return pipeline.parse_manual_translation(f.read())
+
+
+def prepare_case(case, corpus, work_dir):
+    """Return a setup function for case; setup() does the untimed work and returns the timed one"""
+    from foxsubp import pipeline
+    from foxsubp import codec
+    from foxsubp.cache import DecodeCache
+
+    runs = iter(range(1000000))
+
+    def fresh_dir():
+        path = os.path.join(work_dir, f"run-{next(runs)}")
+        os.makedirs(path)
+        return path
+
+    if case == "parse_translations":
+        with open(corpus["translations"], "r", encoding="utf-8") as f:
+            text = f.read()
+        return lambda: lambda: pipeline.parse_manual_translation(text)
+
+    if case == "extract":
+        def setup():
+            out_dir = fresh_dir()
+            # A cold cache, so every run decodes
+            pipeline.decode_cache = DecodeCache(os.path.join(out_dir, "cache"))
+            return lambda: [pipeline.extract_subp_to_xml(path, out_dir) for path in corpus["packs"]]
+        return setup
+
+    if case == "extract_tool":
+        os.environ[pipeline.SUBP_TOOL_ENV] = FAKE_SUBP_TOOL
+
+        def setup():
+            out_dir = fresh_dir()
+            return lambda: [pipeline.extract_subp_to_xml_with_tool(path, out_dir)
+                            for path in corpus["packs"]]
+        return setup
+
+    translations = _read_translations(corpus)
+    if case == "merge_xml":
+        def setup():
+            output_path = os.path.join(fresh_dir(), "corpus.xml")
+            return lambda: pipeline.merge_translation_to_xml(corpus["xml"], translations,
+                                                               output_path=output_path)
+        return setup
+
+    if case == "merge_subp":
+        def setup():
+            models = _load_models(corpus)
+            return lambda: [model.apply_translations(translations) for model in models]
+        return setup
+
+    models = _load_models(corpus)
+    for model in models:
+        model.apply_translations(translations, collect_ids=False)
+    if case == "write_subp":
+        def setup():
+            out_dir = fresh_dir()
+            return lambda: [pipeline.save_subp_model(model, os.path.join(out_dir, f"{i}.subp"))
+                            for i, model in enumerate(models)]
+        return setup
+
+    if case == "write_xml":
+        def setup():
+            out_dir = fresh_dir()
+            return lambda: [codec.write_subp_xml(model, os.path.join(out_dir, f"{i}.xml"))
+                            for i, model in enumerate(models)]
+        return setup
+
+    raise ValueError(f"Unknown case: {case}")
+
+
+def run_case(case, corpus, repeat):
+    """Run one case in this process and return its measurements"""
+    recorder = profiling.get_recorder()
+    best = None
+    with tempfile.TemporaryDirectory(prefix="foxsubp-bench-") as work_dir:
+        # SubpTool output and fallback notices must not mix with the JSON on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            setup = prepare_case(case, corpus, work_dir)
+            for _ in range(repeat):
+                timed = setup()
+                recorder.drain()
+                # Like timeit: no collector pauses inside the timed part
+                gc.collect()
+                gc.disable()
+                try:
+                    started = time.perf_counter()
+                    timed()
+                    seconds = time.perf_counter() - started
+                finally:
+                    gc.enable()
+                stages = recorder.drain()
+                if best is None or seconds < best[0]:
+                    best = (seconds, stages)
+            if case == "extract_tool":
+                from foxsubp import pipeline
+                pipeline.get_subp_tool_pool().shutdown()
+
+    seconds, stages = best
+    entries = corpus["shape"]["entries"]
+    return {
+        "case": case,
+        "entries": entries,
+        "seconds": round(seconds, 6),
+        "entries_per_second": round(entries / seconds) if seconds else None,
+        "peak_rss_kb": profiling.peak_rss_kb(),
+        "stages": profiling.summarize_stages(stages),
+    }
+
+# ============================================================================
+# BASELINES
+# ============================================================================
+def result_key(case, entries):
+    return f"{case}@{entries}"
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported results version")
+    return data
+
+
+def save_results(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, min_delta=MIN_DELTA):
+    """Compare results with a baseline; returns {key: (ratio, regressed)} for shared keys"""
+    comparison = {}
+    for key, result in results["results"].items():
+        previous = baseline["results"].get(key)
+        if not previous or not previous["seconds"]:
+            continue
+        ratio = result["seconds"] / previous["seconds"]
+        regressed = (ratio > 1 + tolerance
+                     and result["seconds"] - previous["seconds"] > min_delta)
+        comparison[key] = (ratio, regressed)
+    return comparison
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+def run_child(case, corpus_dir, repeat):
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--child-case", case,
+         "--child-corpus", corpus_dir, "--repeat", str(repeat)],
+        cwd=REPO_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{case} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="entry counts, comma separated (1k, 10k, 100k, 1m, ...)")
+    parser.add_argument("--cases", default=",".join(CASES), help="cases to run, comma separated")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case (the fastest counts)")
+    parser.add_argument("--corpus-dir", help="keep generated corpora here for later runs")
+    corpus_module.add_shape_arguments(parser)
+    parser.add_argument("--out", help="write the results as JSON")
+    parser.add_argument("--save-baseline", metavar="JSON", help="write the results as a new baseline")
+    parser.add_argument("--baseline", metavar="JSON", help="check the results against a baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument("--child-case", help=argparse.SUPPRESS)
+    parser.add_argument("--child-corpus", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_case:
+        print(json.dumps(run_case(args.child_case, corpus_module.load_corpus(args.child_corpus),
+                                  args.repeat)))
+        return 0
+
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case: {', '.join(sorted(unknown))}")
+    sizes = [corpus_module.parse_count(size) for size in args.sizes.split(",")]
+    baseline = load_results(args.baseline) if args.baseline else None
+
+    corpus_root = args.corpus_dir or tempfile.mkdtemp(prefix="foxsubp-corpus-")
+    results = {"version": RESULTS_VERSION,
+               "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+               "machine": machine_info(), "repeat": args.repeat, "results": {}}
+    try:
+        for entries in sizes:
+            shape = corpus_module.shape_from_args(args, entries)
+            results.setdefault("shape", {key: value for key, value in shape.to_dict().items()
+                                         if key != "entries"})
+            corpus_dir = os.path.join(corpus_root, f"entries-{entries}")
+            started = time.perf_counter()
+            corpus = corpus_module.write_corpus(corpus_dir, shape)
+            print(f"Corpus {entries} entries, {corpus['lines']} lines, {len(corpus['packs'])} packs "
+                  f"({time.perf_counter() - started:.1f}s)", flush=True)
+            for case in cases:
+                result = run_child(case, corpus_dir, args.repeat)
+                key = result_key(case, entries)
+                results["results"][key] = result
+                line = (f"  {case:19} {result['seconds']:10.4f}s  {result['entries_per_second'] or 0:>10} "
+                        f"entries/s  peak RSS {result['peak_rss_kb']} KiB")
+                previous = baseline and baseline["results"].get(key)
+                if previous:
+                    line += f"  ({result['seconds'] / max(previous['seconds'], 1e-9) - 1:+.0%} vs baseline)"
+                print(line, flush=True)
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_root, ignore_errors=True)
+
+    if args.out:
+        save_results(args.out, results)
+    if args.save_baseline:
+        save_results(args.save_baseline, results)
+        print(f"Baseline saved: {args.save_baseline}")
+    if baseline is None:
+        return 0
+
+    if baseline.get("machine") != results["machine"]:
+        print("Warning: the baseline was recorded on another machine or Python version")
+    comparison = compare(results, baseline, args.tolerance)
+    regressions = [key for key, (_, regressed) in comparison.items() if regressed]
+    for key in regressions:
+        print(f"REGRESSION {key}: {comparison[key][0]:.2f}x the baseline time")
+    print(f"{len(comparison)} cases compared, {len(regressions)} regressions "
+          f"(tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
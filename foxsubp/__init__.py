@@ -0,0 +1 @@
+"""Core processing for Fox Engine subtitle packs (.subp) used by Translator.py"""
@@ -0,0 +1,5 @@
+import sys
+
+from foxsubp.batch import main
+
+sys.exit(main())
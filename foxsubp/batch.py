@@ -0,0 +1,643 @@
+"""Headless batch translation of a directory tree of SUBP/LNG/XML files.
+
+Runs the same pipeline as the GUI "Gabungkan & Timpa" button (SUBP and LNG
+files are loaded once, translated in the entry model and encoded; XML files
+go through merge_translation_to_xml), once per file, spread over a process
+pool:
+
+    python -m foxsubp --translations id.txt --workers 8 data/subp/
+"""
+import concurrent.futures
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+from foxsubp import (ffnt, incremental, lng, memory, profiling, scan, translations as translation_formats,
+                     validate)
+from foxsubp.profiling import stage
+from foxsubp.workspace import workspaces
+
+SUPPORTED_EXTENSIONS = (".subp", ".xml") + lng.LNG_EXTENSIONS
+# Per-file translations are looked up with these extensions, in order
+TRANSLATION_EXTENSIONS = (".txt", ".tsv", ".csv", ".jsonl", ".po")
+
+# Translations shared by every job, set once per worker process
+_shared_translations = None
+
+
+class JobResult:
+    """Outcome of translating one file"""
+
+    def __init__(self, input_path, output_path, status, count=0, seconds=0.0, error="",
+                 input_hash=None, translations_hash=None, output_hash=None, warnings=None,
+                 missing_glyphs=None, memory_pairs=None, stages=None, profile_path=None,
+                 validation=None, options=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.status = status
+        self.count = count
+        self.seconds = seconds
+        self.error = error
+        self.input_hash = input_hash
+        self.translations_hash = translations_hash
+        self.output_hash = output_hash
+        # Build options the output was made with (see incremental.build_options)
+        self.options = options
+        self.warnings = warnings or []
+        self.missing_glyphs = missing_glyphs
+        # ValidationReport.to_dict() of the merged texts, when validation is on
+        self.validation = validation
+        # (original text, translation) pairs for the translation memory
+        self.memory_pairs = memory_pairs or []
+        # Stages recorded while the job ran (see foxsubp.profiling)
+        self.stages = stages or []
+        self.profile_path = profile_path
+
+    def to_dict(self):
+        return {
+            "input": self.input_path,
+            "output": self.output_path,
+            "status": self.status,
+            "count": self.count,
+            "seconds": round(self.seconds, 6),
+            "error": self.error,
+            "warnings": self.warnings,
+            "missing_glyphs": self.missing_glyphs,
+            "validation": self.validation,
+            "stages": profiling.summarize_stages(self.stages),
+            "profile": self.profile_path,
+        }
+
+# ============================================================================
+# INPUT DISCOVERY
+# ============================================================================
+def find_input_files(input_root):
+    """List all .subp/.lng/.lng2/.xml files under input_root (or input_root itself if it is a file)"""
+    if os.path.isfile(input_root):
+        return [input_root]
+
+    return [entry.path for entry in scan.iter_files(input_root, SUPPORTED_EXTENSIONS)]
+
+
+def load_translation_file(path, report=None):
+    """Read a translation file; the format ([ID n], TSV, CSV, JSONL, PO) follows its extension"""
+    return translation_formats.load_translations(path, report=report)
+
+
+def translation_warnings(report):
+    """One-line warnings for a TranslationReport with duplicates or malformed lines"""
+    if report.ok:
+        return []
+    return [f"{report.source}: {report.duplicate_count} ID duplikat, "
+            f"{report.malformed_count} baris tidak valid"]
+
+
+def get_translation_path(input_path, input_root, translation_root):
+    """Translation file matching input_path when translations come from a directory"""
+    relative = os.path.relpath(input_path, input_root)
+    if relative == ".":
+        relative = os.path.basename(input_path)
+    base = os.path.join(translation_root, os.path.splitext(relative)[0])
+    for extension in TRANSLATION_EXTENSIONS:
+        if os.path.exists(base + extension):
+            return base + extension
+    return base + TRANSLATION_EXTENSIONS[0]
+
+
+def resolve_language(input_path, language=None):
+    """Language a file is built with: the one given, else the one named in its path"""
+    return language or scan.detect_language(input_path)
+
+
+def get_output_path(input_path, input_root, output_root):
+    """Output path mirroring input_root under output_root (or in place)"""
+    if not output_root:
+        return input_path
+    relative = os.path.relpath(input_path, input_root)
+    if relative == ".":
+        relative = os.path.basename(input_path)
+    return os.path.join(output_root, relative)
+
+# ============================================================================
+# WORKER
+# ============================================================================
+def init_worker(translations, trace_memory=False):
+    """Set the shared translation table that translate_file uses without a translation_path.
+
+    run_batch passes it as the process pool initializer; callers that run
+    translate_file in their own process (watch mode) call it directly.
+    """
+    global _shared_translations
+    _shared_translations = translations
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def translate_file(input_path, output_path, profile_dir=None, **kwargs):
+    """Run translate_file_stages as one "job" stage and attach the recorded stages.
+
+    With a profile_dir (default: FOXSUBP_PROFILE), a cProfile dump of the
+    job is written there as well.
+    """
+    recorder = profiling.get_recorder()
+    # Stages left over from an earlier job in this worker belong to nobody
+    recorder.drain()
+    with profiling.profile_job(input_path, profile_dir) as profile:
+        with stage("job", path=input_path):
+            result = translate_file_stages(input_path, output_path, **kwargs)
+    result.stages = recorder.drain()
+    result.profile_path = profile.path
+    return result
+
+
+def translate_file_stages(input_path, output_path, translation_path=None, language=None,
+                          record=None, translations_hash=None, force=False, fonts=None,
+                          require_glyphs=False, input_hash=None, rules=None, require_valid=False):
+    """Merge translations into one SUBP/LNG/XML file and write the result to output_path.
+
+    Unless force is set, the file is not rebuilt when record (its manifest
+    entry) shows the output was already built from the same input and
+    translations ("reused"), or when the translations would not change any
+    line text ("unchanged").
+
+    With fonts (.ffnt paths), translations using characters none of the fonts
+    has a glyph for are reported before anything is written; require_glyphs
+    turns that into an error and leaves the output untouched.
+
+    input_hash, when the caller already knows it (from the scan index),
+    saves hashing the input again.
+
+    With rules (a foxsubp.validate.ValidationRules), translations read here
+    are normalized to NFC and the translations of this file's entries are
+    validated before anything is merged; require_valid turns validation
+    errors into a job error.
+    """
+    from foxsubp.pipeline import load_subp_model, merge_translation_to_xml, save_subp_model
+
+    started = time.perf_counter()
+    warnings = []
+    try:
+        if translation_path is not None:
+            if not os.path.exists(translation_path):
+                return JobResult(input_path, output_path, "skipped",
+                                 seconds=time.perf_counter() - started,
+                                 error=f"File terjemahan tidak ditemukan: {translation_path}")
+            report = translation_formats.TranslationReport()
+            with stage("load_translations", path=translation_path) as s:
+                s.read(os.path.getsize(translation_path))
+                translations = load_translation_file(translation_path, report)
+            warnings = translation_warnings(report)
+            if rules and rules.normalize:
+                with stage("normalize"):
+                    translations, _ = validate.normalize_translations(translations)
+        else:
+            translations = _shared_translations or {}
+
+        is_subp = input_path.lower().endswith(".subp")
+        is_lng = lng.is_lng_path(input_path)
+        if not input_hash:
+            with stage("hash_input") as s:
+                s.read(os.path.getsize(input_path))
+                input_hash = incremental.hash_file(input_path)
+        if not translations_hash:
+            with stage("hash_translations"):
+                translations_hash = incremental.hash_translations(translations)
+
+        options = incremental.build_options(input_path, language)
+        if not force and incremental.is_up_to_date(record, input_hash, translations_hash, output_path,
+                                                   options=options):
+            return JobResult(input_path, output_path, "reused", 0, time.perf_counter() - started,
+                             input_hash=input_hash, translations_hash=translations_hash,
+                             output_hash=record["output"], warnings=warnings, options=options)
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        same_file = os.path.abspath(output_path) == os.path.abspath(input_path)
+
+        # Every job gets its own workspace so parallel jobs never collide
+        with workspaces.create() as workspace:
+            # A SUBP/LNG file is loaded once; change detection, merge and encode share the model
+            if is_subp:
+                model = load_subp_model(input_path, workspace.path, language)
+            elif is_lng:
+                # Keys are kept as stored, so no LangId dictionary is needed to re-encode
+                with stage("decode", path=input_path) as s:
+                    s.read(os.path.getsize(input_path))
+                    model = lng.read_lng(input_path)
+            else:
+                model = None
+
+            missing_glyphs = None
+            if fonts:
+                with stage("check_glyphs"):
+                    entry_ids = {entry_id for entry_id, _
+                                 in incremental.iter_entry_texts(model, input_path)}
+                    glyph_report = ffnt.check_translations(ffnt.load_font_coverage(fonts),
+                                                           translations, entry_ids)
+                if not glyph_report.ok:
+                    missing_glyphs = glyph_report.to_dict()
+                    message = (f"{glyph_report.entry_count} entri memakai karakter tanpa glyph: "
+                               f"{''.join(sorted(glyph_report.characters))}")
+                    if require_glyphs:
+                        return JobResult(input_path, output_path, "error",
+                                         seconds=time.perf_counter() - started, error=message,
+                                         warnings=warnings, missing_glyphs=missing_glyphs)
+                    warnings.append(message)
+
+            validation = None
+            if rules:
+                if language:
+                    rules = rules.for_language(language)
+                with stage("validate"):
+                    source_texts = [(entry_id, text) for entry_id, texts
+                                     in incremental.iter_entry_texts(model, input_path)
+                                     for text in texts]
+                    texts = [(entry_id, translations[entry_id])
+                             for entry_id in dict.fromkeys(entry_id for entry_id, _ in source_texts)
+                             if entry_id in translations]
+                    validation_report = validate.validate_texts(texts, source_texts, rules)
+                validation = validation_report.to_dict()
+                if not validation_report.ok:
+                    message = f"validasi: {validation_report.summary()}"
+                    if require_valid and validation_report.errors:
+                        return JobResult(input_path, output_path, "error",
+                                         seconds=time.perf_counter() - started, error=message,
+                                         warnings=warnings, missing_glyphs=missing_glyphs,
+                                         validation=validation)
+                    warnings.append(message)
+
+            if not force:
+                with stage("check_changes"):
+                    entry_texts = incremental.iter_entry_texts(model, input_path)
+                    _, changed_lines = incremental.count_effective_changes(entry_texts,
+                                                                           translations)
+
+                if not changed_lines:
+                    # Nothing to re-encode: the input already is the output
+                    if not same_file:
+                        with stage("copy", path=output_path) as s:
+                            shutil.copy2(input_path, output_path)
+                            s.wrote(os.path.getsize(output_path))
+                    return JobResult(input_path, output_path, "unchanged", 0,
+                                     time.perf_counter() - started, input_hash=input_hash,
+                                     translations_hash=translations_hash, output_hash=input_hash,
+                                     warnings=warnings, missing_glyphs=missing_glyphs,
+                                     validation=validation, options=options)
+
+            # Original texts are taken before the model is updated
+            with stage("collect_memory_pairs"):
+                pairs = memory.collect_pairs(incremental.iter_entry_texts(model, input_path),
+                                             translations)
+            if is_subp or is_lng:
+                with stage("apply"):
+                    count, _ = model.apply_translations(translations, collect_ids=False)
+            if is_subp:
+                save_subp_model(model, output_path, language=language)
+            elif is_lng:
+                with stage("write", path=output_path) as s:
+                    lng.write_lng(model, output_path)
+                    s.wrote(os.path.getsize(output_path))
+            else:
+                count, _, _ = merge_translation_to_xml(input_path, translations,
+                                                       output_path=output_path)
+
+        with stage("hash_output") as s:
+            s.read(os.path.getsize(output_path))
+            output_hash = incremental.hash_file(output_path)
+        return JobResult(input_path, output_path, "ok", count, time.perf_counter() - started,
+                         input_hash=input_hash, translations_hash=translations_hash,
+                         output_hash=output_hash, warnings=warnings,
+                         missing_glyphs=missing_glyphs, memory_pairs=pairs, validation=validation,
+                         options=options)
+
+    except Exception as e:
+        return JobResult(input_path, output_path, "error",
+                         seconds=time.perf_counter() - started, error=str(e))
+
+# ============================================================================
+# BATCH RUNNER
+# ============================================================================
+def get_manifest_path(input_root, output_root):
+    """Default manifest location: the root of the output tree"""
+    root = output_root or (input_root if os.path.isdir(input_root) else os.path.dirname(input_root))
+    return os.path.join(root, incremental.MANIFEST_NAME)
+
+
+def get_index_path(input_root, output_root):
+    """Default scan index location, next to the manifest"""
+    return os.path.join(os.path.dirname(get_manifest_path(input_root, output_root)),
+                        scan.INDEX_NAME)
+
+
+def run_batch(input_root, translation_source, output_root=None, workers=None,
+              language=None, on_result=None, manifest_path=None, force=False,
+              translation_report=None, fonts=None, require_glyphs=False, index_path=None,
+              memory_path=None, profile_dir=None, trace_memory=False, rules=None,
+              require_valid=False):
+    """Translate every SUBP/LNG/XML file under input_root on a process pool.
+
+    With a manifest_path, files whose input and translations did not change
+    since the last run are reused, and the manifest is updated afterwards.
+    A shared translation file is checked into translation_report if given,
+    and translations are checked against the glyphs of fonts (see translate_file).
+
+    Without a language, each file uses the one named in its path
+    (resolve_language). With an index_path, input and output files are
+    tracked in a scan index (foxsubp.scan): only files whose size or mtime
+    changed are hashed, and reusable outputs are settled here without
+    starting a job. Jobs are started largest file first.
+
+    With a memory_path, the texts every rebuilt file translated are stored
+    in that translation memory (foxsubp.memory) at the end of the run, each
+    under the language of its file.
+
+    Every result carries the stages its job recorded (foxsubp.profiling);
+    stages of this process stay in its recorder. profile_dir gets a cProfile
+    dump per job, and trace_memory turns on tracemalloc in the workers so
+    stages also record their Python allocation peak.
+
+    With rules (foxsubp.validate), translations are normalized to NFC
+    before they are hashed and every job validates its texts (see
+    translate_file_stages).
+    """
+    index = scan.ScanIndex(index_path) if index_path else None
+    if index:
+        with stage("scan", path=input_root):
+            records = index.scan(input_root, SUPPORTED_EXTENSIONS).files
+    else:
+        records = [{"path": path, "size": os.path.getsize(path), "hash": None}
+                   for path in find_input_files(input_root)]
+    input_root = input_root if os.path.isdir(input_root) else os.path.dirname(input_root)
+    manifest = incremental.BuildManifest(manifest_path) if manifest_path else None
+
+    if os.path.isdir(translation_source):
+        shared = None
+        shared_hash = None
+    else:
+        with stage("load_translations", path=translation_source) as s:
+            s.read(os.path.getsize(translation_source))
+            shared = load_translation_file(translation_source, translation_report)
+        if rules and rules.normalize:
+            with stage("normalize") as s:
+                shared, changed = validate.normalize_translations(shared)
+                s.args["changed"] = len(changed)
+        with stage("hash_translations"):
+            shared_hash = incremental.hash_translations(shared)
+
+    results = []
+    # Target language -> (original text, translation) pairs of its files
+    memory_pairs = {}
+
+    def finish(result):
+        results.append(result)
+        if result.memory_pairs:
+            memory_pairs.setdefault(resolve_language(result.input_path, language), []).extend(
+                result.memory_pairs)
+        result.memory_pairs = []
+        if manifest and result.output_hash:
+            manifest.record(result.output_path, result.input_hash,
+                            result.translations_hash, result.output_hash, result.options)
+        if index and result.status in ("ok", "unchanged"):
+            index.remember(result.output_path, result.output_hash)
+        if on_result:
+            on_result(result)
+
+    jobs = []
+    for record in scan.largest_first(records):
+        path = record["path"]
+        output_path = get_output_path(path, input_root, output_root)
+        build_record = manifest.get(output_path) if manifest else None
+        # Resolved from the path alone, so the scan index or watch mode never change the output
+        file_language = resolve_language(path, language)
+        options = incremental.build_options(path, file_language)
+        if (index and shared is not None and not force
+                and incremental.is_up_to_date(build_record, record["hash"], shared_hash,
+                                              output_path, index.file_hash, options)):
+            finish(JobResult(path, output_path, "reused", input_hash=record["hash"],
+                             translations_hash=shared_hash, output_hash=build_record["output"],
+                             options=options))
+            continue
+        jobs.append({
+            "input_path": path,
+            "output_path": output_path,
+            "translation_path": (get_translation_path(path, input_root, translation_source)
+                                 if shared is None else None),
+            "language": file_language,
+            "record": build_record,
+            "translations_hash": shared_hash,
+            "force": force,
+            "fonts": fonts,
+            "require_glyphs": require_glyphs,
+            "input_hash": record["hash"],
+            "profile_dir": profile_dir,
+            "rules": rules,
+            "require_valid": require_valid,
+        })
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                initializer=init_worker,
+                                                initargs=(shared, trace_memory)) as executor:
+        futures = [executor.submit(translate_file, **job) for job in jobs]
+        for future in concurrent.futures.as_completed(futures):
+            finish(future.result())
+
+    with stage("save_state"):
+        if manifest:
+            manifest.save()
+        if index:
+            index.save()
+    if memory_path and memory_pairs:
+        try:
+            with stage("memory_add"):
+                for file_language, pairs in memory_pairs.items():
+                    with memory.TranslationMemory(memory_path, file_language) as translation_memory:
+                        translation_memory.add(pairs)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            print(f"Memori terjemahan tidak diperbarui: {e}", file=sys.stderr)
+    results.sort(key=lambda r: r.input_path)
+    return results
+
+
+def format_result(result):
+    """One line per file for the progress log"""
+    line = f"[{result.status:9}] {result.seconds:8.3f}s  {result.count:6} baris  {result.input_path}"
+    if result.error:
+        line += f"\n            {result.error}"
+    for warning in result.warnings:
+        line += f"\n            peringatan: {warning}"
+    return line
+
+
+def summarize(results, wall_seconds, workers):
+    """Aggregate statistics for the summary report"""
+    statuses = {}
+    for result in results:
+        statuses[result.status] = statuses.get(result.status, 0) + 1
+    busy = sum(r.seconds for r in results)
+    slowest = max(results, key=lambda r: r.seconds) if results else None
+    return {
+        "files": len(results),
+        "ok": statuses.get("ok", 0),
+        "unchanged": statuses.get("unchanged", 0),
+        "reused": statuses.get("reused", 0),
+        "skipped": statuses.get("skipped", 0),
+        "errors": statuses.get("error", 0),
+        "lines_updated": sum(r.count for r in results),
+        "workers": workers,
+        "wall_seconds": round(wall_seconds, 6),
+        "busy_seconds": round(busy, 6),
+        "files_per_second": round(len(results) / wall_seconds, 3) if wall_seconds else 0.0,
+        "slowest": slowest.input_path if slowest else None,
+        "slowest_seconds": round(slowest.seconds, 6) if slowest else 0.0,
+        "validation_errors": sum(r.validation["errors"] for r in results if r.validation),
+        "validation_warnings": sum(r.validation["warnings"] for r in results if r.validation),
+    }
+
+
+def format_summary(summary):
+    """Human readable summary report"""
+    lines = [
+        "",
+        "Ringkasan:",
+        f"  File diproses     : {summary['files']} "
+        f"(ok {summary['ok']}, dilewati {summary['skipped']}, error {summary['errors']})",
+        f"  Tidak dibangun    : {summary['unchanged'] + summary['reused']} "
+        f"(tanpa perubahan {summary['unchanged']}, dipakai ulang {summary['reused']})",
+        f"  Baris diperbarui  : {summary['lines_updated']}",
+        f"  Worker            : {summary['workers']}",
+        f"  Waktu total       : {summary['wall_seconds']:.3f}s "
+        f"(kerja {summary['busy_seconds']:.3f}s, {summary['files_per_second']} file/s)",
+        f"  File paling lambat: {summary['slowest']} ({summary['slowest_seconds']:.3f}s)",
+    ]
+    if summary["validation_errors"] or summary["validation_warnings"]:
+        lines.append(f"  Validasi          : {summary['validation_errors']} error, "
+                     f"{summary['validation_warnings']} peringatan")
+    return "\n".join(lines)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+def build_parser():
+    """Argument parser for python -m foxsubp"""
+    # Only the command line needs argparse; pool workers importing this module do not
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="python -m foxsubp",
+        description="Gabungkan terjemahan ke semua file SUBP/LNG/XML dalam sebuah folder tanpa GUI.")
+    parser.add_argument("input", help="file atau folder berisi file .subp/.lng/.lng2/.xml")
+    parser.add_argument("-t", "--translations", required=True,
+                        help="file terjemahan (.txt \"[ID n] teks\", .tsv, .csv, .jsonl, .po), "
+                             "atau folder berisi <nama file>.<ekstensi> untuk tiap file input")
+    parser.add_argument("-o", "--output-dir",
+                        help="folder output (default: timpa file input)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="jumlah proses worker (default: jumlah CPU)")
+    parser.add_argument("-l", "--lang",
+                        help="kode bahasa SubpTool untuk encoding teks (rus, jpn, ara, por, ...)")
+    parser.add_argument("--manifest",
+                        help="file manifest build inkremental (default: "
+                             f"{incremental.MANIFEST_NAME} di folder output)")
+    parser.add_argument("--no-manifest", action="store_true",
+                        help="jangan baca/tulis manifest build inkremental")
+    parser.add_argument("--index",
+                        help="file indeks pindaian (default: "
+                             f"{scan.INDEX_NAME} di folder output)")
+    parser.add_argument("--no-index", action="store_true",
+                        help="jangan baca/tulis indeks pindaian (hash ulang semua file)")
+    parser.add_argument("--tm", metavar="SQLITE",
+                        help="memori terjemahan yang diisi dari hasil penggabungan (default: "
+                             f"{memory.TM_FILE_NAME} di folder data pengguna)")
+    parser.add_argument("--no-tm", action="store_true",
+                        help="jangan simpan teks terjemahan ke memori terjemahan")
+    parser.add_argument("--font", action="append", dest="fonts", metavar="FFNT",
+                        help="periksa apakah semua karakter terjemahan ada glyph-nya di font "
+                             ".ffnt ini (boleh diulang)")
+    parser.add_argument("--require-glyphs", action="store_true",
+                        help="jangan tulis file yang terjemahannya memakai karakter tanpa glyph")
+    parser.add_argument("--validate", action="store_true",
+                        help="normalisasi teks ke Unicode NFC lalu periksa karakter kontrol, encoding "
+                             "dan token markup (dibandingkan dengan teks sumber) sebelum digabung")
+    validate.add_rule_arguments(parser)
+    parser.add_argument("--require-valid", action="store_true",
+                        help="jangan tulis file yang teksnya gagal validasi")
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="bangun ulang semua file walaupun tidak ada perubahan")
+    parser.add_argument("--report", help="simpan laporan JSON ke file ini")
+    parser.add_argument("--trace", metavar="JSON",
+                        help="simpan waktu tiap tahap sebagai trace Chrome (chrome://tracing, "
+                             f"Perfetto); default: ${profiling.TRACE_PATH_ENV}")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="simpan dump cProfile tiap file ke folder ini "
+                             f"(default: ${profiling.PROFILE_DIR_ENV})")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="ukur puncak alokasi Python tiap tahap dengan tracemalloc (lebih lambat)")
+    parser.add_argument("--stages", action="store_true",
+                        help="tampilkan total waktu dan byte per tahap")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="jangan tampilkan hasil per file")
+    return parser
+
+
+def main(argv=None):
+    """Entry point for python -m foxsubp"""
+    args = build_parser().parse_args(argv)
+    if not os.path.exists(args.input):
+        print(f"Input tidak ditemukan: {args.input}", file=sys.stderr)
+        return 2
+    if not os.path.exists(args.translations):
+        print(f"Sumber terjemahan tidak ditemukan: {args.translations}", file=sys.stderr)
+        return 2
+    if args.fonts:
+        try:
+            coverage = ffnt.load_font_coverage(args.fonts)
+        except (OSError, ffnt.FfntFormatError) as e:
+            print(f"Font tidak bisa dibaca: {e}", file=sys.stderr)
+            return 2
+        print(f"Font: {len(coverage)} karakter dari {', '.join(args.fonts)}")
+
+    workers = max(1, args.workers or 1)
+    on_result = None if args.quiet else (lambda result: print(format_result(result), flush=True))
+
+    started = time.perf_counter()
+    manifest_path = None
+    if not args.no_manifest:
+        manifest_path = args.manifest or get_manifest_path(args.input, args.output_dir)
+    index_path = None
+    if not args.no_index:
+        index_path = args.index or get_index_path(args.input, args.output_dir)
+    rules = None
+    if args.validate or args.require_valid or args.max_line_length or args.max_width:
+        rules = validate.rules_from_args(args, args.lang)
+    translation_report = translation_formats.TranslationReport()
+    results = run_batch(args.input, args.translations, args.output_dir, workers,
+                        args.lang, on_result, manifest_path, args.force, translation_report,
+                        args.fonts, args.require_glyphs, index_path,
+                        None if args.no_tm else args.tm or memory.get_default_tm_path(),
+                        args.profile or profiling.get_profile_dir(), args.trace_memory,
+                        rules, args.require_valid)
+    if translation_report.lines and not translation_report.ok:
+        print(translation_report.format())
+    summary = summarize(results, time.perf_counter() - started, workers)
+    print(format_summary(summary))
+    stages = profiling.get_recorder().drain()
+    for result in results:
+        stages.extend(result.stages)
+    if args.stages:
+        print(profiling.format_stages(profiling.summarize_stages(stages)))
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "stages": profiling.summarize_stages(stages),
+                       "files": [r.to_dict() for r in results],
+                       "translations": translation_report.to_dict()},
+                      f, indent=2, ensure_ascii=False)
+    trace_path = args.trace or os.environ.get(profiling.TRACE_PATH_ENV)
+    if trace_path:
+        profiling.write_chrome_trace(trace_path, stages)
+
+    return 1 if summary["errors"] else 0
@@ -0,0 +1,212 @@
+"""On-disk cache of decoded SUBP files keyed by a content hash.
+
+Re-opening a pack that was decoded before costs one read, one hash and one
+unpickle. Entries are stored as plain tuples (compact and fast to load) in
+one file per key, and the cache is kept under a size limit by evicting the
+least recently used files.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+from foxsubp import codec
+
+# Optional faster hash; blake2b from hashlib is used when xxhash is missing
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+CACHE_DIR_ENV = "FOXSUBP_CACHE_DIR"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_EXTENSION = ".subpcache"
+# Bump when the stored layout changes so stale files are never loaded
+CACHE_FORMAT_VERSION = 1
+
+
+def content_hash(data):
+    """Fast 128-bit hex digest of a bytes-like object"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def get_default_cache_dir():
+    """Per-user cache directory, overridable with FOXSUBP_CACHE_DIR"""
+    configured = os.environ.get(CACHE_DIR_ENV)
+    if configured:
+        return configured
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "foxsubp", "decoded")
+
+
+def pack_entries(subp):
+    """Turn a SubpFile into nested tuples for pickling"""
+    return tuple(
+        (entry.subtitle_id, entry.priority, entry.flags, entry.unknown, entry.additional_length,
+         tuple((line.text, None, None) if line.timing is None
+               else (line.text, line.timing.start, line.timing.end)
+               for line in entry.lines))
+        for entry in subp.entries)
+
+
+def unpack_entries(packed):
+    """Rebuild a SubpFile from pack_entries output"""
+    entry_type, line_type, timing_type = codec.SubpEntry, codec.SubpLine, codec.SubpTiming
+    return codec.SubpFile([
+        entry_type(subtitle_id, priority, flags, unknown, additional_length,
+                   [line_type(text, None if start is None else timing_type(start, end))
+                    for text, start, end in lines])
+        for subtitle_id, priority, flags, unknown, additional_length, lines in packed])
+
+
+class DecodeCache:
+    """Size-bounded LRU cache of decoded SUBP files"""
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or get_default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total_bytes = None
+        self._lock = threading.Lock()
+
+    def key_for(self, data, encoding=codec.DEFAULT_ENCODING):
+        """Cache key for raw SUBP bytes decoded with encoding"""
+        return f"{content_hash(data)}-{encoding}-v{CACHE_FORMAT_VERSION}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + CACHE_EXTENSION)
+
+    def get(self, key):
+        """Return the cached SubpFile for key, or None"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                packed = pickle.load(f)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            # Truncated or foreign file: drop it and treat as a miss
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            # Mark as recently used for LRU eviction
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return unpack_entries(packed)
+
+    def put(self, key, subp):
+        """Store a decoded SubpFile under key"""
+        path = self._path(key)
+        data = pickle.dumps(pack_entries(subp), protocol=pickle.HIGHEST_PROTOCOL)
+
+        # A cache that cannot be written (read-only home, full disk) is just skipped
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            self._remove(temp_path)
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total()
+            else:
+                self._total_bytes += len(data)
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def load_subp(self, subp_path, encoding=codec.DEFAULT_ENCODING):
+        """Map a .subp file, hash it and decode it only on a cache miss"""
+        with codec.map_file(subp_path) as view:
+            key = self.key_for(view, encoding)
+            subp = self.get(key)
+            if subp is None:
+                subp = codec.decode_subp(view, encoding)
+                self.put(key, subp)
+        return subp
+
+    def _files(self):
+        """(mtime, size, path) of every cache file"""
+        found = []
+        if not os.path.isdir(self.cache_dir):
+            return found
+        for bucket in os.scandir(self.cache_dir):
+            if not bucket.is_dir():
+                continue
+            for item in os.scandir(bucket.path):
+                if item.name.endswith(CACHE_EXTENSION):
+                    try:
+                        st = item.stat()
+                    except OSError:
+                        continue
+                    found.append((st.st_mtime, st.st_size, item.path))
+        return found
+
+    def _scan_total(self):
+        return sum(size for _, size, _ in self._files())
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def evict(self):
+        """Delete least recently used files until the cache is back under 90% of its limit"""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._total_bytes = total
+            self.evictions += evicted
+
+    def clear(self):
+        """Remove every cached file"""
+        for _, _, path in self._files():
+            self._remove(path)
+        with self._lock:
+            self._total_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes": self._total_bytes if self._total_bytes is not None else self._scan_total(),
+                "max_bytes": self.max_bytes,
+            }
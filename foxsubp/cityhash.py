@@ -0,0 +1,161 @@
+"""Pure-Python CityHash64 (v1.0.3, the version bundled as FoxEngine/CityHash.dll).
+
+Fox Engine identifies language strings by a 32-bit StrCode of their key
+name. Only the 64-bit hash is needed for that, so the 32/128-bit variants of
+the DLL are not ported. All arithmetic is done on Python ints masked to 64
+bits, and 64-bit words are read little-endian like the DLL does on x86.
+"""
+import struct
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+K0 = 0xC3A5C85C97CB3127
+K1 = 0xB492B66FBE98F273
+K2 = 0x9AE16A3B2F90404F
+K3 = 0xC949D7C7509E6557
+KMUL = 0x9DDFEA08EB382D69
+
+_U64 = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+
+
+def _fetch64(data, pos):
+    return _U64.unpack_from(data, pos)[0]
+
+
+def _fetch32(data, pos):
+    return _U32.unpack_from(data, pos)[0]
+
+
+def _rotate(value, shift):
+    """Rotate right; shift 0 leaves the value unchanged"""
+    if shift == 0:
+        return value
+    return ((value >> shift) | (value << (64 - shift))) & MASK64
+
+
+def _shift_mix(value):
+    return value ^ (value >> 47)
+
+
+def hash_len16(u, v):
+    """Hash128to64 of the pair (u, v)"""
+    a = ((u ^ v) * KMUL) & MASK64
+    a ^= a >> 47
+    b = ((v ^ a) * KMUL) & MASK64
+    b ^= b >> 47
+    return (b * KMUL) & MASK64
+
+
+def _hash_len0to16(data, length):
+    if length > 8:
+        a = _fetch64(data, 0)
+        b = _fetch64(data, length - 8)
+        # RotateByAtLeast1: length is 9..16 here, so the shift is never 0
+        c = (b + length) & MASK64
+        return hash_len16(a, ((c >> length) | (c << (64 - length))) & MASK64) ^ b
+    if length >= 4:
+        a = _fetch32(data, 0)
+        return hash_len16((length + (a << 3)) & MASK64, _fetch32(data, length - 4))
+    if length > 0:
+        a = data[0]
+        b = data[length >> 1]
+        c = data[length - 1]
+        y = (a + (b << 8)) & 0xFFFFFFFF
+        z = (length + (c << 2)) & 0xFFFFFFFF
+        return (_shift_mix(((y * K2) ^ (z * K3)) & MASK64) * K2) & MASK64
+    return K2
+
+
+def _hash_len17to32(data, length):
+    a = (_fetch64(data, 0) * K1) & MASK64
+    b = _fetch64(data, 8)
+    c = (_fetch64(data, length - 8) * K2) & MASK64
+    d = (_fetch64(data, length - 16) * K0) & MASK64
+    return hash_len16((_rotate((a - b) & MASK64, 43) + _rotate(c, 30) + d) & MASK64,
+                      (a + _rotate(b ^ K3, 20) - c + length) & MASK64)
+
+
+def _weak_hash_len32_with_seeds(data, pos, a, b):
+    w = _fetch64(data, pos)
+    x = _fetch64(data, pos + 8)
+    y = _fetch64(data, pos + 16)
+    z = _fetch64(data, pos + 24)
+    a = (a + w) & MASK64
+    b = _rotate((b + a + z) & MASK64, 21)
+    c = a
+    a = (a + x + y) & MASK64
+    b = (b + _rotate(a, 44)) & MASK64
+    return (a + z) & MASK64, (b + c) & MASK64
+
+
+def _hash_len33to64(data, length):
+    z = _fetch64(data, 24)
+    a = (_fetch64(data, 0) + (length + _fetch64(data, length - 16)) * K0) & MASK64
+    b = _rotate((a + z) & MASK64, 52)
+    c = _rotate(a, 37)
+    a = (a + _fetch64(data, 8)) & MASK64
+    c = (c + _rotate(a, 7)) & MASK64
+    a = (a + _fetch64(data, 16)) & MASK64
+    vf = (a + z) & MASK64
+    vs = (b + _rotate(a, 31) + c) & MASK64
+    a = (_fetch64(data, 16) + _fetch64(data, length - 32)) & MASK64
+    z = _fetch64(data, length - 8)
+    b = _rotate((a + z) & MASK64, 52)
+    c = _rotate(a, 37)
+    a = (a + _fetch64(data, length - 24)) & MASK64
+    c = (c + _rotate(a, 7)) & MASK64
+    a = (a + _fetch64(data, length - 16)) & MASK64
+    wf = (a + z) & MASK64
+    ws = (b + _rotate(a, 31) + c) & MASK64
+    r = _shift_mix(((vf + ws) * K2 + (wf + vs) * K0) & MASK64)
+    return (_shift_mix((r * K0 + vs) & MASK64) * K2) & MASK64
+
+
+def city_hash_64(data):
+    """CityHash64 of a bytes-like object"""
+    length = len(data)
+    if length <= 32:
+        if length <= 16:
+            return _hash_len0to16(data, length)
+        return _hash_len17to32(data, length)
+    if length <= 64:
+        return _hash_len33to64(data, length)
+
+    x = _fetch64(data, length - 40)
+    y = (_fetch64(data, length - 16) + _fetch64(data, length - 56)) & MASK64
+    z = hash_len16((_fetch64(data, length - 48) + length) & MASK64, _fetch64(data, length - 24))
+    v = _weak_hash_len32_with_seeds(data, length - 64, length, z)
+    w = _weak_hash_len32_with_seeds(data, length - 32, (y + K1) & MASK64, x)
+    x = (x * K1 + _fetch64(data, 0)) & MASK64
+
+    pos = 0
+    remaining = (length - 1) & ~63
+    while True:
+        x = (_rotate((x + y + v[0] + _fetch64(data, pos + 8)) & MASK64, 37) * K1) & MASK64
+        y = (_rotate((y + v[1] + _fetch64(data, pos + 48)) & MASK64, 42) * K1) & MASK64
+        x ^= w[1]
+        y = (y + v[0] + _fetch64(data, pos + 40)) & MASK64
+        z = (_rotate((z + w[0]) & MASK64, 33) * K1) & MASK64
+        v = _weak_hash_len32_with_seeds(data, pos, (v[1] * K1) & MASK64, (x + w[0]) & MASK64)
+        w = _weak_hash_len32_with_seeds(data, pos + 32, (z + w[1]) & MASK64,
+                                        (y + _fetch64(data, pos + 16)) & MASK64)
+        z, x = x, z
+        pos += 64
+        remaining -= 64
+        if remaining == 0:
+            break
+
+    return hash_len16((hash_len16(v[0], w[0]) + _shift_mix(y) * K1 + z) & MASK64,
+                      (hash_len16(v[1], w[1]) + x) & MASK64)
+
+
+def city_hash_64_with_seeds(data, seed0, seed1):
+    """CityHash64WithSeeds of a bytes-like object"""
+    return hash_len16((city_hash_64(data) - seed0) & MASK64, seed1)
+
+
+def str_code32(text):
+    """32-bit StrCode of a string key, as LangTool computes it for .lng files"""
+    seed1 = ((ord(text[0]) << 16) + len(text)) if text else 0
+    return city_hash_64_with_seeds((text + "\0").encode("utf-8"), K2, seed1) & 0xFFFFFFFF
@@ -0,0 +1,431 @@
+"""Native reader/writer for Fox Engine subtitle pack (.subp) files.
+
+The binary layout mirrors SubpTool 0.2.5 by Atvaark, so a pack encoded here
+is byte-for-byte identical to the one SubpTool.exe writes for the same XML:
+
+    header   int16 magic (0x0113), int16 entry count
+    index    entry count x (uint32 subtitle id, uint32 entry offset)
+    entry    uint16 magic (0x4C01), uint8 line count, uint8 priority,
+             int16 text length, int16 text length + additional length,
+             int16 unknown, int16 flags,
+             line count x (uint16 start, uint16 end),
+             text bytes: lines joined with "$" and terminated by NUL
+"""
+import array
+import contextlib
+import mmap
+import os
+import struct
+import sys
+
+from foxsubp.model import SubpEntry, SubpFile, SubpLine, SubpTiming
+
+# ============================================================================
+# FORMAT CONSTANTS
+# ============================================================================
+FILE_MAGIC = 0x0113
+ENTRY_MAGIC = 0x4C01
+LINE_SEPARATOR = "$"
+
+_HEADER = struct.Struct("<hh")
+_INDEX = struct.Struct("<II")
+_ENTRY_HEADER = struct.Struct("<HBBhhhh")
+_TIMING = struct.Struct("<HH")
+
+# Same language switches SubpTool.exe accepts (-rus, -jpn, ...)
+DEFAULT_ENCODING = "iso-8859-1"
+LANGUAGE_ENCODINGS = {
+    "ara": "utf-8",
+    "eng": DEFAULT_ENCODING,
+    "fre": DEFAULT_ENCODING,
+    "ger": DEFAULT_ENCODING,
+    "ita": DEFAULT_ENCODING,
+    "jpn": "utf-8",
+    "por": "utf-8",
+    "rus": "iso-8859-5",
+    "spa": DEFAULT_ENCODING,
+}
+
+XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+XSD_NAMESPACE = "http://www.w3.org/2001/XMLSchema"
+
+
+class SubpFormatError(ValueError):
+    """Raised when a SUBP file or its XML form cannot be decoded or encoded"""
+
+
+def get_encoding(language=None):
+    """Return the text encoding SubpTool uses for a language code (e.g. "rus" or "-rus")"""
+    if not language:
+        return DEFAULT_ENCODING
+    return LANGUAGE_ENCODINGS.get(language.lstrip("-").lower(), DEFAULT_ENCODING)
+
+# ============================================================================
+# BINARY DECODE / ENCODE
+# ============================================================================
+def _decode_text(raw, encoding, subtitle_id):
+    """Line texts of an entry's text block; bytes the encoding cannot read are an error.
+
+    Nothing is replaced, so encoding the texts again gives back the same bytes.
+    """
+    try:
+        return str(raw, encoding).rstrip("\0").split(LINE_SEPARATOR)
+    except UnicodeDecodeError as e:
+        raise SubpFormatError(f"Teks entry ID {subtitle_id} bukan {encoding}: {e.reason}") from None
+
+
+def _encode_text(texts, encoding, subtitle_id):
+    """Text block of an entry; characters the encoding cannot store are an error"""
+    try:
+        return (LINE_SEPARATOR.join(texts) + "\0").encode(encoding)
+    except UnicodeEncodeError as e:
+        raise SubpFormatError(f"Teks entry ID {subtitle_id} memuat karakter di luar {encoding}: "
+                              f"{e.object[e.start:e.end]!r}") from None
+
+
+def decode_subp(data, encoding=DEFAULT_ENCODING):
+    """Decode SUBP bytes (or any buffer) into a SubpFile"""
+    view = memoryview(data)
+    try:
+        ids, offsets = read_index(view)
+        entries = [_decode_entry(view, offset, subtitle_id, encoding)
+                   for subtitle_id, offset in zip(ids, offsets)]
+    finally:
+        view.release()
+    return SubpFile(entries)
+
+
+def read_index(data):
+    """Entry IDs and offsets of SUBP bytes as two uint32 arrays; no entry is decoded"""
+    with memoryview(data) as view:
+        try:
+            magic, count = _HEADER.unpack_from(view, 0)
+        except struct.error as e:
+            raise SubpFormatError(f"File SUBP terpotong atau rusak: {e}") from None
+        if magic != FILE_MAGIC:
+            raise SubpFormatError(f"Header SUBP tidak valid: 0x{magic & 0xFFFF:04X}")
+        end = _HEADER.size + _INDEX.size * count
+        if count < 0 or end > len(view):
+            raise SubpFormatError("Indeks SUBP terpotong")
+        table = array.array("I")
+        with view[_HEADER.size:end] as raw:
+            table.frombytes(raw)
+    if sys.byteorder != "little":
+        table.byteswap()
+    return table[0::2], table[1::2]
+
+
+def _entry_header(view, offset, subtitle_id):
+    """Checked header fields of the entry at offset, plus the offset just past its text"""
+    try:
+        fields = _ENTRY_HEADER.unpack_from(view, offset)
+    except struct.error as e:
+        raise SubpFormatError(f"File SUBP terpotong atau rusak: {e}") from None
+    magic, line_count, _, text_length, _, _, _ = fields
+    if magic != ENTRY_MAGIC:
+        raise SubpFormatError(f"Entry ID {subtitle_id} tidak valid pada offset {offset}")
+    end = offset + _ENTRY_HEADER.size + _TIMING.size * line_count + text_length
+    if text_length < 0 or end > len(view):
+        raise SubpFormatError(f"Teks entry ID {subtitle_id} terpotong")
+    return fields, end
+
+
+def entry_end(data, offset, subtitle_id=None):
+    """Offset just past the entry stored at offset (its header is checked)"""
+    with memoryview(data) as view:
+        return _entry_header(view, offset, subtitle_id)[1]
+
+
+def decode_entry(data, offset, subtitle_id, encoding=DEFAULT_ENCODING):
+    """Decode the entry stored at offset of SUBP bytes (or a memoryview of them)"""
+    with memoryview(data) as view:
+        return _decode_entry(view, offset, subtitle_id, encoding)
+
+
+def _decode_entry(view, offset, subtitle_id, encoding):
+    """decode_entry over a memoryview.
+
+    Every slice taken is released before returning or raising, so a failed
+    decode never keeps the caller's memory map from closing.
+    """
+    (_, line_count, priority, text_length, total_length,
+     unknown, flags), text_end = _entry_header(view, offset, subtitle_id)
+    pos = offset + _ENTRY_HEADER.size
+    timing_end = pos + _TIMING.size * line_count
+    with view[pos:timing_end] as raw:
+        timings = [SubpTiming(start, end) for start, end in _TIMING.iter_unpack(raw)]
+    with view[timing_end:text_end] as raw:
+        texts = _decode_text(raw, encoding, subtitle_id)
+
+    lines = [SubpLine(texts[i] if i < len(texts) else "", timing)
+             for i, timing in enumerate(timings)]
+    return SubpEntry(subtitle_id, priority, flags, unknown,
+                     total_length - text_length, lines)
+
+
+def encode_subp(subp, encoding=DEFAULT_ENCODING):
+    """Encode a SubpFile into SUBP bytes"""
+    return pack_subp(subp.entries, encode_entries(subp.entries, encoding))
+
+
+def encode_entries(entries, encoding=DEFAULT_ENCODING):
+    """Encoded bytes of each entry; pack_subp puts them together"""
+    return [encode_entry(entry, encoding) for entry in entries]
+
+
+def pack_subp(entries, blobs):
+    """SUBP bytes from entries and their encoded bytes (see encode_entries)"""
+    return pack_blobs([entry.subtitle_id for entry in entries], blobs)
+
+
+def pack_blobs(subtitle_ids, blobs):
+    """SUBP bytes from entry IDs and encoded entries (new or copied from another pack)"""
+    count = len(subtitle_ids)
+    if count > 0x7FFF:
+        raise SubpFormatError(f"Terlalu banyak entry untuk satu file SUBP: {count}")
+
+    offset = _HEADER.size + _INDEX.size * count
+    index = []
+    for subtitle_id, blob in zip(subtitle_ids, blobs):
+        index.append(_INDEX.pack(subtitle_id, offset))
+        offset += len(blob)
+
+    return b"".join([_HEADER.pack(FILE_MAGIC, count)] + index + blobs)
+
+
+def encode_entry(entry, encoding=DEFAULT_ENCODING):
+    """Encode one entry including its header, timings and text, as it is stored in a pack"""
+    data = _encode_text([line.text for line in entry.lines], encoding, entry.subtitle_id)
+    total_length = len(data) + entry.additional_length
+    if len(entry.lines) > 0xFF or len(data) > 0x7FFF or not -0x8000 <= total_length <= 0x7FFF:
+        raise SubpFormatError(f"Entry ID {entry.subtitle_id} terlalu panjang untuk format SUBP")
+
+    parts = [_ENTRY_HEADER.pack(ENTRY_MAGIC, len(entry.lines), entry.priority,
+                                len(data), total_length, entry.unknown, entry.flags)]
+    for line in entry.lines:
+        timing = line.timing or SubpTiming()
+        parts.append(_TIMING.pack(timing.start, timing.end))
+    parts.append(data)
+    return b"".join(parts)
+
+
+def entry_line_texts(blob, encoding=DEFAULT_ENCODING, subtitle_id=None):
+    """Line texts of one encoded entry (as encode_entry returns it); timings are not decoded"""
+    _, line_count, _, text_length, _, _, _ = _ENTRY_HEADER.unpack_from(blob)
+    text_start = _ENTRY_HEADER.size + _TIMING.size * line_count
+    texts = _decode_text(blob[text_start:text_start + text_length], encoding, subtitle_id)
+    return (texts + [""] * line_count)[:line_count]
+
+
+def replace_entry_texts(blob, texts, encoding=DEFAULT_ENCODING, subtitle_id=None):
+    """One encoded entry with new line texts; header fields and timings are kept as stored.
+
+    Gives the same bytes as decoding the entry, setting the texts and
+    encoding it again. texts must have one text per line of the entry.
+    """
+    (magic, line_count, priority, text_length, total_length,
+     unknown, flags) = _ENTRY_HEADER.unpack_from(blob)
+    if len(texts) != line_count:
+        raise SubpFormatError(f"Entry ID {subtitle_id} punya {line_count} baris, bukan {len(texts)}")
+    text_start = _ENTRY_HEADER.size + _TIMING.size * line_count
+    data = _encode_text(texts, encoding, subtitle_id)
+    new_total = len(data) + total_length - text_length
+    if len(data) > 0x7FFF or not -0x8000 <= new_total <= 0x7FFF:
+        raise SubpFormatError(f"Entry ID {subtitle_id} terlalu panjang untuk format SUBP")
+    header = _ENTRY_HEADER.pack(magic, line_count, priority, len(data), new_total, unknown, flags)
+    return header + bytes(blob[_ENTRY_HEADER.size:text_start]) + data
+
+
+def splice_entries(data, parts, index=None):
+    """SUBP bytes put together from the entries of a pack and replacement entries.
+
+    parts lists, in output order, ranges of entry positions in data (copied
+    as stored) and (subtitle id, encoded entry) pairs. When data stores its
+    entries in index order, as SubpTool writes them, each range is copied
+    in one slice and only its offsets in the index are shifted. index is
+    the read_index result for data, if already at hand.
+    """
+    pieces = []  # (entry ids, stored offsets or None, bytes)
+    with memoryview(data) as view:
+        source_ids, source_offsets = index or read_index(view)
+        in_order = all(a < b for a, b in zip(source_offsets, source_offsets[1:]))
+        for part in parts:
+            if type(part) is not range:
+                pieces.append(((part[0],), None, part[1]))
+            elif in_order and part:
+                start = source_offsets[part.start]
+                end = _entry_header(view, source_offsets[part.stop - 1], source_ids[part.stop - 1])[1]
+                with view[start:end] as raw:
+                    pieces.append((source_ids[part.start:part.stop],
+                                   source_offsets[part.start:part.stop], bytes(raw)))
+            else:
+                for position in part:
+                    start = source_offsets[position]
+                    end = _entry_header(view, start, source_ids[position])[1]
+                    with view[start:end] as raw:
+                        pieces.append(((source_ids[position],), None, bytes(raw)))
+
+    count = sum(len(entry_ids) for entry_ids, _, _ in pieces)
+    if count > 0x7FFF:
+        raise SubpFormatError(f"Terlalu banyak entry untuk satu file SUBP: {count}")
+    ids = array.array("I")
+    offsets = array.array("I")
+    cursor = _HEADER.size + _INDEX.size * count
+    for entry_ids, stored, block in pieces:
+        ids.extend(entry_ids)
+        if stored is None:
+            offsets.append(cursor)
+        else:
+            shift = cursor - stored[0]
+            offsets.extend([offset + shift for offset in stored])
+        cursor += len(block)
+
+    table = array.array("I", bytes(_INDEX.size * count))
+    table[0::2] = ids
+    table[1::2] = offsets
+    if sys.byteorder != "little":
+        table.byteswap()
+    return b"".join([_HEADER.pack(FILE_MAGIC, count), table.tobytes()]
+                    + [block for _, _, block in pieces])
+
+
+@contextlib.contextmanager
+def map_file(path):
+    """Map a file read-only and yield a memoryview over it; nothing is copied.
+
+    Slices taken from the view must be released (or dropped) before the
+    block ends, otherwise closing the map raises BufferError.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap cannot map an empty file
+            yield memoryview(b"")
+            return
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    try:
+        yield view
+    finally:
+        view.release()
+        mapping.close()
+
+
+def read_subp(path, encoding=DEFAULT_ENCODING):
+    """Decode a .subp file straight from a memory map of it"""
+    with map_file(path) as view:
+        return decode_subp(view, encoding)
+
+
+def write_subp(subp, path, encoding=DEFAULT_ENCODING):
+    """Encode a SubpFile and write it to path"""
+    data = encode_subp(subp, encoding)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+# ============================================================================
+# XML FORM (compatible with SubpTool.exe)
+# ============================================================================
+def _escape_attr(value):
+    """Escape a string for use inside a double-quoted XML attribute"""
+    return (value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace('"', "&quot;").replace("\n", "&#10;").replace("\r", "&#13;")
+            .replace("\t", "&#9;"))
+
+
+def subp_to_xml_string(subp):
+    """Render a SubpFile in the same XML layout SubpTool.exe produces"""
+    out = ['<?xml version="1.0" encoding="utf-8"?>\n',
+           f'<SubpFile xmlns:xsi="{XSI_NAMESPACE}" xmlns:xsd="{XSD_NAMESPACE}">\n',
+           "  <Entries>\n"]
+    for entry in subp.entries:
+        out.append(f'    <Entry Id="{entry.subtitle_id}" Priority="{entry.priority}" '
+                   f'Flags="{entry.flags}" Unknown="{entry.unknown}" '
+                   f'AdditionalLength="{entry.additional_length}">\n')
+        if not entry.lines:
+            out.append("      <Lines />\n")
+            out.append("    </Entry>\n")
+            continue
+        out.append("      <Lines>\n")
+        for line in entry.lines:
+            out.append(f'        <Line Text="{_escape_attr(line.text)}">\n')
+            if line.timing is None:
+                out.append('          <Timing xsi:nil="true" />\n')
+            else:
+                out.append(f'          <Timing Start="{line.timing.start}" End="{line.timing.end}" />\n')
+            out.append("        </Line>\n")
+        out.append("      </Lines>\n")
+        out.append("    </Entry>\n")
+    out.append("  </Entries>\n")
+    out.append("</SubpFile>")
+    return "".join(out)
+
+
+def write_subp_xml(subp, xml_path):
+    """Write a SubpFile as SubpTool-compatible XML"""
+    with open(xml_path, "w", encoding="utf-8-sig", newline="\n") as f:
+        f.write(subp_to_xml_string(subp))
+    return xml_path
+
+
+def _local_name(tag):
+    """Strip the {namespace} prefix from an element or attribute name"""
+    return tag.split("}", 1)[1] if "}" in tag else tag
+
+
+def int_attr(elem, name, default=0):
+    """Read an integer attribute, reporting the entry on bad values"""
+    value = elem.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise SubpFormatError(f"Nilai {name}=\"{value}\" tidak valid") from None
+
+
+def subp_from_xml_root(root):
+    """Build a SubpFile from a parsed SubpTool XML root element"""
+    entries = []
+    nil_attr = f"{{{XSI_NAMESPACE}}}nil"
+    for entry_elem in root.iter():
+        if _local_name(entry_elem.tag) != "Entry":
+            continue
+        lines = []
+        for lines_elem in entry_elem:
+            if _local_name(lines_elem.tag) != "Lines":
+                continue
+            for line_elem in lines_elem:
+                if _local_name(line_elem.tag) != "Line":
+                    continue
+                timing = None
+                for timing_elem in line_elem:
+                    if _local_name(timing_elem.tag) == "Timing" and timing_elem.get(nil_attr) != "true":
+                        timing = SubpTiming(int_attr(timing_elem, "Start"),
+                                            int_attr(timing_elem, "End"))
+                lines.append(SubpLine(line_elem.get("Text", ""), timing))
+        entries.append(SubpEntry(int_attr(entry_elem, "Id"),
+                                 int_attr(entry_elem, "Priority"),
+                                 int_attr(entry_elem, "Flags"),
+                                 int_attr(entry_elem, "Unknown"),
+                                 int_attr(entry_elem, "AdditionalLength"),
+                                 lines))
+    return SubpFile(entries)
+
+
+def read_subp_xml(xml_path):
+    """Parse SubpTool-compatible XML into a SubpFile"""
+    # Imported here: decoding and encoding SUBP files never needs an XML parser
+    import xml.etree.ElementTree as ET
+    try:
+        root = ET.parse(xml_path).getroot()
+    except ET.ParseError as e:
+        raise SubpFormatError(f"XML tidak valid: {e}") from None
+    return subp_from_xml_root(root)
+
+
+def verify_roundtrip(subp_path, encoding=DEFAULT_ENCODING):
+    """Return True if decoding and re-encoding subp_path reproduces it byte-for-byte"""
+    with open(subp_path, "rb") as f:
+        original = f.read()
+    return encode_subp(decode_subp(original, encoding), encoding) == original
@@ -0,0 +1,244 @@
+"""Build many language versions of one pack in a single pass.
+
+The source pack (.subp or SubpTool XML) is decoded once. Each target gets a
+copy-on-write view of the decoded entries (SubpFile.with_translations: only
+translated entries are copied) and is encoded on a process pool. Entries a
+target leaves untranslated are not encoded again either: their bytes are
+encoded once per text encoding and shared by every target.
+
+    python -m foxsubp.fanout data/eng/x.subp -t rus=ru.txt -t ind=id.txt -o out/
+
+writes out/rus/x.subp and out/ind/x.subp. The target name picks the text
+encoding like --lang does (rus, jpn, ara, ...; other names use Latin-1).
+"""
+import argparse
+import concurrent.futures
+import os
+import sys
+import time
+
+from foxsubp import codec, profiling, translations as translation_formats
+from foxsubp.profiling import stage
+
+# Decoded source pack and its encoded entries per encoding, set once per worker process
+_source = None
+_source_blobs = None
+
+
+class FanoutTarget:
+    """One output of a fan-out: its translations (a dict or a translation file) and path"""
+
+    def __init__(self, language, translations, output_path):
+        self.language = language
+        self.translations = translations
+        self.output_path = output_path
+
+
+class FanoutResult:
+    """Outcome of building one target"""
+
+    def __init__(self, language, output_path, status, count=0, seconds=0.0, error="",
+                 stages=None):
+        self.language = language
+        self.output_path = output_path
+        self.status = status
+        self.count = count
+        self.seconds = seconds
+        self.error = error
+        self.stages = stages or []
+
+    def to_dict(self):
+        return {
+            "language": self.language,
+            "output": self.output_path,
+            "status": self.status,
+            "count": self.count,
+            "seconds": round(self.seconds, 6),
+            "error": self.error,
+            "stages": profiling.summarize_stages(self.stages),
+        }
+
+
+def load_source(source_path, language=None):
+    """Decode the source pack once (SUBP through the decode cache, or SubpTool XML)"""
+    if source_path.lower().endswith(".xml"):
+        with stage("xml_parse", path=source_path) as s:
+            s.read(os.path.getsize(source_path))
+            return codec.read_subp_xml(source_path)
+    from foxsubp.pipeline import load_subp_model
+    return load_subp_model(source_path, language=language)
+
+
+def encode_source(source, encodings):
+    """Encoded bytes of every source entry, once per text encoding"""
+    blobs = {}
+    for encoding in encodings:
+        with stage("encode_source", encoding=encoding):
+            blobs[encoding] = codec.encode_entries(source.entries, encoding)
+    return blobs
+
+
+def _init_worker(source, source_blobs):
+    """Process pool initializer: keep the decoded source in the worker.
+
+    Where processes are forked the objects are inherited as they are;
+    elsewhere they are pickled once per worker, not once per target.
+    """
+    global _source, _source_blobs
+    _source = source
+    _source_blobs = source_blobs
+
+
+def build_target(target, source=None, source_blobs=None):
+    """Apply one target's translations to the shared source and write its output"""
+    source = source if source is not None else _source
+    source_blobs = source_blobs if source_blobs is not None else _source_blobs
+    recorder = profiling.get_recorder()
+    recorder.drain()
+    started = time.perf_counter()
+    try:
+        with stage("target", language=target.language):
+            translations = target.translations
+            if isinstance(translations, str):
+                with stage("load_translations", path=translations) as s:
+                    s.read(os.path.getsize(translations))
+                    translations = translation_formats.load_translations(translations)
+
+            with stage("overlay"):
+                view, count = source.with_translations(translations)
+
+            output_dir = os.path.dirname(target.output_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            if target.output_path.lower().endswith(".xml"):
+                with stage("xml_write", path=target.output_path) as s:
+                    codec.write_subp_xml(view, target.output_path)
+                    s.wrote(os.path.getsize(target.output_path))
+            else:
+                encoding = codec.get_encoding(target.language)
+                shared = source_blobs.get(encoding)
+                with stage("encode", path=target.output_path):
+                    if shared is None:
+                        blobs = codec.encode_entries(view.entries, encoding)
+                    else:
+                        # Only the entries this target replaced need encoding
+                        blobs = [blob if entry is original else codec.encode_entry(entry, encoding)
+                                 for entry, original, blob in zip(view.entries, source.entries, shared)]
+                    data = codec.pack_subp(view.entries, blobs)
+                with stage("write", path=target.output_path) as s, \
+                        open(target.output_path, "wb") as f:
+                    f.write(data)
+                    s.wrote(len(data))
+        return FanoutResult(target.language, target.output_path, "ok", count,
+                            time.perf_counter() - started, stages=recorder.drain())
+    except Exception as e:
+        return FanoutResult(target.language, target.output_path, "error",
+                            seconds=time.perf_counter() - started, error=str(e),
+                            stages=recorder.drain())
+
+
+def fan_out(source_path, targets, workers=None, language=None, on_result=None):
+    """Build every target from one decoding of source_path.
+
+    language is the language of the source pack (its text encoding). Targets
+    are encoded on a process pool of workers processes; with one worker or
+    one target everything runs in this process. Returns results in target
+    order.
+    """
+    source = load_source(source_path, language)
+    encodings = {codec.get_encoding(target.language) for target in targets
+                 if not target.output_path.lower().endswith(".xml")}
+    # Shared bytes only pay off when more than one target uses the encoding
+    shared = [encoding for encoding in encodings
+              if sum(codec.get_encoding(t.language) == encoding for t in targets) > 1]
+    source_blobs = encode_source(source, shared)
+
+    results = {}
+    if (workers or os.cpu_count() or 1) <= 1 or len(targets) <= 1:
+        # build_target takes the stages recorded since it started; keep ours apart
+        recorder = profiling.get_recorder()
+        own_stages = recorder.drain()
+        for target in targets:
+            result = results[id(target)] = build_target(target, source, source_blobs)
+            if on_result:
+                on_result(result)
+        recorder.extend(own_stages)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                    initializer=_init_worker,
+                                                    initargs=(source, source_blobs)) as executor:
+            futures = {executor.submit(build_target, target): target for target in targets}
+            for future in concurrent.futures.as_completed(futures):
+                result = results[id(futures[future])] = future.result()
+                if on_result:
+                    on_result(result)
+    return [results[id(target)] for target in targets]
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+def parse_target(text):
+    """LANG=TRANSLATIONS[=OUTPUT] from the command line"""
+    parts = text.split("=", 2)
+    if len(parts) < 2 or not parts[0] or not parts[1]:
+        raise argparse.ArgumentTypeError(f"format target: BAHASA=FILE_TERJEMAHAN[=OUTPUT], bukan {text!r}")
+    return parts
+
+
+def format_result(result):
+    line = (f"[{result.status:5}] {result.seconds:8.3f}s  {result.count:6} baris  "
+            f"{result.language}: {result.output_path}")
+    if result.error:
+        line += f"\n        {result.error}"
+    return line
+
+
+def main(argv=None):
+    """Entry point for python -m foxsubp.fanout"""
+    parser = argparse.ArgumentParser(
+        prog="python -m foxsubp.fanout",
+        description="Buat beberapa versi bahasa dari satu file SUBP/XML sekaligus "
+                    "(file sumber hanya dibaca sekali).")
+    parser.add_argument("source", help="file .subp atau .xml sumber")
+    parser.add_argument("-t", "--target", action="append", type=parse_target, required=True,
+                        metavar="BAHASA=TERJEMAHAN[=OUTPUT]",
+                        help="bahasa target dan file terjemahannya (boleh diulang); "
+                             "OUTPUT default: <folder output>/<bahasa>/<nama file sumber>")
+    parser.add_argument("-o", "--output-dir", default=".", help="folder output (default: folder kerja)")
+    parser.add_argument("-l", "--lang", help="kode bahasa file sumber untuk encoding teks")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="jumlah proses worker (default: jumlah CPU)")
+    parser.add_argument("--stages", action="store_true",
+                        help="tampilkan total waktu dan byte per tahap")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.source):
+        print(f"File sumber tidak ditemukan: {args.source}", file=sys.stderr)
+        return 2
+
+    name = os.path.basename(args.source)
+    if name.lower().endswith(".xml"):
+        name = os.path.splitext(name)[0] + ".subp"
+    targets = []
+    for parts in args.target:
+        language, translation_path = parts[0], parts[1]
+        if not os.path.exists(translation_path):
+            print(f"File terjemahan tidak ditemukan: {translation_path}", file=sys.stderr)
+            return 2
+        output_path = parts[2] if len(parts) > 2 else os.path.join(args.output_dir, language, name)
+        targets.append(FanoutTarget(language, translation_path, output_path))
+
+    started = time.perf_counter()
+    results = fan_out(args.source, targets, max(1, args.workers or 1), args.lang,
+                      on_result=lambda result: print(format_result(result), flush=True))
+    errors = sum(result.status == "error" for result in results)
+    print(f"\n{len(results)} bahasa dalam {time.perf_counter() - started:.3f}s, {errors} error")
+    if args.stages:
+        stages = profiling.get_recorder().drain()
+        for result in results:
+            stages.extend(result.stages)
+        print(profiling.format_stages(profiling.summarize_stages(stages)))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
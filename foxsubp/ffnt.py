@@ -0,0 +1,189 @@
+"""Reader for Fox Engine font files (.ffnt) and glyph coverage checks.
+
+Only the glyph map is read; the layer bitmaps are not needed to know which
+characters a font can draw. The layout mirrors FfntTool by Atvaark
+(FoxEngine/FfntTool.exe), all little-endian:
+
+    header   char[4] signature, int16, uint8 entry count, 1 byte padding,
+             int16, zero padded to 16 bytes
+    entries  entry count x (char[4] signature, int32 offset, int32 size)
+    GLYP     int32, int16, int16 glyph count, int32, int32,
+             glyph count x 20 bytes (int32 character, only the low 16 bits
+             are used; position, size, layer and spacing fields)
+    FTDT     font layer bitmaps
+
+Characters are UTF-16 code units, so anything outside the Basic
+Multilingual Plane is never covered.
+
+Checking translations against a font is two set operations in C: one
+difference between every character of the merged text and the covered set,
+and, only when that finds something, one intersection per entry to name the
+entries that use a missing character:
+
+    coverage = load_font_coverage(["font_eng.ffnt"])
+    report = check_translations(coverage, translations, entry_ids=subp_ids)
+    print(report.format())
+"""
+import os
+import struct
+
+GLYPH_MAP_SIGNATURE = b"GLYP"
+FONT_DATA_SIGNATURE = b"FTDT"
+
+_FILE_HEADER = struct.Struct("<4shBxh")
+_ENTRY_HEADER = struct.Struct("<4sii")
+_GLYPH_MAP_HEADER = struct.Struct("<ihhii")
+GLYPH_SIZE = 20
+HEADER_ALIGNMENT = 16
+
+# Line breaks and other control characters are layout, not glyphs
+IGNORED_CHARACTERS = frozenset(chr(c) for c in range(0x20))
+
+# At most this many entries are kept with details
+MAX_REPORTED_ITEMS = 1000
+
+
+class FfntFormatError(ValueError):
+    """Raised when an FFNT file cannot be decoded"""
+
+
+def read_glyph_codes(data):
+    """Character codes of every glyph in FFNT bytes, in file order"""
+    try:
+        signature, _, entry_count, _ = _FILE_HEADER.unpack_from(data, 0)
+        pos = -(-_FILE_HEADER.size // HEADER_ALIGNMENT) * HEADER_ALIGNMENT
+        codes = []
+        found = False
+        for _ in range(entry_count):
+            entry_signature, offset, _ = _ENTRY_HEADER.unpack_from(data, pos)
+            pos += _ENTRY_HEADER.size
+            if entry_signature != GLYPH_MAP_SIGNATURE:
+                continue
+            found = True
+            glyph_count = _GLYPH_MAP_HEADER.unpack_from(data, offset)[2]
+            start = offset + _GLYPH_MAP_HEADER.size
+            table = data[start:start + glyph_count * GLYPH_SIZE]
+            if len(table) != glyph_count * GLYPH_SIZE:
+                raise FfntFormatError(f"Tabel glyph terpotong ({glyph_count} glyph)")
+            codes.extend(code & 0xFFFF for (code,) in struct.iter_unpack("<i16x", table))
+    except struct.error as e:
+        raise FfntFormatError(f"File FFNT terpotong atau rusak: {e}") from None
+    if not found:
+        raise FfntFormatError(f"Tidak ada tabel glyph (GLYP) di file FFNT "
+                              f"{signature.decode('latin-1')!r}")
+    return codes
+
+
+class FontCoverage:
+    """Set of characters one or more fonts have glyphs for"""
+    __slots__ = ("characters", "sources")
+
+    def __init__(self, characters=(), sources=()):
+        self.characters = frozenset(characters)
+        self.sources = list(sources)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        return cls(map(chr, read_glyph_codes(data)), [path])
+
+    def union(self, other):
+        """Coverage of both fonts (a character needs a glyph in either)"""
+        return FontCoverage(self.characters | other.characters, self.sources + other.sources)
+
+    def __contains__(self, character):
+        return character in self.characters
+
+    def __len__(self):
+        return len(self.characters)
+
+    def missing(self, text):
+        """Characters of text without a glyph, ignoring control characters"""
+        return set(text).difference(self.characters, IGNORED_CHARACTERS)
+
+
+_loaded_fonts = {}
+
+
+def load_font_coverage(paths):
+    """Union of the glyph coverage of every font in paths, cached per process"""
+    coverage = FontCoverage()
+    for path in paths:
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        font = _loaded_fonts.get(key)
+        if font is None:
+            font = _loaded_fonts[key] = FontCoverage.from_file(path)
+        coverage = coverage.union(font)
+    return coverage
+
+
+class GlyphReport:
+    """Entries whose merged text uses characters the fonts cannot draw"""
+
+    def __init__(self, sources=()):
+        self.sources = list(sources)
+        self.checked = 0
+        self.characters = set()
+        self.entry_count = 0
+        self.entries = {}
+
+    @property
+    def ok(self):
+        return not self.entry_count
+
+    def add_entry(self, entry_id, characters):
+        self.entry_count += 1
+        self.characters.update(characters)
+        if len(self.entries) < MAX_REPORTED_ITEMS:
+            self.entries[entry_id] = "".join(sorted(characters))
+
+    def to_dict(self):
+        return {
+            "fonts": self.sources,
+            "checked": self.checked,
+            "entry_count": self.entry_count,
+            "characters": "".join(sorted(self.characters)),
+            "codepoints": [f"U+{ord(c):04X}" for c in sorted(self.characters)],
+            "entries": self.entries,
+        }
+
+    def format(self, max_items=20):
+        """Human readable report"""
+        fonts = ", ".join(os.path.basename(path) for path in self.sources) or "font"
+        if self.ok:
+            return f"Semua karakter dari {self.checked} entri tersedia di {fonts}."
+        codepoints = " ".join(f"{c!r} U+{ord(c):04X}" for c in sorted(self.characters))
+        out = [f"{self.entry_count} dari {self.checked} entri memakai karakter tanpa glyph di {fonts}:",
+               f"  Karakter: {codepoints}"]
+        for entry_id, characters in list(self.entries.items())[:max_items]:
+            out.append(f"    ID {entry_id}: {' '.join(characters)}")
+        if self.entry_count > max_items:
+            out.append(f"    ... dan {self.entry_count - max_items} entri lainnya")
+        return "\n".join(out)
+
+
+def check_translations(coverage, translations_dict, entry_ids=None):
+    """Report translated entries whose text has characters missing from coverage.
+
+    With entry_ids (a set of ID strings), only translations for entries that
+    exist in the target file are checked.
+    """
+    report = GlyphReport(coverage.sources)
+    if entry_ids is None:
+        items = translations_dict.items()
+    else:
+        items = [(entry_id, text) for entry_id, text in translations_dict.items()
+                 if entry_id in entry_ids]
+    report.checked = len(items)
+
+    # One pass over all text; most merges stop here
+    missing = coverage.missing("".join(text for _, text in items))
+    if not missing:
+        return report
+    for entry_id, text in items:
+        found = missing.intersection(text)
+        if found:
+            report.add_entry(entry_id, found)
+    return report
@@ -0,0 +1,162 @@
+"""Change detection for incremental rebuilds.
+
+A translation set only needs a rebuild if it changes at least one line text.
+The manifest remembers, per output file, the hashes of the input, the
+translation set and the output produced from them, plus the options that
+change the output bytes (the text encoding of a SUBP file), so an
+unchanged combination can reuse the existing output without decoding
+anything.
+"""
+import json
+import os
+import tempfile
+
+from foxsubp.cache import content_hash
+from foxsubp.codec import get_encoding, map_file
+from foxsubp.lng import LangFile
+
+MANIFEST_NAME = ".foxsubp-manifest.json"
+# Version 2 added the build options; older records are not trusted
+MANIFEST_VERSION = 2
+
+
+def hash_file(path):
+    """Content hash of a file, or None if it does not exist"""
+    try:
+        with map_file(path) as view:
+            return content_hash(view)
+    except FileNotFoundError:
+        return None
+
+
+def hash_translations(translations_dict):
+    """Order-independent hash of a translation set"""
+    data = json.dumps(sorted(translations_dict.items()), ensure_ascii=False, separators=(",", ":"))
+    return content_hash(data.encode("utf-8"))
+
+
+def build_options(input_path, language=None):
+    """Options that change the bytes built from input_path, stored in its manifest record"""
+    if input_path.lower().endswith(".subp"):
+        return {"encoding": get_encoding(language)}
+    return {}
+
+
+def iter_subp_entry_texts(subp):
+    """(entry id, line texts) for every entry of a decoded SubpFile"""
+    for entry in subp.entries:
+        yield str(entry.subtitle_id), [line.text for line in entry.lines]
+
+
+def iter_lng_entry_texts(lang_file):
+    """(key, [text]) for every string of a decoded LangFile"""
+    for entry in lang_file.entries:
+        yield str(entry.key), [entry.value]
+
+
+def iter_xml_entry_texts(xml_path):
+    """(entry id, line texts) for every Entry of a SubpTool XML file.
+
+    Only Line elements that carry a Text attribute are listed, because those
+    are the only ones merge_translation_to_xml rewrites.
+    """
+    import xml.etree.ElementTree as ET
+    for event, elem in ET.iterparse(xml_path, events=("end",)):
+        tag = elem.tag.split("}", 1)[1] if "}" in elem.tag else elem.tag
+        if tag != "Entry":
+            continue
+        texts = []
+        for lines in elem:
+            if lines.tag.endswith("Lines"):
+                texts.extend(line.get("Text") for line in lines
+                             if line.tag.endswith("Line") and line.get("Text") is not None)
+                break
+        yield elem.get("Id"), texts
+        elem.clear()
+
+
+def iter_entry_texts(model, xml_path=None):
+    """(entry id, line texts) of a loaded SUBP/LNG model or, without one, of an XML file"""
+    if isinstance(model, LangFile):
+        return iter_lng_entry_texts(model)
+    if model is not None:
+        return iter_subp_entry_texts(model)
+    return iter_xml_entry_texts(xml_path)
+
+
+def count_effective_changes(entry_texts, translations_dict):
+    """Return (entries, lines) whose text a merge would actually change"""
+    entries = 0
+    lines = 0
+    for entry_id, texts in entry_texts:
+        translated = translations_dict.get(entry_id)
+        if translated is None:
+            continue
+        changed = sum(1 for text in texts if text != translated)
+        if changed:
+            entries += 1
+            lines += changed
+    return entries, lines
+
+
+class BuildManifest:
+    """JSON record of (input hash, translation-set hash, build options, output hash) per output file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.records = data.get("files", {})
+
+    def _key(self, output_path):
+        return os.path.abspath(output_path)
+
+    def get(self, output_path):
+        """Stored record for output_path, or None"""
+        return self.records.get(self._key(output_path))
+
+    def record(self, output_path, input_hash, translations_hash, output_hash, options=None):
+        """Remember what output_path was built from (options: see build_options)"""
+        self.records[self._key(output_path)] = {
+            "input": input_hash,
+            "translations": translations_hash,
+            "options": options or {},
+            "output": output_hash,
+        }
+        self.dirty = True
+
+    def save(self):
+        """Write the manifest atomically if anything changed"""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.records}, f, indent=1)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+
+def is_up_to_date(record, input_hash, translations_hash, output_path, hash_func=hash_file,
+                  options=None):
+    """True if record says output_path was built from these exact inputs and options and is untouched.
+
+    hash_func hashes output_path; a scan index's file_hash avoids rereading it.
+    """
+    if not record:
+        return False
+    if record.get("input") != input_hash or record.get("translations") != translations_hash:
+        return False
+    if record.get("options") != (options or {}):
+        return False
+    return hash_func(output_path) == record.get("output")
@@ -0,0 +1,447 @@
+"""Native reader/writer for Fox Engine language files (.lng/.lng2).
+
+The layout mirrors LangTool by Atvaark (FoxEngine/LangTool.exe), so a file
+encoded here is byte-for-byte identical to the one LangTool writes:
+
+    header   int32 magic "LANG", int32 version (3), int32 endianness
+             ("LE" 0x454C or "BE" 0x4542), int32 entry count,
+             int32 strings offset, int32 keys offset
+    strings  entry count x (int16 color, UTF-8 text terminated by NUL),
+             padded with 1-4 zero bytes to a multiple of 4
+    keys     entry count x (uint32 key, int32 offset into strings),
+             sorted by key (then by offset, descending)
+
+Magic, endianness marker and the color field are always little-endian;
+everything else follows the endianness marker. An entry's key is the
+StrCode32 of its LangId; LangIds are recovered through the hash index of
+FoxEngine/lang_dictionary.txt, which is built once and cached on disk.
+"""
+import argparse
+import array
+import os
+import struct
+import sys
+import tempfile
+
+from foxsubp.cache import content_hash, get_default_cache_dir
+from foxsubp.cityhash import str_code32
+from foxsubp.codec import XSD_NAMESPACE, XSI_NAMESPACE, int_attr
+
+# ============================================================================
+# FORMAT CONSTANTS
+# ============================================================================
+LNG_EXTENSIONS = (".lng", ".lng2")
+FILE_MAGIC = 0x474E414C  # "LANG"
+FILE_VERSION = 3
+LITTLE_ENDIAN = "LittleEndian"
+BIG_ENDIAN = "BigEndian"
+_ENDIANNESS_MARKERS = {0x454C: LITTLE_ENDIAN, 0x4542: BIG_ENDIAN}
+_MARKER_FOR = {name: marker for marker, name in _ENDIANNESS_MARKERS.items()}
+_BYTE_ORDER = {LITTLE_ENDIAN: "<", BIG_ENDIAN: ">"}
+
+_LE_INT = struct.Struct("<i")
+_COLOR = struct.Struct("<h")
+HEADER_SIZE = 24
+STRING_ALIGNMENT = 4
+
+DEFAULT_DICTIONARY_NAME = "lang_dictionary.txt"
+INDEX_EXTENSION = ".langidx"
+INDEX_MAGIC = b"FXLI"
+# Bump when the index layout changes so stale files are never loaded
+INDEX_FORMAT_VERSION = 1
+_INDEX_HEADER = struct.Struct("<4sII")
+
+
+class LangFormatError(ValueError):
+    """Raised when an LNG file or its XML form cannot be decoded or encoded"""
+
+
+def is_lng_path(path):
+    """True for .lng and .lng2 files"""
+    return path.lower().endswith(LNG_EXTENSIONS)
+
+# ============================================================================
+# ENTRY MODEL
+# ============================================================================
+class LangEntry:
+    """One string: its StrCode32 key, LangId (if known), color and text"""
+    __slots__ = ("key", "lang_id", "color", "value")
+
+    def __init__(self, key=0, lang_id=None, color=0, value=""):
+        self.key = key
+        self.lang_id = lang_id
+        self.color = color
+        self.value = value
+
+    def update_key(self):
+        """Recompute the key from the LangId, as LangTool does before writing"""
+        if self.lang_id:
+            self.key = str_code32(self.lang_id)
+
+    def __eq__(self, other):
+        return (isinstance(other, LangEntry) and self.key == other.key
+                and self.lang_id == other.lang_id and self.color == other.color
+                and self.value == other.value)
+
+    def __repr__(self):
+        return f"LangEntry(key={self.key}, lang_id={self.lang_id!r}, value={self.value!r})"
+
+
+class LangFile:
+    """A language file: entries in string-table order plus a key -> entry index.
+
+    Entries are addressed by their numeric key in translation tables, so
+    the same "[ID n] text" files work for LNG and SUBP.
+    """
+    __slots__ = ("entries", "endianness", "_index")
+
+    def __init__(self, entries=None, endianness=LITTLE_ENDIAN):
+        self.entries = entries if entries is not None else []
+        self.endianness = endianness
+        self._index = None
+
+    def __eq__(self, other):
+        return (isinstance(other, LangFile) and self.endianness == other.endianness
+                and self.entries == other.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def index(self):
+        """Dict of key -> entries with that key, built on first use"""
+        if self._index is None:
+            index = {}
+            for entry in self.entries:
+                index.setdefault(entry.key, []).append(entry)
+            self._index = index
+        return self._index
+
+    def reindex(self):
+        """Rebuild the index after entries were added, removed or renamed"""
+        self._index = None
+
+    def get(self, key, default=None):
+        """First entry for a key (int or numeric string)"""
+        try:
+            entries = self.index.get(int(key))
+        except (TypeError, ValueError):
+            return default
+        return entries[0] if entries else default
+
+    def iter_line_texts(self):
+        """Yield (key as string, text) for every non-empty string in file order"""
+        for entry in self.entries:
+            if entry.value:
+                yield str(entry.key), entry.value
+
+    def apply_translations(self, translations_dict, collect_ids=True):
+        """Set the text of each translated key; same return value as SubpFile.apply_translations"""
+        index = self.index
+        count = 0
+        modified_ids = []
+        for key, translated in translations_dict.items():
+            try:
+                targets = index.get(int(key))
+            except (TypeError, ValueError):
+                continue
+            if not targets:
+                continue
+            for entry in targets:
+                entry.value = translated
+                count += 1
+                if collect_ids:
+                    modified_ids.append(f"[ID {entry.key}] => {translated}")
+        return count, modified_ids
+
+# ============================================================================
+# BINARY DECODE / ENCODE
+# ============================================================================
+def decode_lng(data, dictionary=None):
+    """Decode LNG bytes (or any buffer) into a LangFile.
+
+    dictionary maps keys to LangIds (see load_lang_dictionary); entries whose
+    key is not in it keep lang_id None.
+    """
+    raw = data if isinstance(data, bytes) else bytes(data)
+    try:
+        magic = _LE_INT.unpack_from(raw, 0)[0]
+        marker = _LE_INT.unpack_from(raw, 8)[0]
+        if magic != FILE_MAGIC:
+            raise LangFormatError(f"Header LNG tidak valid: 0x{magic & 0xFFFFFFFF:08X}")
+        endianness = _ENDIANNESS_MARKERS.get(marker)
+        if endianness is None:
+            raise LangFormatError(f"Endianness LNG tidak dikenal: 0x{marker & 0xFFFFFFFF:X}")
+        order = _BYTE_ORDER[endianness]
+        count, strings_offset, keys_offset = struct.unpack_from(order + "iii", raw, 12)
+
+        by_offset = {}
+        pos = strings_offset
+        for _ in range(count):
+            color = _COLOR.unpack_from(raw, pos)[0]
+            end = raw.index(b"\0", pos + 2)
+            by_offset[pos - strings_offset] = LangEntry(
+                0, None, color, raw[pos + 2:end].decode("utf-8", "replace"))
+            pos = end + 1
+
+        lookup = dictionary.get if dictionary else (lambda key: None)
+        key_table = struct.unpack_from(f"{order}{count * 2}i", raw, keys_offset)
+        for i in range(0, len(key_table), 2):
+            key = key_table[i] & 0xFFFFFFFF
+            entry = by_offset.get(key_table[i + 1])
+            if entry is None:
+                raise LangFormatError(f"Key {key} menunjuk ke offset yang tidak ada")
+            entry.key = key
+            entry.lang_id = lookup(key)
+    except (struct.error, ValueError) as e:
+        if isinstance(e, LangFormatError):
+            raise
+        raise LangFormatError(f"File LNG terpotong atau rusak: {e}") from None
+
+    return LangFile(list(by_offset.values()), endianness)
+
+
+def encode_lng(lng):
+    """Encode a LangFile into LNG bytes.
+
+    Entries with a LangId are written under the key computed from it, as
+    LangTool does; the LangFile itself is not modified.
+    """
+    order = _BYTE_ORDER.get(lng.endianness)
+    if order is None:
+        raise LangFormatError(f"Endianness LNG tidak dikenal: {lng.endianness}")
+
+    parts = []
+    records = []
+    offset = 0
+    for entry in lng.entries:
+        key = str_code32(entry.lang_id) if entry.lang_id else entry.key
+        text = entry.value.encode("utf-8") + b"\0"
+        if not -0x8000 <= entry.color <= 0x7FFF:
+            raise LangFormatError(f"Color {entry.color} di luar rentang int16 (key {key})")
+        parts.append(_COLOR.pack(entry.color))
+        parts.append(text)
+        records.append((key & 0xFFFFFFFF, -offset))
+        offset += _COLOR.size + len(text)
+
+    # AlignWrite always writes at least one byte, even when already aligned
+    padding = STRING_ALIGNMENT - (HEADER_SIZE + offset) % STRING_ALIGNMENT
+    parts.append(b"\0" * padding)
+    keys_offset = HEADER_SIZE + offset + padding
+
+    # Sorted by key, then by offset descending (stored negated above)
+    records.sort()
+    key_table = array.array("I", [0]) * (2 * len(records))
+    for i, (key, negative_offset) in enumerate(records):
+        key_table[2 * i] = key
+        key_table[2 * i + 1] = -negative_offset
+    if (order == "<") != (sys.byteorder == "little"):
+        key_table.byteswap()
+
+    header = b"".join([_LE_INT.pack(FILE_MAGIC),
+                       struct.pack(order + "i", FILE_VERSION),
+                       _LE_INT.pack(_MARKER_FOR[lng.endianness]),
+                       struct.pack(order + "iii", len(lng.entries), HEADER_SIZE, keys_offset)])
+    return b"".join([header] + parts + [key_table.tobytes()])
+
+
+def read_lng(path, dictionary=None):
+    """Read and decode an .lng/.lng2 file with a single buffered read"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return decode_lng(data, dictionary)
+
+
+def write_lng(lng, path):
+    """Encode a LangFile and write it to path"""
+    data = encode_lng(lng)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+# ============================================================================
+# XML FORM (compatible with LangTool.exe)
+# ============================================================================
+def _escape_attr(value):
+    """Escape an attribute value the way LangTool's XmlSerializer does"""
+    return (value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace('"', "&quot;").replace("\n", "&#xA;").replace("\r", "&#xD;")
+            .replace("\t", "&#x9;"))
+
+
+def lng_to_xml_string(lng):
+    """Render a LangFile in the same XML layout LangTool.exe produces"""
+    out = ['<?xml version="1.0" encoding="utf-8"?>\n',
+           f'<LangFile xmlns:xsi="{XSI_NAMESPACE}" xmlns:xsd="{XSD_NAMESPACE}" '
+           f'Endianess="{lng.endianness}">\n',
+           "  <Entries>\n"]
+    for entry in lng.entries:
+        # LangTool only writes the key when the LangId is unknown
+        key = "" if entry.lang_id else f'Key="{entry.key}" '
+        lang_id = "" if entry.lang_id is None else f'LangId="{_escape_attr(entry.lang_id)}" '
+        out.append(f'    <Entry {key}{lang_id}Color="{entry.color}" '
+                   f'Value="{_escape_attr(entry.value)}" />\n')
+    out.append("  </Entries>\n")
+    out.append("</LangFile>")
+    return "".join(out)
+
+
+def write_lng_xml(lng, xml_path):
+    """Write a LangFile as LangTool-compatible XML"""
+    with open(xml_path, "w", encoding="utf-8-sig", newline="\n") as f:
+        f.write(lng_to_xml_string(lng))
+    return xml_path
+
+
+def read_lng_xml(xml_path):
+    """Parse LangTool-compatible XML into a LangFile"""
+    import xml.etree.ElementTree as ET
+    try:
+        root = ET.parse(xml_path).getroot()
+    except ET.ParseError as e:
+        raise LangFormatError(f"XML tidak valid: {e}") from None
+
+    endianness = root.get("Endianess", LITTLE_ENDIAN)
+    if endianness not in _BYTE_ORDER:
+        raise LangFormatError(f"Endianness LNG tidak dikenal: {endianness}")
+    entries = []
+    for elem in root.iter():
+        tag = elem.tag.split("}", 1)[1] if "}" in elem.tag else elem.tag
+        if tag != "Entry":
+            continue
+        try:
+            entry = LangEntry(int_attr(elem, "Key"), elem.get("LangId"),
+                              int_attr(elem, "Color"), elem.get("Value", ""))
+        except ValueError as e:
+            raise LangFormatError(str(e)) from None
+        entry.update_key()
+        entries.append(entry)
+    return LangFile(entries, endianness)
+
+# ============================================================================
+# KEY DICTIONARY (hash -> LangId)
+# ============================================================================
+_loaded_dictionaries = {}
+
+
+def get_default_dictionary_path():
+    """FoxEngine/lang_dictionary.txt next to Translator.py (or the frozen executable)"""
+    if getattr(sys, "frozen", False):
+        base = os.path.dirname(sys.executable)
+    else:
+        base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, "FoxEngine", DEFAULT_DICTIONARY_NAME)
+
+
+def build_lang_dictionary(lines):
+    """Hash every LangId; on collisions the later line wins, like LangTool"""
+    return {str_code32(name): name for name in lines}
+
+
+def pack_index(dictionary):
+    """Compact binary form: header, uint32 keys, then the names joined by newlines"""
+    keys = array.array("I", dictionary.keys())
+    if sys.byteorder != "little":
+        keys.byteswap()
+    names = "\n".join(dictionary.values()).encode("utf-8")
+    return _INDEX_HEADER.pack(INDEX_MAGIC, INDEX_FORMAT_VERSION, len(dictionary)) + keys.tobytes() + names
+
+
+def unpack_index(data):
+    """Rebuild the dictionary from pack_index output; None if data is not a valid index"""
+    try:
+        magic, version, count = _INDEX_HEADER.unpack_from(data, 0)
+    except struct.error:
+        return None
+    if magic != INDEX_MAGIC or version != INDEX_FORMAT_VERSION:
+        return None
+    keys_end = _INDEX_HEADER.size + 4 * count
+    keys = array.array("I")
+    keys.frombytes(data[_INDEX_HEADER.size:keys_end])
+    if sys.byteorder != "little":
+        keys.byteswap()
+    names = data[keys_end:].decode("utf-8").split("\n") if count else []
+    if len(keys) != count or len(names) != count:
+        return None
+    return dict(zip(keys, names))
+
+
+def _index_path(cache_dir, dictionary_hash):
+    return os.path.join(cache_dir, f"lang_dictionary-{dictionary_hash}{INDEX_EXTENSION}")
+
+
+def load_lang_dictionary(path=None, cache_dir=None):
+    """Return the key -> LangId dict for a lang_dictionary.txt.
+
+    The hashes are computed once per dictionary content and stored as a
+    small binary index in the cache directory, so later runs only read it
+    back. Results are also kept per process. A missing dictionary gives an
+    empty dict (entries then keep their numeric keys only).
+    """
+    path = path or get_default_dictionary_path()
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}
+
+    dictionary_hash = content_hash(data)
+    dictionary = _loaded_dictionaries.get(dictionary_hash)
+    if dictionary is not None:
+        return dictionary
+
+    index_path = _index_path(cache_dir or get_default_cache_dir(), dictionary_hash)
+    try:
+        with open(index_path, "rb") as f:
+            dictionary = unpack_index(f.read())
+    except (OSError, ValueError):
+        dictionary = None
+
+    if dictionary is None:
+        # File.ReadAllLines semantics: optional BOM, \r\n or \n line ends
+        text = data.decode("utf-8-sig")
+        dictionary = build_lang_dictionary(text.splitlines())
+        # An index that cannot be written (read-only home, full disk) is just skipped
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(index_path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(pack_index(dictionary))
+            os.replace(temp_path, index_path)
+        except OSError:
+            pass
+
+    _loaded_dictionaries[dictionary_hash] = dictionary
+    return dictionary
+
+
+def main(argv=None):
+    """Convert .lng/.lng2 files to XML and back, like LangTool.exe"""
+    parser = argparse.ArgumentParser(prog="python -m foxsubp.lng",
+                                     description="Konversi file LNG Fox Engine ke XML dan sebaliknya.")
+    parser.add_argument("files", nargs="+",
+                        help="file .lng/.lng2 (ditulis ke <file>.xml) atau <file>.lng.xml (ditulis ke <file>.lng)")
+    parser.add_argument("--dictionary", help=f"daftar LangId (default: FoxEngine/{DEFAULT_DICTIONARY_NAME})")
+    args = parser.parse_args(argv)
+
+    dictionary = None
+    failed = 0
+    for path in args.files:
+        try:
+            if path.lower().endswith(".xml"):
+                output_path = path[:-4]
+                write_lng(read_lng_xml(path), output_path)
+            else:
+                if dictionary is None:
+                    dictionary = load_lang_dictionary(args.dictionary)
+                output_path = path + ".xml"
+                write_lng_xml(read_lng(path, dictionary), output_path)
+            print(f"{path} -> {output_path}")
+        except (OSError, LangFormatError) as e:
+            failed += 1
+            print(f"Gagal mengkonversi {path}: {e}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Memory-mapped, lazily decoded access to SUBP files.
+
+Opening a MappedSubp maps the file and reads only the header and the
+(id, offset) index. An entry's timings and text are decoded from the map
+the first time that entry is asked for, so listing the IDs of a large pack
+or fetching a single subtitle never builds the other strings:
+
+    with MappedSubp("eng.subp") as pack:
+        print(len(pack), pack.get(600831).lines[0].text)
+
+The map is read-only and is closed by close() or the with block; decoded
+entries are plain objects and stay usable afterwards. Do not keep a pack
+open while its file is being rewritten.
+"""
+import mmap
+import os
+
+from foxsubp.codec import DEFAULT_ENCODING, decode_entry, entry_end, read_index, splice_entries
+from foxsubp.model import SubpFile, parse_id
+
+
+class MappedSubp:
+    """Read-only SUBP file whose entries are decoded on first access"""
+
+    def __init__(self, path, encoding=DEFAULT_ENCODING):
+        self.path = path
+        self.encoding = encoding
+        self._mapping = None
+        self._view = None
+        self._index = None
+        self._decoded = {}
+
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size:
+                self._mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mapping) if self._mapping is not None else memoryview(b"")
+        try:
+            # Entry IDs and offsets as two uint32 arrays (the only eager work)
+            self.ids, self.offsets = read_index(self._view)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """Release the map; already decoded entries remain valid"""
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+
+    @property
+    def closed(self):
+        return self._view is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        """Entry IDs in file order"""
+        return iter(self.ids)
+
+    def __contains__(self, entry_id):
+        return parse_id(entry_id) in self.index
+
+    @property
+    def index(self):
+        """Dict of subtitle ID -> position of its first entry, built on first use"""
+        if self._index is None:
+            index = {}
+            for position, entry_id in enumerate(self.ids):
+                index.setdefault(entry_id, position)
+            self._index = index
+        return self._index
+
+    def _decode(self, position):
+        if self._view is None:
+            raise ValueError(f"{self.path} sudah ditutup")
+        return decode_entry(self._view, self.offsets[position], self.ids[position], self.encoding)
+
+    def entry_at(self, position):
+        """Entry at a position in file order, decoded once and then kept"""
+        entry = self._decoded.get(position)
+        if entry is None:
+            entry = self._decoded[position] = self._decode(position)
+        return entry
+
+    def _entry_end(self, position):
+        """Offset just past the entry at position"""
+        if self._view is None:
+            raise ValueError(f"{self.path} sudah ditutup")
+        return entry_end(self._view, self.offsets[position], self.ids[position])
+
+    def entry_bytes(self, position):
+        """Stored bytes of the entry at position, as encode_entries would produce them"""
+        return bytes(self._view[self.offsets[position]:self._entry_end(position)])
+
+    def splice(self, parts):
+        """SUBP bytes from ranges of this pack's entries and new entries (see codec.splice_entries)"""
+        if self._view is None:
+            raise ValueError(f"{self.path} sudah ditutup")
+        return splice_entries(self._view, parts, (self.ids, self.offsets))
+
+    def get(self, entry_id, default=None):
+        """Entry for an ID (int or numeric string), decoding only that entry"""
+        position = self.index.get(parse_id(entry_id))
+        if position is None:
+            return default
+        return self.entry_at(position)
+
+    def iter_entries(self):
+        """Every entry in file order (each is decoded and kept)"""
+        for position in range(len(self.ids)):
+            yield self.entry_at(position)
+
+    def iter_line_texts(self):
+        """Yield (entry id as string, text) like SubpFile.iter_line_texts.
+
+        Entries not decoded yet are decoded on the fly and dropped again,
+        so a full scan does not keep the whole pack in memory.
+        """
+        decoded = self._decoded
+        for position, entry_id in enumerate(self.ids):
+            entry = decoded.get(position) or self._decode(position)
+            entry_id = str(entry_id)
+            for line in entry.lines:
+                if line.text:
+                    yield entry_id, line.text
+
+    def to_subp_file(self):
+        """Decode everything into a regular, editable SubpFile"""
+        return SubpFile(list(self.iter_entries()))
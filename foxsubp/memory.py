@@ -0,0 +1,501 @@
+"""Persistent translation memory with exact and fuzzy lookup.
+
+Every merge stores (original line text, translation) pairs in a local
+SQLite file, so a line translated once in any pack can be suggested again
+for any other pack:
+
+    with TranslationMemory(language="rus") as memory:
+        memory.add(collect_pairs(entry_texts, translations))
+        suggestions = memory.suggest(["Kill the target.", "Extract the target"])
+
+Units are scoped by the language of the pack they were translated into, so
+a rus and a jpn build of the same source text keep their own translations
+and lookups only see the language asked for (None is its own scope, for
+packs with no language in their path). Within a language a source text is
+stored once, with its latest translation. Exact matches go through an
+index on the language and a 64-bit hash of the text.
+
+Fuzzy matches are scored by the Dice similarity of character trigram sets,
+2 * shared / (trigrams of one + trigrams of the other). Posting lists of
+single trigrams are far too long to count in Python ("the" is in most
+lines), so the inverted index is keyed by groups of trigrams instead: each
+text's trigrams are hashed into SIGNATURE_BINS bins, the smallest hash of
+every bin is kept (a min-hash signature), and every BAND_SIZE consecutive
+bins form one key. Two texts get the same key with a probability that
+rises steeply with their similarity, so a query reads a few short posting
+lists and only verifies the texts that share a key with it. The posting
+list of a key is stored as one blob of unit ids, so it is read as one row
+and counted without a Python loop per unit. Every unit also stores its
+signature: a candidate whose signature agrees with the query's on too few
+bins cannot be a match, and is dropped before its trigrams are rebuilt
+for the exact Dice score. Lookups are batched, so suggesting a whole pack
+costs a handful of queries.
+
+The database lives in the per-user data directory, or FOXSUBP_TM_PATH.
+"""
+import array
+import hashlib
+import operator
+import os
+import sqlite3
+import struct
+import sys
+import time
+from collections import Counter
+from itertools import chain
+
+TM_PATH_ENV = "FOXSUBP_TM_PATH"
+TM_FILE_NAME = "translation-memory.sqlite"
+SCHEMA_VERSION = 3
+
+DEFAULT_THRESHOLD = 0.75
+GRAM_SIZE = 3
+# Texts shorter than this (after normalisation) are only matched exactly
+MIN_FUZZY_LENGTH = 4
+# 32 bins in bands of 4: a 0.75 Dice match shares a key ~90% of the time
+SIGNATURE_BINS = 32
+BAND_SIZE = 4
+# Texts verified per query, most shared keys first
+MAX_CANDIDATES = 4
+# The share of matching signature bins estimates the Jaccard similarity (a Dice
+# score d is a Jaccard similarity of d / (2 - d)); candidates estimated more
+# than this below the threshold's Jaccard similarity are not verified
+SIGNATURE_SLACK = 0.15
+_MASK64 = (1 << 64) - 1
+_GRAM_MULTIPLIER = 0x9E3779B97F4A7C15
+_KEY_MULTIPLIER = 0x100000001B3
+_BIN_SHIFT = 64 - (SIGNATURE_BINS - 1).bit_length()
+_VALUE_MASK = (1 << _BIN_SHIFT) - 1
+_DISTANCE_BITS = SIGNATURE_BINS.bit_length()
+# Trigram hashes are memoised; a cache this full is dropped and refilled
+_GRAM_CACHE_LIMIT = 1 << 16
+_gram_cache = {}
+# units.signature: the short signature as little-endian uint32s
+_SIGNATURE = struct.Struct(f"<{SIGNATURE_BINS}I")
+# SQLite's default limit on host parameters is 999
+_CHUNK = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY,
+    language TEXT NOT NULL DEFAULT '',
+    source_hash INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    gram_count INTEGER NOT NULL,
+    -- Low 32 bits of each signature bin, as little-endian uint32s
+    signature BLOB NOT NULL DEFAULT x'',
+    uses INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS units_language_source_hash ON units (language, source_hash);
+-- Ids of the units with a key, as little-endian int64s in insertion order
+CREATE TABLE IF NOT EXISTS gram_postings (
+    key INTEGER PRIMARY KEY,
+    units BLOB NOT NULL
+);
+"""
+
+
+def get_default_tm_path():
+    """Per-user translation memory file, overridable with FOXSUBP_TM_PATH"""
+    configured = os.environ.get(TM_PATH_ENV)
+    if configured:
+        return configured
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = (os.environ.get("XDG_DATA_HOME")
+                or os.path.join(os.path.expanduser("~"), ".local", "share"))
+    return os.path.join(base, "foxsubp", TM_FILE_NAME)
+
+
+def text_hash(text):
+    """Signed 64-bit hash of a text, as stored in units.source_hash"""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def normalize(text):
+    """Case- and whitespace-insensitive form used for fuzzy matching"""
+    return " ".join(text.casefold().split())
+
+
+def text_grams(text):
+    """Set of character trigrams of the normalised text (padded with spaces)"""
+    padded = f" {normalize(text)} "
+    return {padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+def dice(grams_a, grams_b):
+    """Dice similarity of two trigram sets, 0.0 - 1.0"""
+    total = len(grams_a) + len(grams_b)
+    return 2 * len(grams_a & grams_b) / total if total else 0.0
+
+
+def language_salt(language):
+    """Seed of the gram keys of a language, so fuzzy postings never cross languages"""
+    if not language:
+        return 0
+    return int.from_bytes(hashlib.blake2b(language.encode("utf-8"), digest_size=8).digest(),
+                          "little")
+
+
+def _gram_hashes(grams):
+    """Multiplicative hash of each trigram: the top bits pick the bin, the rest is its value"""
+    global _gram_cache
+    cache = _gram_cache
+    hashes = list(map(cache.get, grams))
+    if None in hashes:
+        if len(cache) > _GRAM_CACHE_LIMIT:
+            # Replaced rather than cleared, so a thread still reading the old one is unaffected
+            cache = _gram_cache = {}
+        for gram in grams:
+            if gram not in cache:
+                a, b, c = map(ord, gram)
+                cache[gram] = ((a << 42) | (b << 21) | c) * _GRAM_MULTIPLIER & _MASK64
+        hashes = list(map(cache.__getitem__, grams))
+    return hashes
+
+
+def gram_keys(text, salt=0):
+    """Index keys (signed 64-bit ints) of the trigrams of a text, one per band of bins"""
+    grams = text_grams(text)
+    return _band_keys(_signature(grams), salt) if grams else []
+
+
+def _signature(grams):
+    """Min-hash signature of a non-empty trigram set, one value per bin"""
+    bins = SIGNATURE_BINS
+    # Each bin keeps its smallest value (largest written first)
+    minima = {value >> _BIN_SHIFT: value & _VALUE_MASK
+              for value in sorted(_gram_hashes(grams), reverse=True)}
+    if len(minima) == bins:
+        return [minima[slot] << _DISTANCE_BITS for slot in range(bins)]
+
+    # Short texts leave bins empty; those borrow the next filled bin so that
+    # similar texts still agree on them. Walking backwards twice round gives
+    # every slot the value of, and distance to, the next filled bin.
+    signature = [0] * bins
+    value = distance = 0
+    for slot in range(2 * bins - 1, -1, -1):
+        if slot % bins in minima:
+            value = minima[slot % bins] << _DISTANCE_BITS
+            distance = 0
+        else:
+            distance += 1
+        if slot < bins:
+            signature[slot] = value | distance
+    return signature
+
+
+def _band_keys(signature, salt=0):
+    """Signed 64-bit hash of every BAND_SIZE bins of a signature"""
+    keys = []
+    for band in range(0, SIGNATURE_BINS, BAND_SIZE):
+        key = band ^ salt
+        for value in signature[band:band + BAND_SIZE]:
+            key = ((key ^ value) * _KEY_MULTIPLIER) & _MASK64
+        keys.append(key - (1 << 64) if key >> 63 else key)
+    return keys
+
+
+def _short_signature(signature):
+    """Signature as compared, the low 32 bits of each bin"""
+    return tuple(value & 0xFFFFFFFF for value in signature)
+
+
+def _pack_units(units):
+    """Posting list blob of a list of unit ids"""
+    packed = array.array("q", units)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _min_agreement(threshold):
+    """Signature bins a candidate must share with the query to be verified"""
+    jaccard = threshold / (2 - threshold)
+    return max(0, int(SIGNATURE_BINS * (jaccard - SIGNATURE_SLACK)))
+
+
+def _chunks(items, size=_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class Suggestion:
+    """A translation found in memory; score is 1.0 for an exact match"""
+    __slots__ = ("target", "score", "source")
+
+    def __init__(self, target, score, source):
+        self.target = target
+        self.score = score
+        self.source = source
+
+    @property
+    def exact(self):
+        return self.score >= 1.0
+
+    def __repr__(self):
+        return f"Suggestion({self.target!r}, {self.score:.2f})"
+
+
+class TranslationMemory:
+    """SQLite-backed store of source text -> translation for one target language.
+
+    A connection belongs to the thread that opened it; background jobs open
+    their own.
+    """
+
+    def __init__(self, path=None, language=None):
+        self.path = path or get_default_tm_path()
+        self.language = language or ""
+        self.salt = language_salt(self.language)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        if self.path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, 1, 2, SCHEMA_VERSION):
+            raise ValueError(f"Versi memori terjemahan tidak dikenal: {version}")
+        if version in (1, 2):
+            with self.connection:
+                if version == 1:
+                    # Version 1 units have no language; they stay in the None scope
+                    self.connection.execute(
+                        "ALTER TABLE units ADD COLUMN language TEXT NOT NULL DEFAULT ''")
+                    self.connection.execute("DROP INDEX IF EXISTS units_source_hash")
+                self.connection.execute(
+                    "ALTER TABLE units ADD COLUMN signature BLOB NOT NULL DEFAULT x''")
+                self.connection.execute("DROP TABLE gram_keys")
+        self.connection.executescript(_SCHEMA)
+        if version in (1, 2):
+            self._reindex()
+        self.connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _reindex(self):
+        """Recompute the signatures and posting lists of every unit (after an upgrade)"""
+        postings = {}
+        signatures = []
+        salts = {}
+        with self.connection:
+            for unit, language, source in self.connection.execute(
+                    "SELECT id, language, source FROM units").fetchall():
+                grams = text_grams(source)
+                if not grams:
+                    continue
+                if language not in salts:
+                    salts[language] = language_salt(language)
+                signature = _signature(grams)
+                signatures.append((_SIGNATURE.pack(*_short_signature(signature)), unit))
+                for key in set(_band_keys(signature, salts[language])):
+                    postings.setdefault(key, []).append(unit)
+            self.connection.executemany("UPDATE units SET signature = ? WHERE id = ?", signatures)
+            self.connection.execute("DELETE FROM gram_postings")
+            self._extend_postings(postings)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM units WHERE language = ?",
+                                       (self.language,)).fetchone()[0]
+
+    def _select_in(self, sql, values, *params):
+        """Rows of sql (with one "IN ({})", after params) for every chunk of values"""
+        for chunk in _chunks(values):
+            yield from self.connection.execute(sql.format(",".join("?" * len(chunk))),
+                                               (*params, *chunk))
+
+    def _extend_postings(self, postings):
+        """Append the unit ids of a dict of key -> [unit id] to the stored posting lists"""
+        stored = dict(self._select_in("SELECT key, units FROM gram_postings WHERE key IN ({})",
+                                      postings))
+        rows = sorted((key, stored.get(key, b"") + _pack_units(units))
+                      for key, units in postings.items())
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO gram_postings (key, units) VALUES (?, ?)", rows)
+
+    def _find_units(self, sources):
+        """Dict of source text -> (unit id, target) for the stored ones"""
+        by_hash = {}
+        for source in sources:
+            by_hash.setdefault(text_hash(source), []).append(source)
+        found = {}
+        for unit, source_hash, source, target in self._select_in(
+                "SELECT id, source_hash, source, target FROM units "
+                "WHERE language = ? AND source_hash IN ({})", by_hash, self.language):
+            if source in by_hash[source_hash]:
+                found[source] = (unit, target)
+        return found
+
+    def add(self, pairs):
+        """Store (source, target) pairs; a known source gets the newer target.
+
+        Returns the number of sources added or changed.
+        """
+        latest = {}
+        for source, target in pairs:
+            if source and target and source != target:
+                latest[source] = target
+        if not latest:
+            return 0
+
+        now = time.time()
+        changed = 0
+        with self.connection:
+            existing = self._find_units(latest)
+            updates = []
+            for source, (unit, target) in existing.items():
+                updates.append((latest[source], now, unit))
+                if latest[source] != target:
+                    changed += 1
+            self.connection.executemany(
+                "UPDATE units SET target = ?, uses = uses + 1, updated = ? WHERE id = ?", updates)
+
+            postings = {}
+            for source, target in latest.items():
+                if source in existing:
+                    continue
+                grams = text_grams(source)
+                signature = _signature(grams) if grams else None
+                unit = self.connection.execute(
+                    "INSERT INTO units (language, source_hash, source, target, gram_count, "
+                    "signature, uses, updated) VALUES (?, ?, ?, ?, ?, ?, 1, ?)",
+                    (self.language, text_hash(source), source, target, len(grams),
+                     _SIGNATURE.pack(*_short_signature(signature)) if signature else b"",
+                     now)).lastrowid
+                if signature:
+                    for key in set(_band_keys(signature, self.salt)):
+                        postings.setdefault(key, []).append(unit)
+                changed += 1
+            self._extend_postings(postings)
+        return changed
+
+    def exact(self, sources):
+        """Dict of source -> stored translation for sources seen before"""
+        return {source: target for source, (_, target) in self._find_units(set(sources)).items()}
+
+    def fuzzy(self, sources, threshold=DEFAULT_THRESHOLD):
+        """Dict of source -> best Suggestion with a similarity of at least threshold"""
+        queries = {}
+        for source in set(sources):
+            if len(normalize(source)) >= MIN_FUZZY_LENGTH:
+                grams = text_grams(source)
+                signature = _signature(grams)
+                queries[source] = (grams, _short_signature(signature),
+                                   _band_keys(signature, self.salt))
+        if not queries:
+            return {}
+
+        all_keys = set()
+        for _, _, keys in queries.values():
+            all_keys.update(keys)
+        postings = {key: array.array("q", units) for key, units in self._select_in(
+            "SELECT key, units FROM gram_postings WHERE key IN ({})", all_keys)}
+        if sys.byteorder != "little":
+            for units in postings.values():
+                units.byteswap()
+
+        candidates = {}
+        no_units = ()
+        for source, (_, _, keys) in queries.items():
+            counts = Counter(chain.from_iterable([postings.get(key, no_units) for key in keys]))
+            if counts:
+                # sorted() is stable, so ties keep the order units were seen in (as most_common)
+                candidates[source] = sorted(counts, key=counts.__getitem__,
+                                            reverse=True)[:MAX_CANDIDATES]
+        if not candidates:
+            return {}
+
+        # Size and signature checks first; only the texts that pass are read and verified
+        shapes = {unit: (gram_count, _SIGNATURE.unpack(signature))
+                  for unit, gram_count, signature in self._select_in(
+                      # "+" keeps SQLite on the rowid instead of scanning the language index
+                      "SELECT id, gram_count, signature FROM units "
+                      "WHERE +language = ? AND id IN ({})",
+                      set().union(*candidates.values()), self.language)}
+        min_agreement = _min_agreement(threshold)
+        for source, unit_ids in candidates.items():
+            n = len(queries[source][0])
+            query_signature = queries[source][1]
+            passed = []
+            for unit in unit_ids:
+                if unit not in shapes:
+                    # A key shared with another language's unit by chance
+                    continue
+                gram_count, signature = shapes[unit]
+                # Dice cannot reach the threshold when the sizes differ too much
+                if (threshold * n <= (2 - threshold) * gram_count
+                        and threshold * gram_count <= (2 - threshold) * n
+                        and sum(map(operator.eq, query_signature, signature)) >= min_agreement):
+                    passed.append(unit)
+            candidates[source] = passed
+
+        texts = {unit: (source, target) for unit, source, target in self._select_in(
+            "SELECT id, source, target FROM units WHERE id IN ({})",
+            set().union(*candidates.values()))}
+        results = {}
+        unit_grams = {}
+        for source, unit_ids in candidates.items():
+            grams = queries[source][0]
+            best = None
+            for unit in unit_ids:
+                stored_source, target = texts[unit]
+                stored_grams = unit_grams.get(unit)
+                if stored_grams is None:
+                    stored_grams = unit_grams[unit] = text_grams(stored_source)
+                score = dice(grams, stored_grams)
+                if score >= threshold and (best is None or score > best.score):
+                    best = Suggestion(target, score, stored_source)
+            if best is not None:
+                results[source] = best
+        return results
+
+    def suggest(self, sources, threshold=DEFAULT_THRESHOLD):
+        """Dict of source -> Suggestion: exact matches first, fuzzy for the rest"""
+        sources = set(sources)
+        results = {source: Suggestion(target, 1.0, source)
+                   for source, target in self.exact(sources).items()}
+        if threshold < 1.0:
+            results.update(self.fuzzy(sources.difference(results), threshold))
+        return results
+
+
+def collect_pairs(entry_texts, translations_dict):
+    """(original line text, translation) for every line a merge changes"""
+    pairs = []
+    for entry_id, texts in entry_texts:
+        translated = translations_dict.get(entry_id)
+        if translated is None:
+            continue
+        for text in texts:
+            if text and text != translated:
+                pairs.append((text, translated))
+    return pairs
+
+
+def suggest_for_entries(memory, entry_texts, translated_ids=(), threshold=DEFAULT_THRESHOLD):
+    """Dict of entry id -> Suggestion for entries without a translation yet.
+
+    An entry is looked up by its first non-empty line text.
+    """
+    pending = {}
+    for entry_id, texts in entry_texts:
+        if entry_id in translated_ids:
+            continue
+        text = next((text for text in texts if text), None)
+        if text is not None:
+            pending[entry_id] = text
+    found = memory.suggest(pending.values(), threshold)
+    return {entry_id: found[text] for entry_id, text in pending.items() if text in found}
@@ -0,0 +1,190 @@
+"""In-memory subtitle pack model with an ID index.
+
+A pack is loaded once into compact __slots__ objects. The same SubpFile is
+used to list texts, apply translations and encode the result, so looking up
+or updating an entry by ID is a dictionary access instead of a tree walk.
+"""
+
+
+class SubpTiming:
+    """Start/end display time of one subtitle line"""
+    __slots__ = ("start", "end")
+
+    def __init__(self, start=0, end=0):
+        self.start = start
+        self.end = end
+
+    def __eq__(self, other):
+        return (isinstance(other, SubpTiming)
+                and self.start == other.start and self.end == other.end)
+
+    def __repr__(self):
+        return f"SubpTiming({self.start}, {self.end})"
+
+
+class SubpLine:
+    """One subtitle line; timing is None when the XML omits it"""
+    __slots__ = ("text", "timing")
+
+    def __init__(self, text="", timing=None):
+        self.text = text
+        self.timing = timing
+
+    def __eq__(self, other):
+        return (isinstance(other, SubpLine)
+                and self.text == other.text and self.timing == other.timing)
+
+    def __repr__(self):
+        return f"SubpLine({self.text!r}, {self.timing!r})"
+
+
+class SubpEntry:
+    """One subtitle entry (the <Entry> element of the XML form)"""
+    __slots__ = ("subtitle_id", "priority", "flags", "unknown", "additional_length", "lines")
+
+    def __init__(self, subtitle_id=0, priority=0, flags=0, unknown=0,
+                 additional_length=0, lines=None):
+        self.subtitle_id = subtitle_id
+        self.priority = priority
+        self.flags = flags
+        self.unknown = unknown
+        self.additional_length = additional_length
+        self.lines = lines if lines is not None else []
+
+    def __eq__(self, other):
+        return (isinstance(other, SubpEntry)
+                and self.subtitle_id == other.subtitle_id
+                and self.priority == other.priority
+                and self.flags == other.flags
+                and self.unknown == other.unknown
+                and self.additional_length == other.additional_length
+                and self.lines == other.lines)
+
+    def __repr__(self):
+        return f"SubpEntry(id={self.subtitle_id}, lines={self.lines!r})"
+
+
+def parse_id(entry_id):
+    """Entry ID as an int (they are strings in translation tables), or None if it is not one"""
+    if isinstance(entry_id, int):
+        return entry_id
+    try:
+        return int(entry_id)
+    except (TypeError, ValueError):
+        return None
+
+
+class SubpFile:
+    """A subtitle pack: entries in file order plus an ID -> entry index"""
+    __slots__ = ("entries", "_index", "_duplicates")
+
+    def __init__(self, entries=None):
+        self.entries = entries if entries is not None else []
+        self._index = None
+        self._duplicates = None
+
+    def __eq__(self, other):
+        return isinstance(other, SubpFile) and self.entries == other.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, entry_id):
+        return parse_id(entry_id) in self.index
+
+    def _build_index(self):
+        index = {}
+        duplicates = {}
+        for entry in self.entries:
+            first = index.setdefault(entry.subtitle_id, entry)
+            if first is not entry:
+                duplicates.setdefault(entry.subtitle_id, [first]).append(entry)
+        self._index = index
+        self._duplicates = duplicates
+
+    @property
+    def index(self):
+        """Dict of subtitle ID -> first entry with that ID, built on first use"""
+        if self._index is None:
+            self._build_index()
+        return self._index
+
+    def reindex(self):
+        """Rebuild the index after entries were added, removed or renumbered"""
+        self._index = None
+        self._duplicates = None
+
+    def get(self, entry_id, default=None):
+        """Entry for an ID (int or numeric string)"""
+        return self.index.get(parse_id(entry_id), default)
+
+    def get_all(self, entry_id):
+        """Every entry with this ID (packs rarely contain duplicates)"""
+        entry_id = parse_id(entry_id)
+        entry = self.index.get(entry_id)
+        if entry is None:
+            return []
+        return self._duplicates.get(entry_id, [entry])
+
+    def append(self, entry):
+        """Add an entry and keep the index current"""
+        self.entries.append(entry)
+        if self._index is not None:
+            first = self._index.setdefault(entry.subtitle_id, entry)
+            if first is not entry:
+                self._duplicates.setdefault(entry.subtitle_id, [first]).append(entry)
+
+    def iter_line_texts(self):
+        """Yield (entry id as string, text) for every non-empty line in file order"""
+        for entry in self.entries:
+            entry_id = str(entry.subtitle_id)
+            for line in entry.lines:
+                if line.text:
+                    yield entry_id, line.text
+
+    def apply_translations(self, translations_dict, collect_ids=True):
+        """Set every line of each translated entry, joining the table against the index.
+
+        Returns (lines changed, ["[ID x] => text", ...]) like merge_translation_to_xml.
+        """
+        index = self.index
+        duplicates = self._duplicates
+        count = 0
+        modified_ids = []
+        for key, translated in translations_dict.items():
+            entry_id = parse_id(key)
+            entry = index.get(entry_id)
+            if entry is None:
+                continue
+            for target in duplicates.get(entry_id, (entry,)) if duplicates else (entry,):
+                for line in target.lines:
+                    line.text = translated
+                    count += 1
+                    if collect_ids:
+                        modified_ids.append(f"[ID {entry_id}] => {translated}")
+        return count, modified_ids
+
+    def with_translations(self, translations_dict):
+        """Translated copy that shares every untranslated entry with this pack.
+
+        Only entries a translation applies to are copied (their timings are
+        still shared), so one decoded pack can back many translated packs
+        cheaply; this pack is left unchanged. Returns (copy, lines changed).
+        """
+        index = self.index
+        duplicates = self._duplicates
+        replaced = {}
+        count = 0
+        for key, translated in translations_dict.items():
+            entry_id = parse_id(key)
+            entry = index.get(entry_id)
+            if entry is None:
+                continue
+            for target in duplicates.get(entry_id, (entry,)) if duplicates else (entry,):
+                lines = [SubpLine(translated, line.timing) for line in target.lines]
+                replaced[id(target)] = SubpEntry(target.subtitle_id, target.priority, target.flags,
+                                                 target.unknown, target.additional_length, lines)
+                count += len(lines)
+        if not replaced:
+            return SubpFile(list(self.entries)), count
+        return SubpFile([replaced.get(id(entry), entry) for entry in self.entries]), count
@@ -0,0 +1,523 @@
+"""Entry-level diff between two versions of a pack, and patches built from it.
+
+Entries are matched by subtitle ID (the n-th entry with a duplicated ID
+matches the n-th one in the other pack), so a diff is one pass over each
+pack. Between two .subp files, entries whose stored bytes are equal are not
+decoded at all.
+
+    python -m foxsubp.patch diff data/eng/x.subp out/x.subp -o x.patch
+    python -m foxsubp.patch apply x.patch fresh/x.subp -o patched/x.subp
+
+A patch is JSON Lines (gzip-compressed when its name ends in .gz): a
+header, then one line per changed, added or removed entry. Text-only
+changes carry just the new texts; each line also has a CRC of the old texts
+so a patch applied to a different version reports conflicts instead of
+overwriting someone else's text. Applying a patch to a .subp copies every
+untouched entry's bytes unchanged and only decodes and encodes the patched
+ones.
+"""
+import gzip
+import json
+import os
+import sys
+import zlib
+
+from foxsubp import codec
+from foxsubp.mapped import MappedSubp
+from foxsubp.model import SubpEntry, SubpLine, SubpTiming
+from foxsubp.profiling import stage
+
+PATCH_FORMAT = "foxsubp-patch"
+PATCH_VERSION = 1
+
+CHANGED = "changed"
+ADDED = "added"
+REMOVED = "removed"
+
+
+class PatchError(ValueError):
+    """The patch cannot be read or cannot be applied cleanly"""
+
+
+class EntryChange:
+    """Difference of one entry: the old and new entry (None when added or removed)"""
+
+    def __init__(self, kind, key, old=None, new=None, after=None):
+        self.kind = kind
+        # (subtitle ID, occurrence) identifies the entry in both packs
+        self.key = key
+        self.old = old
+        self.new = new
+        # Key of the entry this one follows in the new pack (added entries only)
+        self.after = after
+
+    @property
+    def subtitle_id(self):
+        return self.key[0]
+
+    def __repr__(self):
+        return f"EntryChange({self.kind}, id={self.key[0]})"
+
+
+class PatchResult:
+    """Outcome of applying a patch"""
+
+    def __init__(self):
+        self.applied = 0
+        self.conflicts = []
+        self.missing = []
+
+    @property
+    def ok(self):
+        return not self.conflicts and not self.missing
+
+    def to_dict(self):
+        return {"applied": self.applied, "conflicts": self.conflicts, "missing": self.missing}
+
+# ============================================================================
+# DIFF
+# ============================================================================
+def _accessors(pack):
+    """(IDs in file order, entry at position, stored bytes at position or None)"""
+    if isinstance(pack, MappedSubp):
+        return pack.ids, pack.entry_at, pack.entry_bytes
+    return [entry.subtitle_id for entry in pack.entries], pack.entries.__getitem__, None
+
+
+def _keys(ids):
+    """Yield ((id, occurrence), position) in file order"""
+    seen = {}
+    for position, subtitle_id in enumerate(ids):
+        occurrence = seen.get(subtitle_id, 0)
+        seen[subtitle_id] = occurrence + 1
+        yield (subtitle_id, occurrence), position
+
+
+def diff_packs(old, new):
+    """EntryChanges turning old into new (SubpFile or MappedSubp), in new file order.
+
+    Removed entries come last. Entries that only moved are not reported.
+    """
+    old_ids, old_entry, old_bytes = _accessors(old)
+    new_ids, new_entry, new_bytes = _accessors(new)
+    compare_bytes = old_bytes is not None and new_bytes is not None
+    remaining = dict(_keys(old_ids))
+    changes = []
+    previous = None
+    for key, position in _keys(new_ids):
+        old_position = remaining.pop(key, None)
+        if old_position is None:
+            changes.append(EntryChange(ADDED, key, new=new_entry(position), after=previous))
+        elif not (compare_bytes and old_bytes(old_position) == new_bytes(position)):
+            before, after = old_entry(old_position), new_entry(position)
+            if before != after:
+                changes.append(EntryChange(CHANGED, key, before, after))
+        previous = key
+    for key, position in remaining.items():
+        changes.append(EntryChange(REMOVED, key, old=old_entry(position)))
+    return changes
+
+
+def open_pack(path, encoding=codec.DEFAULT_ENCODING):
+    """A .subp file as a MappedSubp (close it when done), or a SubpTool XML file as a SubpFile"""
+    if path.lower().endswith(".xml"):
+        return codec.read_subp_xml(path)
+    return MappedSubp(path, encoding)
+
+
+def diff_files(old_path, new_path, encoding=codec.DEFAULT_ENCODING):
+    """EntryChanges between two .subp/.xml files"""
+    with stage("diff", old=old_path, new=new_path) as s:
+        s.read(os.path.getsize(old_path) + os.path.getsize(new_path))
+        old = open_pack(old_path, encoding)
+        try:
+            new = open_pack(new_path, encoding)
+            try:
+                return diff_packs(old, new)
+            finally:
+                if isinstance(new, MappedSubp):
+                    new.close()
+        finally:
+            if isinstance(old, MappedSubp):
+                old.close()
+
+
+def format_changes(changes, limit=None):
+    """Readable review of changes: old and new text of every line"""
+    lines = []
+    for change in changes[:limit]:
+        marker = {CHANGED: "~", ADDED: "+", REMOVED: "-"}[change.kind]
+        lines.append(f"{marker} [ID {change.subtitle_id}]")
+        old_texts = texts_of(change.old) if change.old else []
+        new_texts = texts_of(change.new) if change.new else []
+        for i in range(max(len(old_texts), len(new_texts))):
+            old_text = old_texts[i] if i < len(old_texts) else None
+            new_text = new_texts[i] if i < len(new_texts) else None
+            if old_text == new_text:
+                lines.append(f"    {old_text}")
+                continue
+            if old_text is not None:
+                lines.append(f"  - {old_text}")
+            if new_text is not None:
+                lines.append(f"  + {new_text}")
+    if limit is not None and len(changes) > limit:
+        lines.append(f"... {len(changes) - limit} entry lagi")
+    return "\n".join(lines)
+
+
+def count_changes(changes):
+    counts = {CHANGED: 0, ADDED: 0, REMOVED: 0}
+    for change in changes:
+        counts[change.kind] += 1
+    return counts
+
+# ============================================================================
+# PATCH FORMAT
+# ============================================================================
+def texts_of(entry):
+    return [line.text for line in entry.lines]
+
+
+def text_checksum(entry):
+    """CRC-32 of an entry's texts, to check a patch is applied to the version it was made from"""
+    return f"{zlib.crc32(codec.LINE_SEPARATOR.join(texts_of(entry)).encode('utf-8')):08x}"
+
+
+def entry_to_dict(entry):
+    lines = [[line.text] if line.timing is None
+             else [line.text, line.timing.start, line.timing.end] for line in entry.lines]
+    return {"priority": entry.priority, "flags": entry.flags, "unknown": entry.unknown,
+            "additional_length": entry.additional_length, "lines": lines}
+
+
+def entry_from_dict(subtitle_id, data):
+    lines = [SubpLine(line[0], SubpTiming(line[1], line[2]) if len(line) > 2 else None)
+             for line in data["lines"]]
+    return SubpEntry(subtitle_id, data["priority"], data["flags"], data["unknown"],
+                     data["additional_length"], lines)
+
+
+def _same_layout(old, new):
+    """True when only line texts differ between two versions of an entry"""
+    return (old.priority == new.priority and old.flags == new.flags
+            and old.unknown == new.unknown and old.additional_length == new.additional_length
+            and len(old.lines) == len(new.lines)
+            and all(a.timing == b.timing for a, b in zip(old.lines, new.lines)))
+
+
+def change_to_op(change):
+    """One patch line (a dict) for an EntryChange"""
+    op = {"id": change.key[0]}
+    if change.key[1]:
+        op["n"] = change.key[1]
+    if change.kind == ADDED:
+        op["add"] = entry_to_dict(change.new)
+        op["after"] = list(change.after) if change.after else None
+        return op
+    op["old"] = text_checksum(change.old)
+    if change.kind == REMOVED:
+        op["remove"] = 1
+    elif _same_layout(change.old, change.new):
+        texts = texts_of(change.new)
+        # Translations set every line of an entry to one text; store it once
+        op["text"] = texts[0] if len(texts) > 1 and texts.count(texts[0]) == len(texts) else texts
+    else:
+        op["entry"] = entry_to_dict(change.new)
+    return op
+
+
+def make_patch(changes):
+    """Patch operations for a list of EntryChanges"""
+    return [change_to_op(change) for change in changes]
+
+
+def _open_text(path, mode):
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="\n")
+    return open(path, mode, encoding="utf-8", newline="\n")
+
+
+def write_patch(path, ops, source=None):
+    """Write patch operations as JSON Lines (gzip when path ends in .gz)"""
+    header = {"format": PATCH_FORMAT, "version": PATCH_VERSION, "ops": len(ops)}
+    if source:
+        header["source"] = os.path.basename(source)
+    with _open_text(path, "w") as f:
+        for item in [header] + ops:
+            f.write(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+    return path
+
+
+def read_patch(path):
+    """Header dict and operations of a patch file"""
+    try:
+        with _open_text(path, "r") as f:
+            items = [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError) as e:
+        raise PatchError(f"Patch tidak bisa dibaca: {path}: {e}") from None
+    if not items or items[0].get("format") != PATCH_FORMAT:
+        raise PatchError(f"Bukan file patch foxsubp: {path}")
+    if items[0].get("version") != PATCH_VERSION:
+        raise PatchError(f"Versi patch tidak didukung: {items[0].get('version')}")
+    return items[0], items[1:]
+
+# ============================================================================
+# APPLY
+# ============================================================================
+def _patched_entry(op, entry):
+    """New version of entry for a "text" or "entry" operation"""
+    if "entry" in op:
+        return entry_from_dict(entry.subtitle_id, op["entry"])
+    texts = op["text"]
+    if isinstance(texts, str):
+        texts = [texts] * len(entry.lines)
+    if len(texts) != len(entry.lines):
+        return None
+    return SubpEntry(entry.subtitle_id, entry.priority, entry.flags, entry.unknown,
+                     entry.additional_length,
+                     [SubpLine(text, line.timing) for text, line in zip(texts, entry.lines)])
+
+
+def _positions(ids, keys):
+    """Position in ids of every (id, occurrence) key found there"""
+    # Built in one C-level pass; for a repeated ID the first position wins
+    first = dict(zip(reversed(ids), range(len(ids) - 1, -1, -1)))
+    positions = {key: first[key[0]] for key in keys if key[1] == 0 and key[0] in first}
+    repeated = {key[0] for key in keys if key[1]}
+    if repeated:
+        for key, position in _keys(ids):
+            if key[0] in repeated and key in keys:
+                positions[key] = position
+    return positions
+
+
+def _apply(ids, entry_at, encode, ops, force=False, replace_text=None):
+    """Apply ops over a pack; returns (output, PatchResult).
+
+    output lists, in order, ranges of untouched positions and (id, item)
+    pairs where item is encode(entry) of a new or patched entry, so the
+    same pass serves entries and encoded bytes. Only patched entries are
+    decoded (entry_at) and looked at. replace_text(position, text, checksum),
+    when given, handles "text" operations without decoding the entry and
+    returns None on a conflict.
+    """
+    result = PatchResult()
+    edits = {}
+    additions = {}
+    for op in ops:
+        key = (op["id"], op.get("n", 0))
+        if "add" in op:
+            after = tuple(op["after"]) if op.get("after") else None
+            additions.setdefault(after, []).append((key, op))
+        else:
+            edits[key] = op
+
+    positions = _positions(ids, edits.keys() | {anchor for anchor in additions if anchor})
+    result.missing = sorted(key[0] for key in edits if key not in positions)
+    edit_at = {positions[key]: (key, op) for key, op in edits.items() if key in positions}
+    anchors_at = {}
+    for anchor in additions:
+        if anchor in positions:
+            anchors_at.setdefault(positions[anchor], []).append(anchor)
+
+    output = []
+
+    def add_after(anchor):
+        # Added entries may follow each other; emit every chain hanging off anchor
+        pending = list(reversed(additions.pop(anchor, [])))
+        while pending:
+            key, op = pending.pop()
+            output.append((key[0], encode(entry_from_dict(key[0], op["add"]))))
+            result.applied += 1
+            pending.extend(reversed(additions.pop(key, [])))
+
+    add_after(None)
+    cursor = 0
+    for position in sorted(edit_at.keys() | anchors_at.keys()):
+        edit = edit_at.get(position)
+        stop = position if edit else position + 1
+        if cursor < stop:
+            output.append(range(cursor, stop))
+        if edit and replace_text is not None and "text" in edit[1]:
+            key, op = edit
+            item = replace_text(position, op["text"], None if force else op["old"])
+            if item is None:
+                result.conflicts.append(key[0])
+                output.append(range(position, position + 1))
+            else:
+                result.applied += 1
+                output.append((key[0], item))
+        elif edit:
+            key, op = edit
+            entry = entry_at(position)
+            patched = None
+            if force or text_checksum(entry) == op["old"]:
+                if op.get("remove"):
+                    result.applied += 1
+                else:
+                    patched = _patched_entry(op, entry)
+            if patched is not None:
+                result.applied += 1
+                output.append((key[0], encode(patched)))
+            elif not (op.get("remove") and (force or text_checksum(entry) == op["old"])):
+                # Not the text the patch was made against: keep the pack's own entry
+                result.conflicts.append(key[0])
+                output.append(range(position, position + 1))
+        for anchor in anchors_at.get(position, ()):
+            add_after(anchor)
+        cursor = position + 1
+    if cursor < len(ids):
+        output.append(range(cursor, len(ids)))
+    # Entries added after an anchor that no longer exists go to the end
+    for anchor in list(additions):
+        add_after(anchor)
+    return output, result
+
+
+def _text_replacer(pack, encoding):
+    """replace_text for _apply over a MappedSubp: rewrites an entry's stored bytes.
+
+    The header and timings are copied as stored; only the text and its two
+    length fields change, like decoding, editing and encoding the entry.
+    """
+    def replace_text(position, text, checksum):
+        blob = pack.entry_bytes(position)
+        old_texts = codec.entry_line_texts(blob, encoding, pack.ids[position])
+        if checksum is not None:
+            joined = codec.LINE_SEPARATOR.join(old_texts)
+            if f"{zlib.crc32(joined.encode('utf-8')):08x}" != checksum:
+                return None
+        texts = [text] * len(old_texts) if isinstance(text, str) else text
+        if len(texts) != len(old_texts):
+            return None
+        return codec.replace_entry_texts(blob, texts, encoding, pack.ids[position])
+    return replace_text
+
+
+def apply_patch(subp, ops, force=False):
+    """Apply patch operations to a SubpFile in place; returns a PatchResult.
+
+    Entries whose current text is not the one the patch was made from are
+    left alone and listed as conflicts, unless force is set.
+    """
+    output, result = _apply([entry.subtitle_id for entry in subp.entries],
+                            subp.entries.__getitem__, lambda entry: entry, ops, force)
+    entries = []
+    for item in output:
+        if type(item) is range:
+            entries.extend(subp.entries[item.start:item.stop])
+        else:
+            entries.append(item[1])
+    subp.entries = entries
+    subp.reindex()
+    return result
+
+
+def apply_patch_to_file(pack_path, ops, output_path=None, encoding=codec.DEFAULT_ENCODING,
+                        force=False):
+    """Apply patch operations to a .subp/.xml file and write the result (default: in place).
+
+    A .subp file is read through a memory map: untouched entries are copied
+    as stored and only patched ones are decoded and encoded. Conflicts or
+    entries missing from the pack raise PatchError and nothing is written,
+    unless force is set.
+    """
+    output_path = output_path or pack_path
+    with stage("apply_patch", path=pack_path) as s:
+        s.read(os.path.getsize(pack_path))
+        if pack_path.lower().endswith(".xml"):
+            subp = codec.read_subp_xml(pack_path)
+            result = apply_patch(subp, ops, force)
+            data = None
+        else:
+            with MappedSubp(pack_path, encoding) as pack:
+                output, result = _apply(pack.ids, pack.entry_at,
+                                        lambda entry: codec.encode_entry(entry, encoding),
+                                        ops, force, _text_replacer(pack, encoding))
+                data = pack.splice(output)
+    if not result.ok and not force:
+        problems = []
+        if result.conflicts:
+            problems.append(f"{len(result.conflicts)} entry teksnya berbeda dari sumber patch "
+                            f"(ID {', '.join(map(str, result.conflicts[:10]))})")
+        if result.missing:
+            problems.append(f"{len(result.missing)} entry tidak ada "
+                            f"(ID {', '.join(map(str, result.missing[:10]))})")
+        raise PatchError(f"{pack_path}: " + "; ".join(problems))
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with stage("write", path=output_path) as s:
+        if data is None:
+            codec.write_subp_xml(subp, output_path)
+        else:
+            with open(output_path, "wb") as f:
+                f.write(data)
+        s.wrote(os.path.getsize(output_path))
+    return result
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+def main(argv=None):
+    """Entry point for python -m foxsubp.patch"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="python -m foxsubp.patch",
+        description="Bandingkan dua versi file SUBP/XML per entry, lalu buat dan terapkan patch.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    diff_parser = commands.add_parser("diff", help="tampilkan perubahan dan buat patch")
+    diff_parser.add_argument("old", help="file .subp/.xml asli")
+    diff_parser.add_argument("new", help="file .subp/.xml hasil terjemahan")
+    diff_parser.add_argument("-o", "--output", help="simpan patch ke file ini (.gz: dikompres)")
+    diff_parser.add_argument("-l", "--lang", help="kode bahasa untuk encoding teks")
+    diff_parser.add_argument("--limit", type=int, default=50,
+                             help="jumlah entry yang ditampilkan (default: 50, 0: semua)")
+    diff_parser.add_argument("-q", "--quiet", action="store_true",
+                             help="hanya tampilkan ringkasan")
+    apply_parser = commands.add_parser("apply", help="terapkan patch ke file .subp/.xml")
+    apply_parser.add_argument("patch", help="file patch")
+    apply_parser.add_argument("pack", help="file .subp/.xml yang di-patch")
+    apply_parser.add_argument("-o", "--output", help="file output (default: timpa file input)")
+    apply_parser.add_argument("-l", "--lang", help="kode bahasa untuk encoding teks")
+    apply_parser.add_argument("-f", "--force", action="store_true",
+                              help="terapkan walaupun teks di file berbeda dari sumber patch")
+    args = parser.parse_args(argv)
+    encoding = codec.get_encoding(args.lang)
+
+    if args.command == "diff":
+        for path in (args.old, args.new):
+            if not os.path.exists(path):
+                print(f"File tidak ditemukan: {path}", file=sys.stderr)
+                return 2
+        changes = diff_files(args.old, args.new, encoding)
+        if not args.quiet and changes:
+            print(format_changes(changes, args.limit or None))
+        counts = count_changes(changes)
+        print(f"{counts[CHANGED]} entry diubah, {counts[ADDED]} ditambah, "
+              f"{counts[REMOVED]} dihapus")
+        if args.output:
+            write_patch(args.output, make_patch(changes), args.old)
+            print(f"Patch disimpan: {args.output} ({os.path.getsize(args.output)} byte)")
+        return 0
+
+    for path in (args.patch, args.pack):
+        if not os.path.exists(path):
+            print(f"File tidak ditemukan: {path}", file=sys.stderr)
+            return 2
+    try:
+        _, ops = read_patch(args.patch)
+        result = apply_patch_to_file(args.pack, ops, args.output, encoding, args.force)
+    except (PatchError, codec.SubpFormatError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"{result.applied} dari {len(ops)} perubahan diterapkan: {args.output or args.pack}")
+    if result.conflicts or result.missing:
+        print(f"Dilewati: {len(result.conflicts)} konflik, {len(result.missing)} entry tidak ada")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
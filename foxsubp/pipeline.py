@@ -0,0 +1,285 @@
+"""Core SUBP/XML pipeline shared by the GUI, batch mode and scripts.
+
+Extract, load, merge, encode and convert, with the native codec first and
+SubpTool.exe as the fallback. Importing this module loads no GUI modules
+and little else: the decode cache, the SubpTool pool, workspaces and the
+XML parsers are imported by the functions that use them, so short-lived
+headless processes (batch workers, scripts) start fast:
+
+    from foxsubp.pipeline import load_subp_model, save_subp_model
+"""
+import os
+import sys
+import threading
+
+from foxsubp import codec
+from foxsubp.profiling import stage
+
+# ============================================================================
+# SUBP PROCESSING FUNCTIONS
+# ============================================================================
+SUBP_TOOL_ENV = "FOXSUBP_SUBP_TOOL"
+
+# Guards lazily created shared objects; background jobs may ask for them concurrently
+_shared_lock = threading.Lock()
+subp_tool_pool = None
+decode_cache = None
+
+
+def get_subp_tool_path():
+    """Get the path to SubpTool.exe"""
+    # Get the directory where the current script/executable is located
+    if getattr(sys, 'frozen', False):
+        # If running as compiled executable
+        script_dir = os.path.dirname(sys.executable)
+    else:
+        # If running as script: Translator.py and FoxEngine/ sit above this package
+        script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    # SUBP_TOOL_ENV points at another tool, e.g. a stand-in script for tests
+    subp_tool = os.environ.get(SUBP_TOOL_ENV) or os.path.join(script_dir, "FoxEngine", "SubpTool.exe")
+
+    if not os.path.exists(subp_tool):
+        raise FileNotFoundError(f"SubpTool.exe tidak ditemukan di: {subp_tool}")
+
+    return subp_tool
+
+
+def create_temp_directory():
+    """Create a private temporary directory for one SUBP processing job"""
+    # Each job gets its own workspace so concurrent jobs never share file names;
+    # workspaces still alive at exit are removed by workspaces.cleanup_all
+    from foxsubp.workspace import workspaces
+    return workspaces.create().path
+
+
+def get_decode_cache():
+    """Get the shared cache of decoded SUBP files"""
+    global decode_cache
+    with _shared_lock:
+        if decode_cache is None:
+            from foxsubp.cache import DecodeCache
+            decode_cache = DecodeCache()
+    return decode_cache
+
+
+def extract_subp_to_xml(subp_path, temp_dir=None, language=None):
+    """Extract SUBP file to XML, using SubpTool.exe only if the native codec fails"""
+    try:
+        # Packs decoded before are loaded from the content-hash cache
+        subp = decode_subp_file(subp_path, language)
+    except codec.SubpFormatError as e:
+        print(f"Native SUBP reader failed, falling back to SubpTool.exe: {e}")  # Debug output
+        return extract_subp_to_xml_with_tool(subp_path, temp_dir, language)
+
+    try:
+        temp_dir = temp_dir or create_temp_directory()
+        subp_name_without_ext = os.path.splitext(os.path.basename(subp_path))[0]
+        temp_xml = os.path.join(temp_dir, f"{subp_name_without_ext}.xml")
+        with stage("xml_write", path=temp_xml) as s:
+            codec.write_subp_xml(subp, temp_xml)
+            s.wrote(os.path.getsize(temp_xml))
+        return temp_xml
+
+    except Exception as e:
+        raise Exception(f"Error saat ekstrak SUBP: {str(e)}")
+
+
+def decode_subp_file(subp_path, language=None):
+    """Decode a SUBP file with the native codec through the decode cache"""
+    with stage("decode", path=subp_path) as s:
+        s.read(os.path.getsize(subp_path))
+        return get_decode_cache().load_subp(subp_path, codec.get_encoding(language))
+
+
+def load_subp_model(subp_path, temp_dir=None, language=None):
+    """Load a SUBP file as an indexed SubpFile, using SubpTool.exe only if the native codec fails"""
+    try:
+        return decode_subp_file(subp_path, language)
+    except codec.SubpFormatError as e:
+        print(f"Native SUBP reader failed, falling back to SubpTool.exe: {e}")  # Debug output
+
+    xml_path = extract_subp_to_xml_with_tool(subp_path, temp_dir, language)
+    try:
+        with stage("xml_parse", path=xml_path) as s:
+            s.read(os.path.getsize(xml_path))
+            return codec.read_subp_xml(xml_path)
+    except codec.SubpFormatError as e:
+        raise Exception(f"Error saat ekstrak SUBP: {str(e)}")
+
+
+def save_subp_model(subp, output_subp_path, xml_path=None, language=None):
+    """Encode a SubpFile to SUBP, using SubpTool.exe only if the native codec fails.
+
+    xml_path, if given, must already hold the XML export of subp; it is what
+    the fallback hands to SubpTool.exe.
+    """
+    try:
+        with stage("encode", path=output_subp_path):
+            data = codec.encode_subp(subp, codec.get_encoding(language))
+    except codec.SubpFormatError as e:
+        print(f"Native SUBP writer failed, falling back to SubpTool.exe: {e}")  # Debug output
+        if xml_path is None:
+            xml_path = os.path.join(create_temp_directory(),
+                                    os.path.splitext(os.path.basename(output_subp_path))[0] + ".xml")
+            codec.write_subp_xml(subp, xml_path)
+        return convert_xml_to_subp_with_tool(xml_path, output_subp_path, language)
+
+    try:
+        with stage("write", path=output_subp_path) as s, open(output_subp_path, "wb") as f:
+            f.write(data)
+            s.wrote(len(data))
+        return output_subp_path
+
+    except Exception as e:
+        raise Exception(f"Error saat konversi XML ke SUBP: {str(e)}")
+
+
+def convert_xml_to_subp(xml_path, output_subp_path, language=None):
+    """Convert XML back to SUBP, using SubpTool.exe only if the native codec fails"""
+    try:
+        with stage("xml_parse", path=xml_path) as s:
+            s.read(os.path.getsize(xml_path))
+            subp = codec.read_subp_xml(xml_path)
+        with stage("encode", path=output_subp_path):
+            data = codec.encode_subp(subp, codec.get_encoding(language))
+    except codec.SubpFormatError as e:
+        print(f"Native SUBP writer failed, falling back to SubpTool.exe: {e}")  # Debug output
+        return convert_xml_to_subp_with_tool(xml_path, output_subp_path, language)
+
+    try:
+        with stage("write", path=output_subp_path) as s, open(output_subp_path, "wb") as f:
+            f.write(data)
+            s.wrote(len(data))
+        return output_subp_path
+
+    except Exception as e:
+        raise Exception(f"Error saat konversi XML ke SUBP: {str(e)}")
+
+
+def get_subp_tool_pool():
+    """Get the shared SubpTool.exe process pool, starting it on first use"""
+    global subp_tool_pool
+    with _shared_lock:
+        if subp_tool_pool is None:
+            from foxsubp.toolpool import SubpToolPool
+            subp_tool_pool = SubpToolPool(get_subp_tool_path(), workers=os.cpu_count() or 1)
+    return subp_tool_pool
+
+
+def run_subp_tool(input_path, language=None):
+    """Run SubpTool.exe on one file through the shared pool and return the output path"""
+    with stage("subp_tool", path=input_path) as s:
+        s.read(os.path.getsize(input_path))
+        job = get_subp_tool_pool().submit(input_path, language).result()
+        # Time spent queued for a free tool process vs. running the tool itself
+        s.args.update(wait_seconds=round(job.wait_seconds, 6), run_seconds=round(job.run_seconds, 6))
+        if job.ok and os.path.exists(job.output_path):
+            s.wrote(os.path.getsize(job.output_path))
+    print(f"Command output: {job.stdout}")  # Debug output
+    print(f"Command errors: {job.stderr}")  # Debug output
+
+    if not job.ok:
+        raise Exception(job.error)
+    return job.output_path
+
+
+def extract_subp_to_xml_with_tool(subp_path, temp_dir=None, language=None):
+    """Extract SUBP file to XML using SubpTool.exe"""
+    from foxsubp.workspace import link_or_copy
+    try:
+        temp_dir = temp_dir or create_temp_directory()
+
+        # Stage SUBP file in the temp directory (hardlink/reflink, copy as last resort)
+        subp_filename = os.path.basename(subp_path)
+        temp_subp = os.path.join(temp_dir, subp_filename)
+        with stage("copy", path=subp_path) as s:
+            link_or_copy(subp_path, temp_subp)
+            s.wrote(os.path.getsize(temp_subp))
+
+        # SubpTool.exe writes <name>.xml next to the staged SUBP file
+        return run_subp_tool(temp_subp, language)
+
+    except Exception as e:
+        raise Exception(f"Error saat ekstrak SUBP: {str(e)}")
+
+
+def convert_xml_to_subp_with_tool(xml_path, output_subp_path, language=None):
+    """Convert XML back to SUBP using SubpTool.exe"""
+    from foxsubp.workspace import move_file
+    try:
+        # SubpTool.exe writes <name>.subp next to the XML file
+        generated_subp = run_subp_tool(xml_path, language)
+
+        # Move the generated SUBP to the final output location
+        with stage("move", path=output_subp_path):
+            move_file(generated_subp, output_subp_path)
+
+        return output_subp_path
+
+    except Exception as e:
+        raise Exception(f"Error saat konversi XML ke SUBP: {str(e)}")
+
+# ============================================================================
+# XML PROCESSING FUNCTIONS
+# ============================================================================
+# XML files at least this large are merged with the streaming writer so that
+# peak memory stays flat; both writers produce identical output
+STREAMING_MERGE_THRESHOLD = 16 * 1024 * 1024
+
+
+def parse_manual_translation(text_input, report=None):
+    """Parse manual translation input text into dictionary"""
+    # Duplicate and malformed [ID n] lines are collected in report if given
+    from foxsubp.translations import parse_translation_text
+    return parse_translation_text(text_input, "manual", report)
+
+
+def merge_translation_to_xml(xml_path, translations_dict, streaming=None, output_path=None):
+    """Merge translations into XML file (written to output_path if given, else in place)"""
+    output_path = output_path or xml_path
+    if streaming is None:
+        streaming = os.path.getsize(xml_path) >= STREAMING_MERGE_THRESHOLD
+    if streaming:
+        from foxsubp import xmlstream
+        with stage("xml_merge_streaming", path=xml_path) as s:
+            s.read(os.path.getsize(xml_path))
+            result = xmlstream.merge_translation_to_xml_streaming(xml_path, translations_dict,
+                                                                  output_path)
+            s.wrote(os.path.getsize(output_path))
+        return result
+
+    import xml.etree.ElementTree as ET
+    with stage("xml_parse", path=xml_path) as s:
+        s.read(os.path.getsize(xml_path))
+        tree = ET.parse(xml_path)
+        root = tree.getroot()
+
+    # Clean namespace
+    with stage("xml_strip_namespace"):
+        for elem in root.iter():
+            if "}" in elem.tag:
+                elem.tag = elem.tag.split("}", 1)[1]
+
+    modified_count = 0
+    modified_ids = []
+
+    # Update entries
+    with stage("xml_update"):
+        for entry in root.findall(".//Entry"):
+            entry_id = entry.get("Id")
+            if entry_id in translations_dict:
+                lines = entry.find("Lines")
+                if lines is not None:
+                    for line in lines.findall("Line"):
+                        old_text = line.get("Text")
+                        if old_text is not None:
+                            line.set("Text", translations_dict[entry_id])
+                            modified_count += 1
+                            modified_ids.append(f"[ID {entry_id}] => {translations_dict[entry_id]}")
+
+    # Save file
+    with stage("xml_write", path=output_path) as s:
+        tree.write(output_path, encoding="utf-8", xml_declaration=True)
+        s.wrote(os.path.getsize(output_path))
+    return modified_count, output_path, modified_ids
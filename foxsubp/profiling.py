@@ -0,0 +1,282 @@
+"""Lightweight timing of pipeline stages, with JSON and Chrome trace export.
+
+Each stage (copy, SubpTool run, XML parse, namespace cleanup, write, ...)
+is wrapped in a context manager that records its wall time, the bytes it
+reports having read and written, and memory peaks:
+
+    with stage("xml_parse", path=xml_path) as s:
+        tree = ET.parse(xml_path)
+        s.read(os.path.getsize(xml_path))
+
+Stages go to one recorder per process and cost a few microseconds each
+(json and cProfile are only imported for an export or a dump).
+rss_peak_kb is the high-water mark of the whole process when the stage
+ended; when tracemalloc is tracing, py_peak_kb is the peak of Python
+allocations during the stage itself.
+
+    write_chrome_trace("trace.json", get_recorder().drain())
+
+The file opens in chrome://tracing or https://ui.perfetto.dev. A cProfile
+dump per job is written when FOXSUBP_PROFILE names a directory (see
+profile_job).
+"""
+import collections
+import functools
+import itertools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+PROFILE_DIR_ENV = "FOXSUBP_PROFILE"
+TRACE_PATH_ENV = "FOXSUBP_TRACE"
+# Oldest stages are dropped past this so a long GUI session stays bounded
+MAX_EVENTS = 100000
+
+_profile_numbers = itertools.count(1)
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB (None where unsupported)"""
+    # Linux carries ru_maxrss over from the parent across exec; VmHWM does not
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class Stage:
+    """One running stage; the object returned by stage()"""
+
+    def __init__(self, recorder, name, args):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self._py_peak = 0
+        self._started_ns = 0
+
+    def read(self, count):
+        """Add count bytes to what this stage read"""
+        self.bytes_read += count
+
+    def wrote(self, count):
+        """Add count bytes to what this stage wrote"""
+        self.bytes_written += count
+
+    def __enter__(self):
+        stack = self.recorder._stack()
+        if tracemalloc.is_tracing():
+            # The parent keeps the peak reached so far; ours starts fresh
+            if stack:
+                stack[-1]._py_peak = max(stack[-1]._py_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        stack.append(self)
+        self._started_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ended_ns = time.perf_counter_ns()
+        stack = self.recorder._stack()
+        stack.pop()
+        event = {
+            "name": self.name,
+            "ts_us": self._started_ns // 1000,
+            "dur_us": (ended_ns - self._started_ns) // 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_native_id(),
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "rss_peak_kb": peak_rss_kb(),
+            "args": self.args,
+        }
+        if tracemalloc.is_tracing():
+            self._py_peak = max(self._py_peak, tracemalloc.get_traced_memory()[1])
+            event["py_peak_kb"] = self._py_peak // 1024
+            if stack:
+                stack[-1]._py_peak = max(stack[-1]._py_peak, self._py_peak)
+        if exc_type is not None:
+            event["error"] = exc_type.__name__
+        self.recorder.add(event)
+        return False
+
+
+class Recorder:
+    """Collects finished stages of every thread of this process"""
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self._events = collections.deque(maxlen=max_events)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def stage(self, name, **args):
+        return Stage(self, name, args)
+
+    def add(self, event):
+        with self._lock:
+            self._events.append(event)
+
+    def extend(self, events):
+        """Add stages recorded elsewhere, e.g. in a worker process"""
+        with self._lock:
+            self._events.extend(events)
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def drain(self):
+        """Return the recorded stages and forget them"""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+
+_recorder = Recorder()
+
+
+def get_recorder():
+    """The recorder stage() writes to in this process"""
+    return _recorder
+
+
+def stage(name, **args):
+    """Context manager timing one stage; keyword args are stored with it"""
+    return _recorder.stage(name, **args)
+
+
+def timed(name=None):
+    """Decorator running every call of a function as a stage"""
+    def decorate(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _recorder.stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+def summarize_stages(events):
+    """Totals per stage name: count, seconds (total and max), bytes read and written"""
+    totals = {}
+    for event in events:
+        total = totals.setdefault(event["name"], {
+            "count": 0, "seconds": 0.0, "max_seconds": 0.0,
+            "bytes_read": 0, "bytes_written": 0})
+        seconds = event["dur_us"] / 1e6
+        total["count"] += 1
+        total["seconds"] += seconds
+        total["max_seconds"] = max(total["max_seconds"], seconds)
+        total["bytes_read"] += event["bytes_read"]
+        total["bytes_written"] += event["bytes_written"]
+    for total in totals.values():
+        total["seconds"] = round(total["seconds"], 6)
+        total["max_seconds"] = round(total["max_seconds"], 6)
+    return dict(sorted(totals.items(), key=lambda item: -item[1]["seconds"]))
+
+
+def format_stages(summary):
+    """Human readable table of summarize_stages output"""
+    lines = ["", "Tahap:"]
+    for name, total in summary.items():
+        lines.append(f"  {name:22} {total['count']:6}x {total['seconds']:9.3f}s "
+                     f"(maks {total['max_seconds']:.3f}s)  baca {total['bytes_read'] / 1024:10.0f} KiB  "
+                     f"tulis {total['bytes_written'] / 1024:10.0f} KiB")
+    return "\n".join(lines)
+
+
+def to_chrome_trace(events):
+    """Chrome trace ("Trace Event Format") dict for a list of stages"""
+    trace_events = []
+    for event in events:
+        args = {key: value for key, value in event.items()
+                if key not in ("name", "ts_us", "dur_us", "pid", "tid", "args")}
+        args.update(event["args"])
+        trace_events.append({
+            "name": event["name"], "cat": "foxsubp", "ph": "X",
+            "ts": event["ts_us"], "dur": event["dur_us"],
+            "pid": event["pid"], "tid": event["tid"], "args": args,
+        })
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+def write_json(path, events):
+    """Write stages and their totals as plain JSON"""
+    import json
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"stages": summarize_stages(events), "events": events},
+                  f, indent=1, ensure_ascii=False, default=str)
+
+
+def write_chrome_trace(path, events):
+    """Write stages as a Chrome trace file"""
+    import json
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(to_chrome_trace(events), f, ensure_ascii=False, default=str)
+
+# ============================================================================
+# CPROFILE
+# ============================================================================
+def get_profile_dir():
+    """Directory for per-job cProfile dumps set by FOXSUBP_PROFILE, or None"""
+    return os.environ.get(PROFILE_DIR_ENV) or None
+
+
+class profile_job:
+    """Context manager writing a cProfile dump of one job to profile_dir.
+
+    Does nothing without a directory (the default is get_profile_dir()).
+    Only the calling thread is profiled. Dumps are named
+    <job name>-<pid>-<n>.prof and open with pstats or snakeviz.
+    """
+
+    def __init__(self, name, profile_dir=None):
+        self.name = name
+        self.profile_dir = profile_dir or get_profile_dir()
+        self.path = None
+        self._profile = None
+
+    def __enter__(self):
+        if self.profile_dir:
+            import cProfile
+            self._profile = cProfile.Profile()
+            try:
+                self._profile.enable()
+            except ValueError:
+                # Another profiler is active in this thread (nested job)
+                self._profile = None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profile is None:
+            return False
+        self._profile.disable()
+        import re
+        os.makedirs(self.profile_dir, exist_ok=True)
+        safe_name = re.sub(r"[^\w.-]+", "_", os.path.basename(self.name)) or "job"
+        self.path = os.path.join(self.profile_dir,
+                                 f"{safe_name}-{os.getpid()}-{next(_profile_numbers)}.prof")
+        self._profile.dump_stats(self.path)
+        return False
@@ -0,0 +1,223 @@
+"""Virtualized list of result lines for the GUI.
+
+Extracting or merging a pack can produce tens of thousands of lines. A Tk
+Text widget re-lays out on every insert, so instead the lines stay in a
+Python list and only the rows that fit in the window are written into a
+small Text widget, replaced wholesale on every scroll. Filtering works on
+row indices and the full text for the clipboard is joined only on request.
+"""
+import re
+import tkinter as tk
+import tkinter.font as tkfont
+
+_ROW_ID = re.compile(r"\[ID (\d+)\]")
+
+# Wait this long after the last keystroke before re-filtering
+FILTER_DELAY_MS = 150
+
+
+class ResultView(tk.Frame):
+    """Scrollable, filterable view over a list of text lines"""
+
+    def __init__(self, master, width=90, height=12, **kwargs):
+        super().__init__(master, **kwargs)
+        self._rows = []
+        self._lowered = None
+        self._id_index = None
+        self._view = None  # row indices matching the filter, None when unfiltered
+        self._offset = 0
+        self._highlight = None
+        self._filter_job = None
+        self._default_height = height
+        self._line_height = None
+
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # Filter / jump-to-ID bar
+        self.toolbar = tk.Frame(self)
+        self.toolbar.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 4))
+        self.filter_label = tk.Label(self.toolbar, text="Filter:")
+        self.filter_label.pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        self.filter_entry = tk.Entry(self.toolbar, textvariable=self.filter_var, width=25)
+        self.filter_entry.pack(side=tk.LEFT, padx=(2, 10))
+        self.filter_entry.bind("<KeyRelease>", self._schedule_filter)
+        self.jump_label = tk.Label(self.toolbar, text="Lompat ke ID:")
+        self.jump_label.pack(side=tk.LEFT)
+        self.jump_var = tk.StringVar()
+        self.jump_entry = tk.Entry(self.toolbar, textvariable=self.jump_var, width=14)
+        self.jump_entry.pack(side=tk.LEFT, padx=2)
+        self.jump_entry.bind("<Return>", lambda event: self.jump_to_id(self.jump_var.get()))
+        self.count_label = tk.Label(self.toolbar, text="0 baris", fg="gray")
+        self.count_label.pack(side=tk.RIGHT)
+
+        # Only the visible rows ever live in this widget
+        self.text = tk.Text(self, width=width, height=height, wrap=tk.NONE, state=tk.DISABLED)
+        self.text.grid(row=1, column=0, sticky="nsew")
+        self.text.tag_configure("highlight", background="#ffd54f", foreground="#000000")
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+        self.xscrollbar = tk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.xscrollbar.grid(row=2, column=0, sticky="ew")
+        self.text.configure(xscrollcommand=self.xscrollbar.set)
+
+        self.text.bind("<Configure>", lambda event: self._render())
+        self.text.bind("<MouseWheel>", self._on_mousewheel)
+        self.text.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda event: self.scroll(3))
+        self.text.bind("<Prior>", lambda event: self.scroll(-self._visible_count()))
+        self.text.bind("<Next>", lambda event: self.scroll(self._visible_count()))
+        self.text.bind("<Up>", lambda event: self.scroll(-1))
+        self.text.bind("<Down>", lambda event: self.scroll(1))
+        self.text.bind("<Control-Home>", lambda event: self.scroll_to(0))
+        self.text.bind("<Control-End>", lambda event: self.scroll_to(self._row_count()))
+        # Clicking focuses the read-only widget so the keys above work
+        self.text.bind("<Button-1>", lambda event: self.text.focus_set())
+
+    # ------------------------------------------------------------------ data
+    def set_lines(self, lines):
+        """Replace the content; lines is kept as is (no copy)"""
+        self._rows = lines if isinstance(lines, list) else list(lines)
+        self._lowered = None
+        self._id_index = None
+        self._highlight = None
+        self._offset = 0
+        self._apply_filter()
+
+    def append_lines(self, lines):
+        """Add lines at the end"""
+        self._rows.extend(lines)
+        self._lowered = None
+        self._id_index = None
+        self._apply_filter(keep_offset=True)
+
+    def clear(self):
+        self.set_lines([])
+
+    def get_text(self, filtered=True):
+        """All lines (only those matching the filter if filtered) joined once"""
+        if filtered and self._view is not None:
+            rows = self._rows
+            return "\n".join(rows[i] for i in self._view)
+        return "\n".join(self._rows)
+
+    # ------------------------------------------------------------- filtering
+    def _schedule_filter(self, event=None):
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(FILTER_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self, keep_offset=False):
+        self._filter_job = None
+        needle = self.filter_var.get().strip().lower()
+        if not needle:
+            self._view = None
+        else:
+            if self._lowered is None:
+                self._lowered = [row.lower() for row in self._rows]
+            self._view = [i for i, row in enumerate(self._lowered) if needle in row]
+        if not keep_offset:
+            self._offset = 0
+        self._render()
+
+    # ------------------------------------------------------------ navigation
+    def jump_to_id(self, entry_id):
+        """Scroll so the first line of entry_id is at the top and highlight it"""
+        entry_id = str(entry_id).strip()
+        if not entry_id:
+            return False
+        if self._id_index is None:
+            index = {}
+            for i, row in enumerate(self._rows):
+                match = _ROW_ID.search(row)
+                if match:
+                    index.setdefault(match.group(1), i)
+            self._id_index = index
+
+        row = self._id_index.get(entry_id)
+        if row is None:
+            self.count_label.config(text=f"ID {entry_id} tidak ditemukan")
+            return False
+        if self._view is not None and row not in self._view:
+            # The filter hides this ID; show everything again
+            self.filter_var.set("")
+            self._view = None
+        self._highlight = row
+        position = row if self._view is None else self._view.index(row)
+        self.scroll_to(position)
+        return True
+
+    def scroll(self, rows):
+        self.scroll_to(self._offset + rows)
+        return "break"
+
+    def scroll_to(self, position):
+        self._offset = position
+        self._render()
+        return "break"
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-3 * step)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self._row_count()))
+        elif action == "scroll":
+            step = self._visible_count() if unit == "pages" else 1
+            self.scroll(int(value) * step)
+
+    # ------------------------------------------------------------- rendering
+    def _row_count(self):
+        return len(self._rows) if self._view is None else len(self._view)
+
+    def _visible_count(self):
+        height = self.text.winfo_height()
+        if height <= 1:
+            return self._default_height
+        if self._line_height is None:
+            font = tkfont.Font(font=self.text.cget("font"))
+            self._line_height = max(1, font.metrics("linespace"))
+        return max(1, height // self._line_height)
+
+    def _render(self):
+        total = self._row_count()
+        visible = self._visible_count()
+        self._offset = max(0, min(self._offset, total - visible))
+
+        end = min(total, self._offset + visible)
+        if self._view is None:
+            indices = range(self._offset, end)
+        else:
+            indices = self._view[self._offset:end]
+        rows = self._rows
+
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(rows[i] for i in indices))
+        if self._highlight in indices:
+            line = indices.index(self._highlight) + 1
+            self.text.tag_add("highlight", f"{line}.0", f"{line}.end")
+        self.text.configure(state=tk.DISABLED)
+
+        if total:
+            self.scrollbar.set(self._offset / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+        if self._view is None:
+            self.count_label.config(text=f"{total} baris")
+        else:
+            self.count_label.config(text=f"{total} / {len(rows)} baris")
+
+    def set_colors(self, bg, fg, entry_bg, entry_fg):
+        """Apply the GUI theme to the view and its toolbar"""
+        self.configure(bg=bg)
+        self.toolbar.configure(bg=bg)
+        for label in (self.filter_label, self.jump_label):
+            label.configure(bg=bg, fg=fg)
+        self.count_label.configure(bg=bg)
+        for entry in (self.filter_entry, self.jump_entry):
+            entry.configure(bg=entry_bg, fg=entry_fg, insertbackground=fg)
+        self.text.configure(bg=entry_bg, fg=entry_fg, insertbackground=fg)
@@ -0,0 +1,263 @@
+"""Scanner and on-disk index for SUBP/LNG files in an unpacked game data tree.
+
+The tree is walked with os.scandir, so each directory is listed once and the
+file size and mtime come with the listing. The index remembers, per file,
+its size, mtime, language and content hash; a file is only hashed again
+when its size or mtime changed, so rescanning a tree of thousands of files
+mostly costs the directory listings:
+
+    index = ScanIndex("data/.foxsubp-index.json")
+    result = index.scan("data/")
+    index.save()
+    for record in largest_first(result.files): ...
+
+The language is taken from the path the way the game lays files out
+(.../subp/rus/xxx.subp, xxx.jpn.lng2, lang_..._eng_fpk/...).
+
+    python -m foxsubp.scan data/
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+
+from foxsubp import cache, codec, incremental
+
+INDEX_NAME = ".foxsubp-index.json"
+INDEX_VERSION = 1
+# Hashes from another hash function cannot be compared
+HASH_NAME = "xxh3_128" if cache.XXHASH_AVAILABLE else "blake2b_128"
+
+SCAN_EXTENSIONS = (".subp", ".lng", ".lng2")
+
+_NAME_PARTS = re.compile(r"[._\-]")
+
+
+def detect_language(path):
+    """Language code (eng, rus, jpn, ...) named by the file or its folders, or None"""
+    parts = os.path.normpath(path).replace("\\", "/").split("/")
+    for part in reversed(parts):
+        for word in reversed(_NAME_PARTS.split(part.lower())):
+            if word in codec.LANGUAGE_ENCODINGS:
+                return word
+    return None
+
+
+def iter_files(root, extensions=SCAN_EXTENSIONS):
+    """Yield os.DirEntry objects for files under root with one of extensions.
+
+    Directories are visited depth-first in name order; symlinked directories
+    are not followed.
+    """
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.name.lower().endswith(extensions) and entry.is_file():
+                    yield entry
+            except OSError:
+                continue
+        pending.extend(reversed(subdirectories))
+
+
+class ScanResult:
+    """Files found by ScanIndex.scan"""
+
+    def __init__(self):
+        self.files = []
+        self.changed = []
+        self.removed = []
+
+    @property
+    def total_bytes(self):
+        return sum(record["size"] for record in self.files)
+
+    def to_dict(self):
+        return {
+            "files": len(self.files),
+            "bytes": self.total_bytes,
+            "changed": self.changed,
+            "removed": self.removed,
+        }
+
+
+class ScanIndex:
+    """JSON record of (size, mtime, language, content hash) per scanned file.
+
+    Records are keyed by absolute path. Output files can be tracked the same
+    way with file_hash and remember, so checking that a previous output is
+    still intact does not need to read it either.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION and data.get("hash") == HASH_NAME:
+            self.records = data.get("files", {})
+
+    def _key(self, path):
+        return os.path.abspath(path)
+
+    def get(self, path):
+        """Stored record for path, or None"""
+        return self.records.get(self._key(path))
+
+    def _refresh(self, path, size, mtime_ns):
+        """Record for a file with this stat, hashing it only if it changed"""
+        key = self._key(path)
+        record = self.records.get(key)
+        if record and record["size"] == size and record["mtime_ns"] == mtime_ns:
+            return record, False
+        record = self.records[key] = {
+            "path": key,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "language": detect_language(path),
+            "hash": incremental.hash_file(path),
+        }
+        self.dirty = True
+        return record, True
+
+    def scan(self, root, extensions=SCAN_EXTENSIONS):
+        """Index every matching file under root (or root itself if it is a file).
+
+        Records of files under root that no longer exist are dropped.
+        """
+        result = ScanResult()
+        if os.path.isfile(root):
+            st = os.stat(root)
+            found = [(root, st.st_size, st.st_mtime_ns)]
+        else:
+            found = []
+            for entry in iter_files(root, extensions):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                found.append((entry.path, st.st_size, st.st_mtime_ns))
+
+        seen = set()
+        for path, size, mtime_ns in found:
+            record, changed = self._refresh(path, size, mtime_ns)
+            seen.add(record["path"])
+            result.files.append(record)
+            if changed:
+                result.changed.append(record["path"])
+
+        prefix = os.path.join(self._key(root), "")
+        for key in list(self.records):
+            if key.startswith(prefix) and key not in seen:
+                del self.records[key]
+                result.removed.append(key)
+                self.dirty = True
+        return result
+
+    def file_hash(self, path):
+        """Content hash of any file via its record; None if it does not exist"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        record, _ = self._refresh(path, st.st_size, st.st_mtime_ns)
+        return record["hash"]
+
+    def remember(self, path, content_hash):
+        """Record a file just written whose hash is already known"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return
+        key = self._key(path)
+        self.records[key] = {
+            "path": key,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "language": detect_language(path),
+            "hash": content_hash,
+        }
+        self.dirty = True
+
+    def save(self):
+        """Write the index atomically if anything changed"""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "hash": HASH_NAME, "files": self.records},
+                      f, indent=1)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+
+def largest_first(records):
+    """Records ordered by size, largest first (then by path).
+
+    Starting the biggest jobs first keeps one large file from being the
+    last job left running while the other workers sit idle.
+    """
+    return sorted(records, key=lambda record: (-record["size"], record["path"]))
+
+
+def get_index_path(root):
+    """Default index location: the root of the scanned tree"""
+    root = root if os.path.isdir(root) else os.path.dirname(root)
+    return os.path.join(root, INDEX_NAME)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+def main(argv=None):
+    """Entry point for python -m foxsubp.scan"""
+    parser = argparse.ArgumentParser(
+        prog="python -m foxsubp.scan",
+        description="Pindai folder data game dan perbarui indeks file SUBP/LNG.")
+    parser.add_argument("root", help="folder data game (hasil unpack)")
+    parser.add_argument("--index", help=f"file indeks (default: {INDEX_NAME} di folder data)")
+    parser.add_argument("--json", action="store_true", help="tampilkan hasil sebagai JSON")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.root):
+        print(f"Folder tidak ditemukan: {args.root}", file=sys.stderr)
+        return 2
+
+    index = ScanIndex(args.index or get_index_path(args.root))
+    result = index.scan(args.root)
+    index.save()
+
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2, ensure_ascii=False))
+        return 0
+    languages = {}
+    for record in result.files:
+        language = record["language"] or "?"
+        languages[language] = languages.get(language, 0) + 1
+    print(f"{len(result.files)} file ({result.total_bytes / (1024 * 1024):.1f} MiB), "
+          f"{len(result.changed)} baru/berubah, {len(result.removed)} hilang")
+    for language, count in sorted(languages.items()):
+        print(f"  {language}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Background jobs for the GUI.
+
+Long work (decoding a pack, merging, running SubpTool.exe) runs on worker
+threads so the Tk main loop keeps handling events. Tk is not thread-safe,
+so workers never touch widgets: they only update their Task's progress and
+return a result. The GUI calls TaskRunner.poll() from root.after(), which
+runs the completion callbacks on the Tk thread.
+
+Threads (not processes) are used because the heavy parts either run in a
+child process already (SubpTool.exe) or need the in-memory entry model the
+GUI keeps; the interpreter switches threads often enough for the UI to stay
+responsive.
+"""
+import concurrent.futures
+import threading
+import time
+
+
+class TaskCancelled(Exception):
+    """Raised inside a worker when its task was cancelled"""
+
+
+class Task:
+    """One background job: progress, cancellation and completion callbacks"""
+
+    def __init__(self, name, key=None, on_done=None, on_error=None):
+        self.name = name
+        self.key = key
+        self.on_done = on_done
+        self.on_error = on_error
+        self.future = None
+        self.progress = None
+        self.message = name
+        self.submitted = time.perf_counter()
+        self.finished = None
+        self.resources = []
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Ask the worker to stop at its next check_cancelled()"""
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        """Called by workers between steps"""
+        if self._cancel_event.is_set():
+            raise TaskCancelled(self.name)
+
+    def report(self, progress=None, message=None):
+        """Update progress (0.0-1.0, None for unknown) and status text from a worker"""
+        self.progress = progress
+        if message is not None:
+            self.message = message
+
+    @property
+    def seconds(self):
+        return (self.finished or time.perf_counter()) - self.submitted
+
+    def __repr__(self):
+        return f"Task({self.name!r}, progress={self.progress})"
+
+
+class TaskRunner:
+    """Thread pool for Task objects, drained by polling from the UI thread"""
+
+    def __init__(self, workers=2):
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers),
+                                                               thread_name_prefix="foxsubp-task")
+        self._lock = threading.Lock()
+        self._active = []
+
+    def submit(self, name, func, *args, key=None, on_done=None, on_error=None, **kwargs):
+        """Run func(task, *args, **kwargs) on a worker and return the Task.
+
+        on_done(result) or on_error(exception) is called by poll(); a
+        cancelled task calls on_error with TaskCancelled.
+        """
+        task = Task(name, key, on_done, on_error)
+        task.future = self._executor.submit(func, task, *args, **kwargs)
+        # Listed only once it has a future, so poll() never sees a task without one
+        with self._lock:
+            self._active.append(task)
+        return task
+
+    @property
+    def active(self):
+        """Tasks that have not been reported by poll() yet"""
+        with self._lock:
+            return list(self._active)
+
+    def find(self, key):
+        """Running task with this key, or None"""
+        return next((task for task in self.active if task.key == key), None)
+
+    def uses(self, resource):
+        """True if a running task holds resource (e.g. a workspace)"""
+        return any(resource in task.resources for task in self.active)
+
+    def cancel_all(self):
+        for task in self.active:
+            task.cancel()
+
+    def poll(self):
+        """Run callbacks of finished tasks in the calling thread; returns those tasks"""
+        finished = []
+        pending = []
+        with self._lock:
+            # One done() check per task: a task finishing between two scans would be lost
+            for task in self._active:
+                (finished if task.future.done() else pending).append(task)
+            self._active = pending
+
+        for task in finished:
+            task.finished = time.perf_counter()
+            try:
+                result = task.future.result()
+            except Exception as e:
+                if task.on_error:
+                    task.on_error(e)
+            else:
+                if task.on_done:
+                    task.on_done(result)
+        return finished
+
+    def shutdown(self, wait=False):
+        """Cancel running tasks and stop the pool"""
+        self.cancel_all()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,252 @@
+"""Pooled executor around the external SubpTool.exe converter.
+
+Jobs are queued and run by N worker threads, each driving its own tool
+process, so spawn cost (and Mono/Wine start-up on Linux hosts) overlaps
+instead of adding up. Tools that accept several files per invocation can be
+given max_batch_size > 1 and a worker then hands them a whole batch at once.
+SubpTool.exe itself converts exactly one file per run, so it uses batches
+of 1. Every job reports its queue wait, run time and total latency.
+
+    python -m foxsubp.toolpool --workers 4 a.subp b.subp c.xml
+"""
+import argparse
+import concurrent.futures
+import os
+import queue
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+# Overrides how the tool is launched, e.g. FOXSUBP_TOOL_LAUNCHER="wine"
+LAUNCHER_ENV = "FOXSUBP_TOOL_LAUNCHER"
+
+_STOP = object()
+
+
+def get_tool_command(tool_path):
+    """Command prefix that runs tool_path on this platform"""
+    if tool_path.lower().endswith(".py"):
+        return [sys.executable, tool_path]
+
+    launcher = os.environ.get(LAUNCHER_ENV)
+    if launcher:
+        return shlex.split(launcher) + [tool_path]
+    if os.name != "nt" and tool_path.lower().endswith(".exe"):
+        # .NET Framework executables need a runtime host outside Windows
+        for host in ("mono", "wine"):
+            if shutil.which(host):
+                return [host, tool_path]
+    return [tool_path]
+
+
+def get_output_path(input_path):
+    """File SubpTool writes for input_path: .subp -> .xml and .xml -> .subp"""
+    base, ext = os.path.splitext(input_path)
+    return base + (".xml" if ext.lower() == ".subp" else ".subp")
+
+
+class ToolJob:
+    """One file conversion and its timing"""
+
+    def __init__(self, input_path, language=None):
+        self.input_path = input_path
+        self.output_path = get_output_path(input_path)
+        self.language = language
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self.batch_size = 0
+        self.returncode = None
+        self.stdout = ""
+        self.stderr = ""
+        self.error = ""
+
+    @property
+    def ok(self):
+        return not self.error
+
+    @property
+    def wait_seconds(self):
+        return (self.started or self.submitted) - self.submitted
+
+    @property
+    def run_seconds(self):
+        return (self.finished or self.started or self.submitted) - (self.started or self.submitted)
+
+    @property
+    def latency(self):
+        return (self.finished or self.submitted) - self.submitted
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error: {self.error}"
+        return f"ToolJob({self.input_path!r}, {self.latency:.3f}s, {status})"
+
+
+class SubpToolPool:
+    """Queue of conversion jobs served by N concurrent tool processes"""
+
+    def __init__(self, tool_path, workers=2, max_batch_size=1, timeout=None, cwd=None):
+        tool_path = os.path.abspath(tool_path)
+        self.command = get_tool_command(tool_path)
+        self.cwd = cwd or os.path.dirname(tool_path)
+        self.max_batch_size = max(1, max_batch_size)
+        self.timeout = timeout
+        self.invocations = 0
+        self.completed = []
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._worker, daemon=True,
+                                          name=f"subptool-{i}")
+                         for i in range(max(1, workers))]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, input_path, language=None):
+        """Queue a conversion; the future resolves to its ToolJob"""
+        if self._closed:
+            raise RuntimeError("SubpToolPool sudah ditutup")
+        future = concurrent.futures.Future()
+        self._queue.put((ToolJob(os.path.abspath(input_path), language), future))
+        return future
+
+    def map(self, input_paths, language=None):
+        """Convert many files and return their ToolJobs in input order"""
+        futures = [self.submit(path, language) for path in input_paths]
+        return [future.result() for future in futures]
+
+    def _next_batch(self):
+        """Block for one job, then take up to max_batch_size compatible queued jobs"""
+        item = self._queue.get()
+        if item is _STOP:
+            return None
+        batch = [item]
+        language = item[0].language
+        while len(batch) < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP or item[0].language != language:
+                # Not batchable with this group; leave it for the next round
+                self._queue.put(item)
+                break
+            batch.append(item)
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        jobs = [job for job, _ in batch]
+        language = jobs[0].language
+        cmd = list(self.command)
+        if language:
+            cmd.append(f"-{language.lstrip('-')}")
+        cmd.extend(job.input_path for job in jobs)
+
+        started = time.perf_counter()
+        for job in jobs:
+            job.started = started
+            job.batch_size = len(jobs)
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True,
+                                    cwd=self.cwd, timeout=self.timeout)
+            returncode, stdout, stderr, error = result.returncode, result.stdout, result.stderr, ""
+            if returncode != 0:
+                error = f"SubpTool error (code {returncode}): {stderr}"
+        except (OSError, subprocess.TimeoutExpired) as e:
+            returncode, stdout, stderr, error = None, "", "", f"SubpTool gagal dijalankan: {e}"
+
+        finished = time.perf_counter()
+        with self._lock:
+            self.invocations += 1
+            self.completed.extend(jobs)
+
+        for job, future in batch:
+            job.finished = finished
+            job.returncode, job.stdout, job.stderr = returncode, stdout, stderr
+            job.error = error
+            if not job.error and not os.path.exists(job.output_path):
+                job.error = f"File output tidak dibuat: {os.path.basename(job.output_path)}"
+            future.set_result(job)
+
+    def stats(self):
+        """Latency summary over all completed jobs"""
+        with self._lock:
+            jobs = list(self.completed)
+            invocations = self.invocations
+        latencies = sorted(job.latency for job in jobs)
+        if not latencies:
+            return {"jobs": 0, "invocations": invocations}
+        return {
+            "jobs": len(jobs),
+            "invocations": invocations,
+            "failed": sum(1 for job in jobs if not job.ok),
+            "mean_latency": sum(latencies) / len(latencies),
+            "p50_latency": latencies[len(latencies) // 2],
+            "max_latency": latencies[-1],
+            "mean_run": sum(job.run_seconds for job in jobs) / len(jobs),
+        }
+
+    def shutdown(self, wait=True):
+        """Stop the workers once the queued jobs are done"""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+
+def main(argv=None):
+    """Convert files with a SubpTool pool and print per-job latency"""
+    parser = argparse.ArgumentParser(prog="python -m foxsubp.toolpool",
+                                     description="Konversi banyak file SUBP/XML dengan SubpTool.exe secara paralel.")
+    parser.add_argument("files", nargs="+", help="file .subp atau .xml")
+    parser.add_argument("--tool", help="path SubpTool.exe (default: FoxEngine/SubpTool.exe)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="file per pemanggilan, hanya untuk tool yang menerima banyak file")
+    parser.add_argument("-l", "--lang", help="kode bahasa SubpTool (rus, jpn, ...)")
+    args = parser.parse_args(argv)
+
+    tool_path = args.tool
+    if not tool_path:
+        from foxsubp.pipeline import get_subp_tool_path
+        tool_path = get_subp_tool_path()
+
+    with SubpToolPool(tool_path, args.workers, args.batch_size) as pool:
+        jobs = pool.map(args.files, args.lang)
+        for job in jobs:
+            status = "ok" if job.ok else "error"
+            print(f"[{status:5}] wait {job.wait_seconds:7.3f}s  run {job.run_seconds:7.3f}s  "
+                  f"total {job.latency:7.3f}s  {job.input_path}")
+            if job.error:
+                print(f"        {job.error}")
+        stats = pool.stats()
+
+    print(f"\n{stats['jobs']} file, {stats['invocations']} pemanggilan tool, "
+          f"latensi rata-rata {stats.get('mean_latency', 0):.3f}s, "
+          f"maks {stats.get('max_latency', 0):.3f}s")
+    return 1 if stats.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+"""Translation loaders: "[ID n] text", TSV, CSV, JSONL and gettext PO.
+
+Every format is read line by line through a generator, so a dump of
+millions of lines never has to pass through the Tk text box or be held as
+one string. Problems are collected in a TranslationReport instead of being
+silently dropped:
+
+    report = TranslationReport()
+    translations = load_translations("id.po", report=report)
+    print(report.format())
+
+Later occurrences of an ID win, as with the "[ID n]" text box.
+
+Layouts:
+    manual  [ID 600831] Tembakan lengan.
+    tsv     600831<TAB>Tembakan lengan.
+    csv     600831,"Tembakan lengan."
+    jsonl   {"id": 600831, "text": "Tembakan lengan."}   or   [600831, "..."]
+    po      msgctxt "600831" / msgid "<source>" / msgstr "Tembakan lengan."
+
+TSV and CSV take the ID from the first column and the translation from the
+last, unless a header row names "id" and "text"/"translation" columns. PO
+entries without msgctxt may carry the ID as a "#: 600831" reference; fuzzy
+and untranslated entries are skipped.
+"""
+import csv
+import io
+import json
+import os
+import re
+
+FORMATS = ("manual", "tsv", "csv", "jsonl", "po")
+FORMAT_EXTENSIONS = {
+    ".txt": "manual",
+    ".tsv": "tsv",
+    ".tab": "tsv",
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".po": "po",
+    ".pot": "po",
+}
+
+# Same pattern parse_manual_translation has always used, compiled once
+_MANUAL_LINE = re.compile(r"\[ID (\d+)\]\s+(.+)")
+_MANUAL_ID_PREFIX = re.compile(r"\[\s*ID\b", re.IGNORECASE)
+_PO_KEYWORD = re.compile(r'(msgctxt|msgid_plural|msgid|msgstr(?:\[(\d+)\])?)\s+"(.*)"\s*$')
+_PO_CONTINUATION = re.compile(r'"(.*)"\s*$')
+_PO_ESCAPE = re.compile(r'\\(.)')
+_PO_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+
+ID_COLUMNS = ("id", "subtitle_id", "entry_id", "msgctxt")
+TEXT_COLUMNS = ("text", "translation", "target", "msgstr", "terjemahan")
+
+# At most this many duplicates/malformed lines are kept with details
+MAX_REPORTED_ITEMS = 1000
+
+
+class TranslationReport:
+    """Counters plus duplicate and malformed lines found while loading"""
+
+    def __init__(self, source="<teks>", fmt="manual"):
+        self.source = source
+        self.fmt = fmt
+        self.lines = 0
+        self.loaded = 0
+        self.skipped = 0
+        self.duplicate_count = 0
+        self.malformed_count = 0
+        self.duplicates = {}
+        self.malformed = []
+
+    @property
+    def ok(self):
+        return not self.duplicate_count and not self.malformed_count
+
+    def add_duplicate(self, entry_id, line_no):
+        """Record a repeated ID (the later text replaces the earlier one)"""
+        self.duplicate_count += 1
+        lines = self.duplicates.get(entry_id)
+        if lines is not None:
+            lines.append(line_no)
+        elif len(self.duplicates) < MAX_REPORTED_ITEMS:
+            self.duplicates[entry_id] = [line_no]
+
+    def add_malformed(self, line_no, reason, text=""):
+        """Record a line that could not be turned into (ID, text)"""
+        self.malformed_count += 1
+        if len(self.malformed) < MAX_REPORTED_ITEMS:
+            self.malformed.append((line_no, reason, text[:80]))
+
+    def to_dict(self):
+        return {
+            "source": self.source,
+            "format": self.fmt,
+            "lines": self.lines,
+            "loaded": self.loaded,
+            "skipped": self.skipped,
+            "duplicate_count": self.duplicate_count,
+            "malformed_count": self.malformed_count,
+            "duplicates": self.duplicates,
+            "malformed": [{"line": line_no, "reason": reason, "text": text}
+                          for line_no, reason, text in self.malformed],
+        }
+
+    def format(self, max_items=20):
+        """Human readable report"""
+        out = [f"{self.source} ({self.fmt}): {self.loaded} ID dimuat dari {self.lines} baris"]
+        if self.skipped:
+            out.append(f"  {self.skipped} entri dilewati (kosong/fuzzy)")
+        if self.duplicate_count:
+            out.append(f"  {self.duplicate_count} ID duplikat (teks terakhir yang dipakai):")
+            for entry_id, lines in list(self.duplicates.items())[:max_items]:
+                out.append(f"    ID {entry_id} muncul lagi di baris {', '.join(map(str, lines))}")
+        if self.malformed_count:
+            out.append(f"  {self.malformed_count} baris tidak valid:")
+            for line_no, reason, text in self.malformed[:max_items]:
+                out.append(f"    baris {line_no}: {reason}: {text}")
+        return "\n".join(out)
+
+
+def detect_format(path):
+    """Translation format implied by a file extension ("manual" if unknown)"""
+    return FORMAT_EXTENSIONS.get(os.path.splitext(path)[1].lower(), "manual")
+
+
+def _is_id(value):
+    return value.isdigit() and value.isascii()
+
+# ============================================================================
+# FORMAT READERS
+# Each reader yields (line number, entry id, text) and reports bad lines.
+# ============================================================================
+def iter_manual(lines, report):
+    """"[ID n] text" lines; other lines are ignored unless they look like an ID"""
+    match_line = _MANUAL_LINE.match
+    line_no = 0
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        match = match_line(line)
+        if match:
+            yield line_no, match.group(1), match.group(2)
+        elif _MANUAL_ID_PREFIX.match(line):
+            report.add_malformed(line_no, "format [ID n] tidak valid", line)
+    report.lines = line_no
+
+
+def _header_columns(fields):
+    """(id column, text column) if the first row is a header, else None"""
+    if not fields or _is_id(fields[0].strip()):
+        return None
+    names = [field.strip().lower() for field in fields]
+    id_col = next((names.index(name) for name in ID_COLUMNS if name in names), None)
+    text_col = next((names.index(name) for name in TEXT_COLUMNS if name in names), None)
+    if id_col is not None and text_col is not None:
+        return id_col, text_col
+    if len(fields) > 1 and not any(_is_id(name) for name in names):
+        return 0, -1
+    return None
+
+
+def _iter_rows(rows, report):
+    """Shared column handling for TSV and CSV: (line number, fields) -> records"""
+    id_col, text_col = 0, -1
+    min_fields = 2
+    first = True
+    for line_no, fields in rows:
+        if first:
+            first = False
+            columns = _header_columns(fields)
+            if columns:
+                id_col, text_col = columns
+                min_fields = max(2, id_col + 1, text_col + 1)
+                continue
+        if len(fields) < min_fields:
+            if fields and fields[0].strip() and not fields[0].startswith("#"):
+                report.add_malformed(line_no, "kolom kurang", "\t".join(fields))
+            continue
+        entry_id = fields[id_col]
+        if entry_id.startswith("#"):
+            continue
+        yield line_no, entry_id.strip(), fields[text_col]
+
+
+def _tsv_rows(lines, report):
+    line_no = 0
+    for line_no, line in enumerate(lines, 1):
+        yield line_no, line.rstrip("\r\n").split("\t")
+    report.lines = line_no
+
+
+def _csv_rows(lines, report):
+    reader = csv.reader(lines)
+    try:
+        for fields in reader:
+            yield reader.line_num, fields
+    except csv.Error as e:
+        report.add_malformed(reader.line_num, f"CSV rusak: {e}")
+    report.lines = reader.line_num
+
+
+def iter_tsv(lines, report):
+    """Tab separated "id<TAB>text" lines"""
+    return _iter_rows(_tsv_rows(lines, report), report)
+
+
+def iter_csv(lines, report):
+    """Comma separated rows (RFC 4180 quoting)"""
+    return _iter_rows(_csv_rows(lines, report), report)
+
+
+def iter_jsonl(lines, report):
+    """One JSON object ({"id", "text"}) or [id, text] array per line"""
+    loads = json.loads
+    line_no = 0
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = loads(line)
+        except ValueError as e:
+            report.add_malformed(line_no, f"JSON rusak: {e}", line)
+            continue
+        if isinstance(record, dict):
+            entry_id = record.get("id")
+            text = record.get("text", record.get("translation"))
+        elif isinstance(record, list) and len(record) >= 2:
+            entry_id, text = record[0], record[-1]
+        else:
+            report.add_malformed(line_no, "bukan objek {id, text}", line)
+            continue
+        if entry_id is None or not isinstance(text, str):
+            report.add_malformed(line_no, "id atau text tidak ada", line)
+            continue
+        yield line_no, str(entry_id), text
+    report.lines = line_no
+
+
+def _po_unescape(value):
+    if "\\" not in value:
+        return value
+    return _PO_ESCAPE.sub(lambda m: _PO_ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def iter_po(lines, report):
+    """gettext PO entries: msgctxt (or a "#: n" reference) is the ID, msgstr the text"""
+    fields = {}
+    reference = None
+    fuzzy = False
+    start = 0
+    field = None
+    line_no = 0
+
+    def finish():
+        if fields.get("msgid") == "" and "msgctxt" not in fields:
+            return None  # PO header
+        if fuzzy or not fields.get("msgstr"):
+            report.skipped += 1
+            return None
+        entry_id = fields.get("msgctxt", reference)
+        if entry_id is None:
+            report.add_malformed(start, "entri PO tanpa msgctxt/ID", fields.get("msgid", ""))
+            return None
+        return start, entry_id.strip(), fields["msgstr"]
+
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if line.startswith("#~"):
+            continue  # obsolete entry
+
+        # A blank line, a comment or a new msgctxt/msgid closes a complete entry
+        if "msgstr" in fields and (not line or line[0] == "#"
+                                   or line.startswith(("msgctxt", "msgid "))):
+            result = finish()
+            if result:
+                yield result
+            fields, reference, fuzzy, field = {}, None, False, None
+
+        if not line:
+            continue
+        if line[0] == "#":
+            if line.startswith("#,") and "fuzzy" in line:
+                fuzzy = True
+            elif line.startswith("#:") and reference is None:
+                reference = next((token for token in line[2:].split() if _is_id(token)), None)
+            continue
+
+        match = _PO_KEYWORD.match(line)
+        if match:
+            keyword, plural_index, value = match.groups()
+            if not fields:
+                start = line_no
+            if keyword.startswith("msgstr"):
+                if plural_index not in (None, "0"):
+                    field = None  # only the first plural form is used
+                    continue
+                keyword = "msgstr"
+            field = keyword
+            fields[field] = _po_unescape(value)
+            continue
+
+        match = _PO_CONTINUATION.match(line)
+        if match:
+            if field is not None:
+                fields[field] += _po_unescape(match.group(1))
+        else:
+            report.add_malformed(line_no, "baris PO tidak dikenal", line)
+
+    if "msgstr" in fields:
+        result = finish()
+        if result:
+            yield result
+    report.lines = line_no
+
+
+READERS = {
+    "manual": iter_manual,
+    "tsv": iter_tsv,
+    "csv": iter_csv,
+    "jsonl": iter_jsonl,
+    "po": iter_po,
+}
+
+# ============================================================================
+# LOADING
+# ============================================================================
+def collect_translations(records, report, translations=None):
+    """Build the ID -> text dict from reader output, validating IDs"""
+    translations = {} if translations is None else translations
+    for line_no, entry_id, text in records:
+        if not _is_id(entry_id):
+            report.add_malformed(line_no, "ID bukan angka", entry_id)
+            continue
+        size = len(translations)
+        translations[entry_id] = text
+        if len(translations) == size:
+            report.add_duplicate(entry_id, line_no)
+    report.loaded = len(translations)
+    return translations
+
+
+def read_translations(lines, fmt="manual", report=None):
+    """Load translations from any iterable of text lines"""
+    if fmt not in READERS:
+        raise ValueError(f"Format terjemahan tidak dikenal: {fmt} (pilih {', '.join(FORMATS)})")
+    report = report if report is not None else TranslationReport(fmt=fmt)
+    report.fmt = fmt
+    return collect_translations(READERS[fmt](lines, report), report)
+
+
+def parse_translation_text(text, fmt="manual", report=None):
+    """Load translations from a string, e.g. the GUI text box"""
+    return read_translations(io.StringIO(text), fmt, report)
+
+
+def load_translations(path, fmt=None, report=None):
+    """Stream translations from a file; the format follows the extension unless given"""
+    fmt = fmt or detect_format(path)
+    if report is None:
+        report = TranslationReport(path, fmt)
+    else:
+        report.source = path
+    # newline="" keeps quoted line breaks inside CSV fields intact
+    with open(path, "r", encoding="utf-8-sig", newline="" if fmt == "csv" else None) as f:
+        return read_translations(f, fmt, report)
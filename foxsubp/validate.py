@@ -0,0 +1,400 @@
+"""Checks and Unicode normalization of translated text before it is encoded.
+
+Problems that otherwise only show up in-game are reported per entry:
+
+    not_nfc          text was not NFC (normalize_translations fixes it)
+    too_long         a line is longer than the character budget
+    too_wide         a line is wider than the width budget (wide CJK characters count 2)
+    control_char     control or invisible format characters
+    line_separator   "$", which the SUBP format uses to separate lines
+    unencodable      characters the pack's text encoding cannot store
+    markup_mismatch  markup tokens (<tags>, {names}, %s, \\n) differ from the source text
+
+Texts are checked in batches: every check first runs once over the whole
+batch joined into one string with precompiled patterns (C loops), and only
+batches that fail are looked at entry by entry, so clean text costs a few
+string scans:
+
+    report = validate_texts(translations.items(), source.iter_line_texts(), rules)
+"""
+import copy
+import os
+import re
+import sys
+import unicodedata
+
+from foxsubp import codec
+from foxsubp.profiling import stage
+
+BATCH_SIZE = 4096
+MAX_REPORTED_ITEMS = 1000
+
+ERROR = "error"
+WARNING = "warning"
+SEVERITY = {
+    "not_nfc": WARNING,
+    "too_long": WARNING,
+    "too_wide": WARNING,
+    "control_char": ERROR,
+    "line_separator": ERROR,
+    "unencodable": ERROR,
+    "markup_mismatch": ERROR,
+}
+
+# C0/C1 controls except newline, plus zero-width and bidi format characters
+_CONTROL = re.compile("[\x00-\x09\x0b-\x1f\x7f-\x9f\u200b-\u200f\u202a-\u202e\u2060-\u2064\ufeff]")
+_SEPARATOR = re.compile(re.escape(codec.LINE_SEPARATOR))
+DEFAULT_MARKUP = r"<[^<>\s][^<>]*>|\{[^{}\s]*\}|%(?:\d+\$)?[-+ #0]*\d*(?:\.\d+)?[sdiuxXfc]|\\[nrt]"
+# Joins a batch; a newline is a starter, so NFC of the joined text equals NFC of each part
+_JOIN = "\n"
+
+_widths = {}
+
+
+def char_width(char):
+    """Display columns of a character: 2 for wide/fullwidth, 0 for combining marks"""
+    width = _widths.get(char)
+    if width is None:
+        if unicodedata.combining(char) or unicodedata.category(char) in ("Mn", "Me", "Cf"):
+            width = 0
+        elif unicodedata.east_asian_width(char) in ("W", "F"):
+            width = 2
+        else:
+            width = 1
+        _widths[char] = width
+    return width
+
+
+def text_width(text):
+    if text.isascii():
+        return len(text)
+    return sum(map(char_width, text))
+
+
+class ValidationRules:
+    """What validate_texts checks; budgets of None are not checked"""
+
+    def __init__(self, max_line_length=None, max_width=None, encoding=codec.DEFAULT_ENCODING,
+                 normalize=True, markup=DEFAULT_MARKUP):
+        self.max_line_length = max_line_length
+        self.max_width = max_width
+        self.encoding = encoding
+        self.normalize = normalize
+        self.markup = markup
+        self._markup = re.compile(markup) if markup else None
+
+    def __getstate__(self):
+        # Compiled patterns are rebuilt after pickling into a pool worker
+        state = dict(self.__dict__)
+        state["_markup"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._markup = re.compile(self.markup) if self.markup else None
+
+    def for_language(self, language):
+        """Copy of these rules checking the text encoding of language (rus, jpn, ...)"""
+        rules = copy.copy(self)
+        rules.encoding = codec.get_encoding(language)
+        return rules
+
+    def to_dict(self):
+        return {
+            "max_line_length": self.max_line_length,
+            "max_width": self.max_width,
+            "encoding": self.encoding,
+            "normalize": self.normalize,
+            "markup": self.markup,
+        }
+
+
+class ValidationReport:
+    """Issues found by validate_texts, counted per code"""
+
+    def __init__(self, rules=None):
+        self.rules = rules
+        self.checked = 0
+        self.normalized = 0
+        self.counts = {}
+        self.issues = []
+
+    @property
+    def errors(self):
+        return sum(count for code, count in self.counts.items() if SEVERITY[code] == ERROR)
+
+    @property
+    def warnings(self):
+        return sum(count for code, count in self.counts.items() if SEVERITY[code] == WARNING)
+
+    @property
+    def ok(self):
+        return not self.counts
+
+    def add(self, entry_id, code, detail=""):
+        self.counts[code] = self.counts.get(code, 0) + 1
+        if len(self.issues) < MAX_REPORTED_ITEMS:
+            self.issues.append({"id": entry_id, "code": code, "severity": SEVERITY[code],
+                                "detail": detail})
+
+    def merge(self, other):
+        """Add the findings of another report (e.g. of another pack)"""
+        self.checked += other.checked
+        self.normalized += other.normalized
+        for code, count in other.counts.items():
+            self.counts[code] = self.counts.get(code, 0) + count
+        self.issues.extend(other.issues[:MAX_REPORTED_ITEMS - len(self.issues)])
+
+    def summary(self):
+        """One line for progress logs"""
+        counts = ", ".join(f"{code} {count}" for code, count in sorted(self.counts.items()))
+        return f"{self.errors} error, {self.warnings} peringatan dari {self.checked} teks ({counts})"
+
+    def to_dict(self):
+        return {
+            "rules": self.rules.to_dict() if self.rules else None,
+            "checked": self.checked,
+            "normalized": self.normalized,
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "counts": dict(sorted(self.counts.items())),
+            "issues": self.issues,
+        }
+
+    def format(self, max_items=20):
+        """Human readable report"""
+        if self.ok:
+            return f"Semua {self.checked} teks lolos pemeriksaan."
+        out = [f"Validasi: {self.summary()}"]
+        for issue in self.issues[:max_items]:
+            out.append(f"  [{issue['severity']:7}] ID {issue['id']}: {issue['code']} {issue['detail']}")
+        total = sum(self.counts.values())
+        if total > max_items:
+            out.append(f"  ... dan {total - max_items} masalah lainnya")
+        return "\n".join(out)
+
+# ============================================================================
+# NORMALIZATION
+# ============================================================================
+def normalize_translations(translations_dict):
+    """NFC form of a translation table; returns (table, IDs that changed).
+
+    The table itself is returned when nothing changes, which is the usual
+    case and costs one check over all the text.
+    """
+    if unicodedata.is_normalized("NFC", _JOIN.join(translations_dict.values())):
+        return translations_dict, []
+    normalized = {}
+    changed = []
+    for entry_id, text in translations_dict.items():
+        nfc = unicodedata.normalize("NFC", text)
+        if nfc != text:
+            changed.append(entry_id)
+        normalized[entry_id] = nfc
+    return normalized, changed
+
+# ============================================================================
+# CHECKS
+# ============================================================================
+def _markup_tokens(texts, pattern, entry_ids):
+    """Markup tokens per entry ID (all lines of an entry together), for entries in entry_ids"""
+    texts = [(entry_id, text) for entry_id, text in texts if entry_id in entry_ids]
+    tokens = {}
+    for start in range(0, len(texts), BATCH_SIZE):
+        batch = texts[start:start + BATCH_SIZE]
+        if not pattern.search(_JOIN.join(text for _, text in batch)):
+            continue
+        for entry_id, text in batch:
+            found = pattern.findall(text)
+            if found:
+                tokens.setdefault(entry_id, set()).update(found)
+    return tokens
+
+
+def _check_batch(batch, rules, report):
+    """Run every check over one batch of (entry id, text); clean batches stop at the joined scans"""
+    joined = _JOIN.join(text for _, text in batch)
+
+    if rules.normalize and not unicodedata.is_normalized("NFC", joined):
+        for entry_id, text in batch:
+            if not unicodedata.is_normalized("NFC", text):
+                report.add(entry_id, "not_nfc")
+
+    if rules.max_line_length or rules.max_width:
+        longest = max(map(len, joined.split(_JOIN)), default=0)
+        # A line is at most twice as wide as it is long, and no wider without wide characters
+        scale = 1
+        if rules.max_width and not joined.isascii() and \
+                any(char_width(c) == 2 for c in set(joined) if not c.isascii()):
+            scale = 2
+        if (rules.max_line_length and longest > rules.max_line_length) or \
+                (rules.max_width and longest * scale > rules.max_width):
+            for entry_id, text in batch:
+                for line in text.split(_JOIN):
+                    if rules.max_line_length and len(line) > rules.max_line_length:
+                        report.add(entry_id, "too_long", f"{len(line)} > {rules.max_line_length}")
+                    if rules.max_width and len(line) * scale > rules.max_width:
+                        width = text_width(line)
+                        if width > rules.max_width:
+                            report.add(entry_id, "too_wide", f"{width} > {rules.max_width}")
+
+    if _CONTROL.search(joined):
+        for entry_id, text in batch:
+            found = set(_CONTROL.findall(text))
+            if found:
+                report.add(entry_id, "control_char",
+                           " ".join(f"U+{ord(c):04X}" for c in sorted(found)))
+
+    if _SEPARATOR.search(joined):
+        for entry_id, text in batch:
+            if codec.LINE_SEPARATOR in text:
+                report.add(entry_id, "line_separator")
+
+    try:
+        joined.encode(rules.encoding)
+    except UnicodeEncodeError:
+        for entry_id, text in batch:
+            try:
+                text.encode(rules.encoding)
+            except UnicodeEncodeError:
+                bad = sorted({c for c in text if not _encodable(c, rules.encoding)})
+                report.add(entry_id, "unencodable",
+                           " ".join(f"{c!r} U+{ord(c):04X}" for c in bad))
+
+
+def _encodable(char, encoding):
+    try:
+        char.encode(encoding)
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+def validate_texts(texts, source_texts=None, rules=None, report=None):
+    """Check (entry id, text) pairs and return a ValidationReport.
+
+    source_texts, (entry id, text) pairs of the original pack, enables the
+    markup check: the texts of an entry together must use exactly the
+    markup tokens of its source lines. IDs are compared as given (strings from
+    translation tables and iter_line_texts).
+    """
+    rules = rules or ValidationRules()
+    report = report or ValidationReport(rules)
+    texts = list(texts)
+    report.checked += len(texts)
+    for start in range(0, len(texts), BATCH_SIZE):
+        _check_batch(texts[start:start + BATCH_SIZE], rules, report)
+
+    pattern = rules._markup
+    if source_texts is not None and pattern is not None:
+        entry_ids = dict.fromkeys(entry_id for entry_id, _ in texts)
+        expected = _markup_tokens(source_texts, pattern, entry_ids)
+        found = _markup_tokens(texts, pattern, entry_ids)
+        for entry_id in entry_ids:
+            missing = expected.get(entry_id, set()) - found.get(entry_id, set())
+            extra = found.get(entry_id, set()) - expected.get(entry_id, set())
+            if missing or extra:
+                detail = []
+                if missing:
+                    detail.append("hilang " + " ".join(sorted(missing)))
+                if extra:
+                    detail.append("tambahan " + " ".join(sorted(extra)))
+                report.add(entry_id, "markup_mismatch", "; ".join(detail))
+    return report
+
+
+def validate_translations(translations_dict, source_texts=None, rules=None):
+    """Normalize a translation table (if rules.normalize) and check it.
+
+    Only translations for entries of the source are checked when
+    source_texts is given. Returns (translations to merge, ValidationReport).
+    """
+    rules = rules or ValidationRules()
+    report = ValidationReport(rules)
+    if rules.normalize:
+        translations_dict, changed = normalize_translations(translations_dict)
+        report.normalized = len(changed)
+    items = translations_dict.items()
+    if source_texts is not None:
+        source_texts = list(source_texts)
+        present = {entry_id for entry_id, _ in source_texts}
+        items = [(entry_id, text) for entry_id, text in items if entry_id in present]
+    validate_texts(items, source_texts, rules, report)
+    return translations_dict, report
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+def add_rule_arguments(parser):
+    """Command line options for ValidationRules (shared with python -m foxsubp)"""
+    parser.add_argument("--max-line-length", type=int, metavar="N",
+                        help="tandai baris yang lebih dari N karakter")
+    parser.add_argument("--max-width", type=int, metavar="N",
+                        help="tandai baris yang lebih lebar dari N kolom (karakter CJK = 2)")
+    parser.add_argument("--no-nfc", action="store_true",
+                        help="jangan normalisasi teks ke Unicode NFC")
+    parser.add_argument("--markup", default=DEFAULT_MARKUP,
+                        help="regex token markup yang harus sama dengan teks sumber "
+                             "(kosong: tidak diperiksa)")
+
+
+def rules_from_args(args, language=None):
+    return ValidationRules(args.max_line_length, args.max_width, codec.get_encoding(language),
+                           not args.no_nfc, args.markup or None)
+
+
+def main(argv=None):
+    """Entry point for python -m foxsubp.validate"""
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(
+        prog="python -m foxsubp.validate",
+        description="Periksa teks terjemahan (NFC, panjang/lebar baris, karakter kontrol, "
+                    "encoding, token markup) terhadap file SUBP/XML sumber.")
+    parser.add_argument("source", help="file .subp/.xml sumber")
+    parser.add_argument("translated", nargs="?",
+                        help="file .subp/.xml hasil terjemahan (atau pakai --translations)")
+    parser.add_argument("-t", "--translations", help="file terjemahan (.txt, .tsv, .csv, .jsonl, .po)")
+    parser.add_argument("-l", "--lang", help="kode bahasa untuk encoding teks (rus, jpn, ...)")
+    add_rule_arguments(parser)
+    parser.add_argument("--json", metavar="FILE", help="simpan laporan JSON ke file ini")
+    args = parser.parse_args(argv)
+    if bool(args.translated) == bool(args.translations):
+        parser.error("berikan file hasil terjemahan atau --translations (salah satu)")
+    for path in (args.source, args.translated or args.translations):
+        if not os.path.exists(path):
+            print(f"File tidak ditemukan: {path}", file=sys.stderr)
+            return 2
+
+    rules = rules_from_args(args, args.lang)
+    encoding = codec.get_encoding(args.lang)
+
+    def read_pack(path):
+        if path.lower().endswith(".xml"):
+            return codec.read_subp_xml(path)
+        return codec.read_subp(path, encoding)
+
+    with stage("validate"):
+        source = read_pack(args.source)
+        if args.translations:
+            from foxsubp import translations as translation_formats
+            table = translation_formats.load_translations(args.translations)
+            _, report = validate_translations(table, source.iter_line_texts(), rules)
+        else:
+            translated = read_pack(args.translated)
+            # Only entries with a line that differs from the source were translated;
+            # all their lines are checked, as the markup check compares whole entries
+            original = set(source.iter_line_texts())
+            texts = list(translated.iter_line_texts())
+            changed_ids = {entry_id for entry_id, text in texts if (entry_id, text) not in original}
+            changed = [(entry_id, text) for entry_id, text in texts if entry_id in changed_ids]
+            report = validate_texts(changed, source.iter_line_texts(), rules)
+    print(report.format())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+"""Rebuild translated files whenever a translation file or an input file changes.
+
+    python -m foxsubp.watch -t id.txt -o out/ data/subp/
+
+The tree is built once like python -m foxsubp, then the translation source
+and the SUBP/LNG/XML inputs are watched. Changes are found by comparing
+file size and mtime, every --interval seconds; with the optional watchdog
+package a filesystem event wakes the loop right away. Saves are debounced:
+nothing starts until no watched file changed for --debounce seconds. Only
+the inputs a change affects are rebuilt (all of them when the shared
+translation file changed), on a background thread while watching goes on.
+Every rebuild reports its latency from the save (the newest mtime) to the
+rebuilt file.
+"""
+import concurrent.futures
+import os
+import statistics
+import sys
+import threading
+import time
+
+from foxsubp import batch, incremental, profiling, scan, translations as translation_formats
+from foxsubp.profiling import stage
+
+# Optional filesystem events (inotify, FSEvents, ReadDirectoryChangesW); polling alone works too
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.3
+
+
+def stat_key(path):
+    """(size, mtime_ns) of path, or None when it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class WatchBuild:
+    """One debounced rebuild: the changed files, the jobs it ran and its timings"""
+
+    def __init__(self, changes, saved_at, detected_at):
+        self.changes = changes
+        # Wall clock (time.time()) of the newest save and of when it was noticed
+        self.saved_at = saved_at
+        self.detected_at = detected_at
+        self.started_at = None
+        self.finished_at = None
+        self.results = []
+        self.error = ""
+
+    @property
+    def latency(self):
+        """Seconds from the newest save to the end of the rebuild"""
+        return self.finished_at - self.saved_at
+
+    @property
+    def work_seconds(self):
+        return self.finished_at - self.started_at
+
+    def to_dict(self):
+        return {
+            "changes": self.changes,
+            "latency": round(self.latency, 6),
+            "detect_seconds": round(self.detected_at - self.saved_at, 6),
+            "wait_seconds": round(self.started_at - self.detected_at, 6),
+            "work_seconds": round(self.work_seconds, 6),
+            "files": [result.to_dict() for result in self.results],
+            "error": self.error,
+        }
+
+
+if WATCHDOG_AVAILABLE:
+    class _WakeHandler(FileSystemEventHandler):
+        """Sets an event on any filesystem change; the snapshot decides what changed"""
+
+        def __init__(self, wake):
+            super().__init__()
+            self.wake = wake
+
+        def on_any_event(self, event):
+            self.wake.set()
+
+
+class Watcher:
+    """Watches a tree and its translations and rebuilds the affected outputs.
+
+    The options match run_batch. Call step() repeatedly (run() does, until
+    stop is set); on_build(build) is called from the calling thread after
+    each rebuild.
+    """
+
+    def __init__(self, input_root, translation_source, output_root=None, language=None,
+                 manifest_path=None, fonts=None, require_glyphs=False,
+                 interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE, on_build=None):
+        self.input_root = input_root
+        self.translation_source = translation_source
+        self.output_root = output_root
+        self.language = language
+        self.fonts = fonts
+        self.require_glyphs = require_glyphs
+        self.interval = interval
+        self.debounce = debounce
+        self.on_build = on_build
+        self.manifest = incremental.BuildManifest(manifest_path) if manifest_path else None
+        self.builds = []
+        self._root = input_root if os.path.isdir(input_root) else os.path.dirname(input_root)
+        self._snapshot = {}
+        # Changed path -> wall clock of its save, until a rebuild takes it
+        self._pending = {}
+        self._detected_at = None
+        self._last_change = None
+        self._shared = None
+        self._shared_hash = None
+        self._running = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1,
+                                                               thread_name_prefix="foxsubp-watch")
+        self._wake = threading.Event()
+        self._observer = None
+
+    # ------------------------------------------------------------------ files
+    def watched_files(self):
+        """Input files and translation files, as watched right now"""
+        paths = batch.find_input_files(self.input_root) if os.path.exists(self.input_root) else []
+        if os.path.isdir(self.translation_source):
+            paths += [entry.path for entry in scan.iter_files(self.translation_source,
+                                                              batch.TRANSLATION_EXTENSIONS)]
+        else:
+            paths.append(self.translation_source)
+        return paths
+
+    def snapshot(self):
+        return {path: stat_key(path) for path in self.watched_files()}
+
+    def poll(self):
+        """Compare with the last snapshot and queue the changed paths; returns them"""
+        current = self.snapshot()
+        changed = [path for path in current.keys() | self._snapshot.keys()
+                   if current.get(path) != self._snapshot.get(path)]
+        self._snapshot = current
+        now = time.time()
+        for path in changed:
+            key = current.get(path)
+            # A deleted file has no mtime; it counts as saved when it was noticed
+            self._pending[path] = key[1] / 1e9 if key else now
+        if changed:
+            self._detected_at = now
+            self._last_change = time.monotonic()
+        return changed
+
+    def is_input(self, path):
+        return (path.lower().endswith(batch.SUPPORTED_EXTENSIONS)
+                and os.path.abspath(path) != os.path.abspath(self.translation_source)
+                and not path.lower().endswith(batch.TRANSLATION_EXTENSIONS))
+
+    def affected_inputs(self, paths):
+        """Input files to rebuild after paths changed"""
+        inputs = [path for path in self._snapshot if self.is_input(path)]
+        if not os.path.isdir(self.translation_source) and self.translation_source in paths:
+            return sorted(inputs)
+        by_name = {}
+        for path in inputs:
+            by_name.setdefault(os.path.splitext(os.path.relpath(path, self._root))[0], []).append(path)
+        affected = set()
+        for path in paths:
+            if self.is_input(path):
+                if os.path.exists(path):
+                    affected.add(path)
+            elif os.path.isdir(self.translation_source):
+                name = os.path.splitext(os.path.relpath(path, self.translation_source))[0]
+                affected.update(by_name.get(name, []))
+        return sorted(affected)
+
+    # ----------------------------------------------------------------- builds
+    def initial_build(self, workers=None, on_result=None):
+        """Build the whole tree once on a process pool (like python -m foxsubp)"""
+        results = batch.run_batch(self.input_root, self.translation_source, self.output_root,
+                                  workers, self.language, on_result,
+                                  self.manifest.path if self.manifest else None,
+                                  fonts=self.fonts, require_glyphs=self.require_glyphs)
+        if self.manifest:
+            self.manifest.load()
+        # Outputs written in place must not count as changes
+        self._snapshot = self.snapshot()
+        return results
+
+    def _load_shared(self):
+        """Reload the shared translation file into the jobs' translation table"""
+        with stage("load_translations", path=self.translation_source) as s:
+            s.read(os.path.getsize(self.translation_source))
+            report = translation_formats.TranslationReport()
+            self._shared = batch.load_translation_file(self.translation_source, report)
+            self._shared_hash = incremental.hash_translations(self._shared)
+        # translate_file reads the shared table that pool workers get at startup
+        batch.init_worker(self._shared)
+        return batch.translation_warnings(report)
+
+    def _rebuild(self, build, inputs):
+        """Worker thread: run the jobs for inputs and record them in the manifest"""
+        build.started_at = time.time()
+        shared_file = not os.path.isdir(self.translation_source)
+        try:
+            if shared_file and (self._shared is None or self.translation_source in build.changes):
+                for warning in self._load_shared():
+                    print(f"peringatan: {warning}", flush=True)
+            for path in inputs:
+                output_path = batch.get_output_path(path, self._root, self.output_root)
+                result = batch.translate_file(
+                    path, output_path,
+                    translation_path=(None if shared_file else
+                                      batch.get_translation_path(path, self._root,
+                                                                 self.translation_source)),
+                    language=batch.resolve_language(path, self.language),
+                    record=self.manifest.get(output_path) if self.manifest else None,
+                    translations_hash=self._shared_hash if shared_file else None,
+                    fonts=self.fonts, require_glyphs=self.require_glyphs)
+                if self.manifest and result.output_hash:
+                    self.manifest.record(result.output_path, result.input_hash,
+                                         result.translations_hash, result.output_hash,
+                                         result.options)
+                build.results.append(result)
+            if self.manifest:
+                self.manifest.save()
+        except Exception as e:
+            build.error = str(e)
+        build.finished_at = time.time()
+        return build
+
+    def step(self):
+        """Poll once, report a finished rebuild and start the next one when debounced"""
+        self.poll()
+        if self._running is not None and self._running.done():
+            build = self._running.result()
+            self._running = None
+            for result in build.results:
+                if result.status in ("ok", "unchanged") and result.output_path in self._snapshot:
+                    # Our own in-place write, not a new save
+                    self._snapshot[result.output_path] = stat_key(result.output_path)
+            self.builds.append(build)
+            if self.on_build:
+                self.on_build(build)
+
+        if (self._pending and self._running is None
+                and time.monotonic() - self._last_change >= self.debounce):
+            changes = sorted(self._pending)
+            build = WatchBuild(changes, max(self._pending.values()), self._detected_at)
+            self._pending = {}
+            inputs = self.affected_inputs(changes)
+            self._running = self._executor.submit(self._rebuild, build, inputs)
+
+    def run(self, stop=None):
+        """Watch until stop (a threading.Event) is set or KeyboardInterrupt"""
+        stop = stop or threading.Event()
+        self._start_observer()
+        try:
+            while not stop.is_set():
+                self.step()
+                # Wake early for a filesystem event, a running rebuild or the end of a debounce
+                timeout = self.interval
+                if self._running is not None or self._pending:
+                    timeout = min(timeout, 0.05)
+                self._wake.wait(timeout)
+                self._wake.clear()
+        finally:
+            self.close()
+
+    def _start_observer(self):
+        if not WATCHDOG_AVAILABLE or self._observer is not None:
+            return
+        self._observer = Observer()
+        handler = _WakeHandler(self._wake)
+        for path in {self._root, self.translation_source if os.path.isdir(self.translation_source)
+                     else os.path.dirname(os.path.abspath(self.translation_source))}:
+            self._observer.schedule(handler, path, recursive=True)
+        self._observer.start()
+
+    def close(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        self._executor.shutdown(wait=True)
+
+
+def format_build(build):
+    """Progress lines for one rebuild"""
+    names = ", ".join(os.path.basename(path) for path in build.changes[:3])
+    if len(build.changes) > 3:
+        names += f", ... (+{len(build.changes) - 3})"
+    lines = [f"Perubahan: {names}"]
+    lines += ["  " + batch.format_result(result) for result in build.results]
+    if build.error:
+        lines.append(f"  error: {build.error}")
+    lines.append(f"  disimpan -> selesai {build.latency:.3f}s "
+                 f"(deteksi {build.detected_at - build.saved_at:.3f}s, "
+                 f"tunggu {build.started_at - build.detected_at:.3f}s, "
+                 f"kerja {build.work_seconds:.3f}s)")
+    return "\n".join(lines)
+
+
+def summarize_latency(builds):
+    """Latency statistics over rebuilds (seconds)"""
+    latencies = [build.latency for build in builds]
+    if not latencies:
+        return {"builds": 0}
+    return {
+        "builds": len(latencies),
+        "median": round(statistics.median(latencies), 6),
+        "max": round(max(latencies), 6),
+        "files": sum(len(build.results) for build in builds),
+    }
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+def main(argv=None):
+    """Entry point for python -m foxsubp.watch"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="python -m foxsubp.watch",
+        description="Pantau file terjemahan dan file SUBP/LNG/XML, lalu bangun ulang otomatis "
+                    "file yang terdampak setiap kali disimpan.")
+    parser.add_argument("input", help="file atau folder berisi file .subp/.lng/.lng2/.xml")
+    parser.add_argument("-t", "--translations", required=True,
+                        help="file terjemahan, atau folder berisi <nama file>.<ekstensi> "
+                             "untuk tiap file input")
+    parser.add_argument("-o", "--output-dir", help="folder output (default: timpa file input)")
+    parser.add_argument("-l", "--lang", help="kode bahasa SubpTool untuk encoding teks")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="jumlah proses worker untuk build awal (default: jumlah CPU)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"detik antar pemeriksaan file (default: {DEFAULT_INTERVAL})")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="tunggu sampai tidak ada perubahan selama sekian detik "
+                             f"(default: {DEFAULT_DEBOUNCE})")
+    parser.add_argument("--no-initial", action="store_true",
+                        help="jangan bangun semua file saat mulai")
+    parser.add_argument("--no-manifest", action="store_true",
+                        help="jangan baca/tulis manifest build inkremental")
+    parser.add_argument("--font", action="append", dest="fonts", metavar="FFNT",
+                        help="periksa glyph terjemahan di font .ffnt ini (boleh diulang)")
+    parser.add_argument("--require-glyphs", action="store_true",
+                        help="jangan tulis file yang terjemahannya memakai karakter tanpa glyph")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.input):
+        print(f"Input tidak ditemukan: {args.input}", file=sys.stderr)
+        return 2
+    if not os.path.exists(args.translations):
+        print(f"Sumber terjemahan tidak ditemukan: {args.translations}", file=sys.stderr)
+        return 2
+
+    manifest_path = None if args.no_manifest else batch.get_manifest_path(args.input,
+                                                                          args.output_dir)
+    watcher = Watcher(args.input, args.translations, args.output_dir, args.lang, manifest_path,
+                      args.fonts, args.require_glyphs, args.interval, args.debounce,
+                      on_build=lambda build: print(format_build(build), flush=True))
+    if args.no_initial:
+        watcher._snapshot = watcher.snapshot()
+    else:
+        started = time.perf_counter()
+        results = watcher.initial_build(max(1, args.workers or 1))
+        print(batch.format_summary(batch.summarize(results, time.perf_counter() - started,
+                                                   args.workers)))
+    profiling.get_recorder().drain()
+
+    mode = "watchdog" if WATCHDOG_AVAILABLE else f"polling tiap {args.interval}s"
+    print(f"\nMemantau {len(watcher._snapshot)} file ({mode}). Tekan Ctrl+C untuk berhenti.",
+          flush=True)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    summary = summarize_latency(watcher.builds)
+    if summary["builds"]:
+        print(f"\n{summary['builds']} kali bangun ulang ({summary['files']} file), latensi "
+              f"median {summary['median']:.3f}s, maks {summary['max']:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Isolated per-job temporary workspaces.
+
+Every conversion job gets its own tempfile.mkdtemp directory, so parallel
+jobs never collide on file names, and removes it as soon as the job is done.
+Input files are staged into a workspace by hardlink or reflink when the
+filesystem allows it and only copied as a last resort.
+"""
+import atexit
+import errno
+import os
+import shutil
+import tempfile
+import threading
+
+WORKSPACE_PREFIX = "foxsubp-"
+
+# Linux FICLONE ioctl (_IOW(0x94, 9, int)): copy-on-write clone on btrfs/xfs
+_FICLONE = 0x40049409
+
+
+def _reflink(source_path, target_path):
+    """Clone source_path into target_path without copying data; False if unsupported"""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    try:
+        with open(source_path, "rb") as src, open(target_path, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+    except OSError:
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        return False
+    shutil.copystat(source_path, target_path)
+    return True
+
+
+def link_or_copy(source_path, target_path):
+    """Stage source_path at target_path by hardlink, reflink or copy; returns the method used"""
+    try:
+        os.link(source_path, target_path)
+        return "hardlink"
+    except OSError as e:
+        if e.errno == errno.EEXIST:
+            raise
+
+    if _reflink(source_path, target_path):
+        return "reflink"
+
+    shutil.copy2(source_path, target_path)
+    return "copy"
+
+
+def move_file(source_path, target_path):
+    """Move a finished output into place, renaming instead of copying when possible"""
+    try:
+        os.replace(source_path, target_path)
+    except OSError:
+        shutil.copy2(source_path, target_path)
+        os.remove(source_path)
+    return target_path
+
+
+class Workspace:
+    """A private temporary directory for one job"""
+
+    def __init__(self, manager=None, base_dir=None):
+        self.path = tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=base_dir)
+        self.manager = manager
+        self.staged = {}
+
+    def file(self, name):
+        """Path of a file inside this workspace"""
+        return os.path.join(self.path, name)
+
+    def stage(self, source_path, name=None):
+        """Make source_path available inside the workspace without copying when possible"""
+        target_path = self.file(name or os.path.basename(source_path))
+        self.staged[target_path] = link_or_copy(source_path, target_path)
+        return target_path
+
+    def cleanup(self):
+        """Remove the workspace directory and everything in it"""
+        shutil.rmtree(self.path, ignore_errors=True)
+        if self.manager is not None:
+            self.manager.forget(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+    def __repr__(self):
+        return f"Workspace({self.path!r})"
+
+
+class WorkspaceManager:
+    """Hands out workspaces and tracks them so leftovers can be removed on exit"""
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def create(self):
+        """Create a new tracked workspace"""
+        workspace = Workspace(self, self.base_dir)
+        with self._lock:
+            self._active.add(workspace)
+        return workspace
+
+    def forget(self, workspace):
+        """Stop tracking a workspace that has been cleaned up"""
+        with self._lock:
+            self._active.discard(workspace)
+
+    def active(self):
+        """Workspaces that have not been cleaned up yet"""
+        with self._lock:
+            return list(self._active)
+
+    def cleanup_all(self):
+        """Remove every workspace still alive"""
+        for workspace in self.active():
+            workspace.cleanup()
+
+
+# Process-wide manager; anything left behind is removed when the process exits
+workspaces = WorkspaceManager()
+atexit.register(workspaces.cleanup_all)
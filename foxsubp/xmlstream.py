@@ -0,0 +1,280 @@
+"""Streaming (iterparse based) processing of SubpTool XML files.
+
+Entries are rewritten and serialized one at a time and cleared as soon as
+they are written, so peak memory does not grow with the size of the pack.
+The output is byte-for-byte what ElementTree.write produces for the same
+document, so callers can switch between both implementations freely: namespace
+declarations are written once on the root element, with ElementTree's prefixes.
+"""
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+
+ENTRY_TAG = "Entry"
+XML_DECLARATION = "<?xml version='1.0' encoding='utf-8'?>\n"
+
+
+def _local_name(tag):
+    """Strip the {namespace} prefix from a tag"""
+    return tag.split("}", 1)[1] if "}" in tag else tag
+
+
+def _escape_cdata(text):
+    """Escape element text the same way ElementTree does"""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _escape_attrib(text):
+    """Escape an attribute value the same way ElementTree does"""
+    return (text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace('"', "&quot;").replace("\r", "&#13;").replace("\n", "&#10;")
+            .replace("\t", "&#09;"))
+
+
+def apply_entry_translation(entry, translations_dict, modified_ids=None):
+    """Rewrite Line@Text of one Entry element, returning the number of lines changed"""
+    entry_id = entry.get("Id")
+    if entry_id not in translations_dict:
+        return 0
+
+    translated = translations_dict[entry_id]
+    count = 0
+    lines = entry.find("Lines")
+    if lines is not None:
+        for line in lines.findall("Line"):
+            if line.get("Text") is not None:
+                line.set("Text", translated)
+                count += 1
+                if modified_ids is not None:
+                    modified_ids.append(f"[ID {entry_id}] => {translated}")
+    return count
+
+
+def _registered_prefix(uri):
+    """Prefix ElementTree gives uri (xsi, xml, ...), or None if it would number it"""
+    tag = ET.tostring(ET.Element(f"{{{uri}}}x"), encoding="unicode")
+    prefix = tag[1:tag.index(":")]
+    # register_namespace refuses ns<N>, so ns0 always means "not registered"
+    return None if prefix == "ns0" else prefix
+
+
+def _serialize(write, elem, qualify):
+    """Write elem and its subtree (without its tail) like ElementTree.write would"""
+    write(f"<{elem.tag}")
+    for key, value in elem.items():
+        write(f' {qualify(key)}="{_escape_attrib(value)}"')
+    if elem.text or len(elem):
+        write(">")
+        if elem.text:
+            write(_escape_cdata(elem.text))
+        for child in elem:
+            _serialize(write, child, qualify)
+            if child.tail:
+                write(_escape_cdata(child.tail))
+        write(f"</{elem.tag}>")
+    else:
+        write(" />")
+
+
+class _StreamingMerge:
+    """Single pass iterparse -> rewrite -> write of a SubpTool XML document"""
+
+    def __init__(self, out, translations_dict, modified_ids):
+        self.out = out
+        self.translations = translations_dict
+        self.modified_ids = modified_ids
+        self.count = 0
+        # Containers (SubpFile, Entries, ...) whose start tag has been written
+        # as [element, start_tag_closed]
+        self.stack = []
+        self.entry = None
+        self.entry_depth = 0
+        self.pending_tail = None
+        # uri -> prefix of every namespace used so far, as ElementTree.write
+        # would declare them on the root (xml is used but never declared)
+        self.namespaces = {}
+        self.prefixes = {}
+        self.root_tag = None
+        self.root_attributes = ""
+
+    def qualify(self, key):
+        """prefix:name for a {uri}name attribute, numbering unknown namespaces like ElementTree"""
+        if key[:1] != "{":
+            return key
+        uri, name = key[1:].rsplit("}", 1)
+        prefix = self.prefixes.get(uri)
+        if prefix is None:
+            prefix = _registered_prefix(uri) or f"ns{len(self.namespaces)}"
+            self.prefixes[uri] = prefix
+            if prefix != "xml":
+                self.namespaces[uri] = prefix
+        return f"{prefix}:{name}"
+
+    def namespace_declarations(self):
+        """xmlns attributes for the root start tag, in ElementTree's order"""
+        return "".join(f' xmlns:{prefix}="{_escape_attrib(uri)}"'
+                       for uri, prefix in sorted(self.namespaces.items(), key=lambda item: item[1]))
+
+    def _close_parent_start_tag(self):
+        """Finish the parent's start tag and write its text before its first child"""
+        if self.stack and not self.stack[-1][1]:
+            parent = self.stack[-1][0]
+            self.out.write(">")
+            if parent.text:
+                self.out.write(_escape_cdata(parent.text))
+            self.stack[-1][1] = True
+
+    def _flush_tail(self):
+        """Write the tail of the last finished element, now that it is known"""
+        if self.pending_tail is not None:
+            if self.pending_tail.tail:
+                self.out.write(_escape_cdata(self.pending_tail.tail))
+            self.pending_tail = None
+
+    def _detach(self, elem):
+        """Drop a finished element from its parent so it can be freed"""
+        if self.stack:
+            self.stack[-1][0].remove(elem)
+
+    def start(self, elem):
+        if self.entry is not None:
+            self.entry_depth += 1
+            return
+
+        self._close_parent_start_tag()
+        self._flush_tail()
+        elem.tag = _local_name(elem.tag)
+        if elem.tag == ENTRY_TAG:
+            self.entry = elem
+            self.entry_depth = 0
+            return
+
+        attributes = "".join(f' {self.qualify(key)}="{_escape_attrib(value)}"'
+                             for key, value in elem.items())
+        if not self.stack:
+            # Namespaces are only known at the end; see merge_translation_to_xml_streaming
+            self.root_tag, self.root_attributes = elem.tag, attributes
+        self.out.write(f"<{elem.tag}{attributes}")
+        self.stack.append([elem, False])
+
+    def end(self, elem):
+        if self.entry is not None:
+            if self.entry_depth:
+                self.entry_depth -= 1
+                return
+            self._write_entry(elem)
+            return
+
+        self._flush_tail()
+        _, start_tag_closed = self.stack.pop()
+        if start_tag_closed:
+            self.out.write(f"</{elem.tag}>")
+        elif elem.text:
+            self.out.write(f">{_escape_cdata(elem.text)}</{elem.tag}>")
+        else:
+            self.out.write(" />")
+        self._detach(elem)
+        self.pending_tail = elem
+
+    def _write_entry(self, entry):
+        for elem in entry.iter():
+            elem.tag = _local_name(elem.tag)
+        self.count += apply_entry_translation(entry, self.translations, self.modified_ids)
+
+        # The tail may not be parsed yet; it is written when the next event arrives
+        tail, entry.tail = entry.tail, None
+        _serialize(self.out.write, entry, self.qualify)
+        entry.clear()
+        entry.tail = tail
+        self._detach(entry)
+
+        self.entry = None
+        self.pending_tail = entry
+
+    def run(self, source):
+        self.out.write(XML_DECLARATION)
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                self.start(elem)
+            else:
+                self.end(elem)
+        self._flush_tail()
+
+
+def _declare_namespaces(path, merger):
+    """Rewrite the root start tag of a streamed file with its namespace declarations.
+
+    They are only known once every entry has been written, so the (rare) files
+    that use any are copied once more behind a new root start tag.
+    """
+    head = XML_DECLARATION + f"<{merger.root_tag}{merger.root_attributes}"
+    new_head = (XML_DECLARATION + f"<{merger.root_tag}{merger.namespace_declarations()}"
+                f"{merger.root_attributes}")
+    fd, temp_path = tempfile.mkstemp(suffix=".xml.tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as out, open(path, "rb") as source:
+            out.write(new_head.encode("utf-8", "xmlcharrefreplace"))
+            source.seek(len(head.encode("utf-8", "xmlcharrefreplace")))
+            shutil.copyfileobj(source, out)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def merge_translation_to_xml_streaming(xml_path, translations_dict, output_path=None,
+                                       collect_ids=True):
+    """Merge translations into an XML file in one streaming pass.
+
+    Returns the same (count, output path, modified ids) tuple as
+    merge_translation_to_xml. With collect_ids=False the modified id list is
+    left empty so memory stays flat even when every entry changes.
+    """
+    output_path = output_path or xml_path
+    modified_ids = [] if collect_ids else None
+
+    fd, temp_path = tempfile.mkstemp(suffix=".xml.tmp",
+                                     dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", errors="xmlcharrefreplace") as out:
+            merger = _StreamingMerge(out, translations_dict, modified_ids)
+            with open(xml_path, "rb") as source:
+                merger.run(source)
+        if merger.namespaces:
+            _declare_namespaces(temp_path, merger)
+        # mkstemp creates the file as 0600; keep the permissions of the original
+        shutil.copymode(xml_path, temp_path)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return merger.count, output_path, modified_ids if modified_ids is not None else []
+
+
+def iter_line_texts(xml_path):
+    """Yield (entry id, text) for every non-empty Line@Text, clearing entries as they are read"""
+    stack = []
+    for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        if _local_name(elem.tag) != ENTRY_TAG:
+            continue
+        for child in elem.iter():
+            child.tag = _local_name(child.tag)
+        entry_id = elem.get("Id")
+        lines = elem.find("Lines")
+        if lines is not None:
+            for line in lines.findall("Line"):
+                text = line.get("Text")
+                if text:
+                    yield entry_id, text
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
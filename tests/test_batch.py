@@ -0,0 +1,93 @@
+"""Headless batch runs (foxsubp.batch) on small trees built from the fixtures."""
+import os
+import shutil
+
+from foxsubp import batch, codec
+from tests.test_codec import fixture
+
+TRANSLATION = "Снейк жив"
+
+
+def make_tree(tmp_path, folder="rus"):
+    """data/Assets/subp/<folder>/pack.subp (the rus fixture) and a translation file for its entry"""
+    pack_dir = tmp_path / "data" / "Assets" / "subp" / folder
+    pack_dir.mkdir(parents=True)
+    shutil.copy(fixture("rus.subp"), pack_dir / "pack.subp")
+    translations = tmp_path / "t.txt"
+    translations.write_text(f"[ID 700001] {TRANSLATION}\n", encoding="utf-8")
+    return str(tmp_path / "data"), str(translations), str(tmp_path / "out")
+
+
+def output_path(output_root, folder="rus"):
+    return os.path.join(output_root, "Assets", "subp", folder, "pack.subp")
+
+
+def output_texts(output_root, folder="rus", language="rus"):
+    path = output_path(output_root, folder)
+    subp = codec.read_subp(path, codec.get_encoding(language))
+    return [line.text for line in subp.entries[0].lines]
+
+
+def test_language_change_rebuilds_output(tmp_path):
+    # No language in the path: the first run encodes as UTF-8 (jpn) instead of
+    # iso-8859-5, on an ASCII pack that both can read
+    data, translations, out = make_tree(tmp_path, "misc")
+    pack = codec.read_subp(fixture("rus.subp"), codec.get_encoding("rus"))
+    for line in pack.entries[0].lines:
+        line.text = "Snake"
+    codec.write_subp(pack, output_path(data, "misc"))
+    manifest = os.path.join(out, "manifest.json")
+    first = batch.run_batch(data, translations, out, workers=1, language="jpn",
+                            manifest_path=manifest)
+    assert [r.status for r in first] == ["ok"]
+    assert output_texts(out, "misc") != [TRANSLATION] * 2
+
+    # Regression: the manifest ignored the encoding and reused the wrongly encoded output
+    second = batch.run_batch(data, translations, out, workers=1, language="rus",
+                             manifest_path=manifest)
+    assert [r.status for r in second] == ["ok"]
+    assert output_texts(out, "misc") == [TRANSLATION] * 2
+
+    third = batch.run_batch(data, translations, out, workers=1, language="rus",
+                            manifest_path=manifest)
+    assert [r.status for r in third] == ["reused"]
+
+
+def test_index_does_not_change_output(tmp_path):
+    # Regression: without the scan index the language in the path was ignored
+    data, translations, out = make_tree(tmp_path)
+    batch.run_batch(data, translations, out, workers=1)
+    assert output_texts(out) == [TRANSLATION] * 2
+    with open(output_path(out), "rb") as f:
+        without_index = f.read()
+
+    indexed_out = str(tmp_path / "indexed")
+    batch.run_batch(data, translations, indexed_out, workers=1,
+                    index_path=str(tmp_path / "index.json"))
+    with open(output_path(indexed_out), "rb") as f:
+        assert f.read() == without_index
+
+
+def test_memory_pairs_are_stored_under_the_pack_language(tmp_path):
+    from foxsubp import memory
+
+    data, translations, out = make_tree(tmp_path)
+    memory_path = str(tmp_path / "tm.sqlite")
+    batch.run_batch(data, translations, out, workers=1, memory_path=memory_path)
+    with memory.TranslationMemory(memory_path, "rus") as tm:
+        assert tm.exact(["Привет мир", "Снейк"]) == {"Привет мир": TRANSLATION,
+                                                     "Снейк": TRANSLATION}
+    with memory.TranslationMemory(memory_path, "jpn") as tm:
+        assert len(tm) == 0
+
+
+def test_summary_counts_each_status_once():
+    results = [batch.JobResult(f"{status}.subp", None, status, seconds=1.0)
+               for status in ["ok", "ok", "unchanged", "reused", "skipped", "error"]]
+    summary = batch.summarize(results, 2.0, 1)
+    assert "rebuilt" not in summary
+    assert (summary["ok"], summary["unchanged"], summary["reused"],
+            summary["skipped"], summary["errors"]) == (2, 1, 1, 1, 1)
+    report = batch.format_summary(summary)
+    assert "(ok 2, dilewati 1, error 1)" in report
+    assert "Tidak dibangun    : 2 (tanpa perubahan 1, dipakai ulang 1)" in report
@@ -0,0 +1,165 @@
+"""Round trips of the native SUBP codec against fixture packs.
+
+tests/fixtures holds a small eng pack (multi-line entry, no-line entry,
+empty line, negative Unknown, duplicate ID, XML special characters) and a
+rus pack, each as .subp and as the SubpTool-style .xml.
+"""
+import os
+import shutil
+import struct
+import subprocess
+import sys
+
+import pytest
+
+from foxsubp import codec
+from foxsubp.model import SubpEntry, SubpFile, SubpLine, SubpTiming
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKS = [("eng.subp", "eng.xml", None), ("rus.subp", "rus.xml", "rus")]
+
+
+def fixture(name):
+    return os.path.join(FIXTURES, name)
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("subp_name, xml_name, language", PACKS)
+def test_subp_model_subp_is_byte_identical(subp_name, xml_name, language, tmp_path):
+    encoding = codec.get_encoding(language)
+    subp = codec.read_subp(fixture(subp_name), encoding)
+    output = codec.write_subp(subp, str(tmp_path / "out.subp"), encoding)
+    assert read_bytes(output) == read_bytes(fixture(subp_name))
+    assert codec.verify_roundtrip(fixture(subp_name), encoding)
+
+
+@pytest.mark.parametrize("subp_name, xml_name, language", PACKS)
+def test_subp_to_xml_matches_fixture(subp_name, xml_name, language):
+    subp = codec.read_subp(fixture(subp_name), codec.get_encoding(language))
+    with open(fixture(xml_name), encoding="utf-8-sig") as f:
+        assert codec.subp_to_xml_string(subp) == f.read()
+
+
+@pytest.mark.parametrize("subp_name, xml_name, language", PACKS)
+def test_xml_to_subp_matches_fixture(subp_name, xml_name, language, tmp_path):
+    encoding = codec.get_encoding(language)
+    subp = codec.read_subp_xml(fixture(xml_name))
+    assert subp == codec.read_subp(fixture(subp_name), encoding)
+    output = codec.write_subp(subp, str(tmp_path / "out.subp"), encoding)
+    assert read_bytes(output) == read_bytes(fixture(subp_name))
+
+
+def test_fixture_model_fields():
+    subp = codec.read_subp(fixture("eng.subp"))
+    assert [entry.subtitle_id for entry in subp.entries] == [600831, 600832, 600833, 600834, 600834]
+    first = subp.entries[0]
+    assert (first.priority, first.flags, first.unknown, first.additional_length) == (1, 2, 0, 4)
+    assert first.lines == [SubpLine("Tembakan lengan.", SubpTiming(0, 120)),
+                           SubpLine('Café & <b>"ok"</b>', SubpTiming(130, 300))]
+    assert subp.entries[1].lines == []
+    assert subp.entries[2].unknown == -1
+    assert subp.get(600834).lines[0].text == "First {button} %s"
+
+    rus = codec.read_subp(fixture("rus.subp"), codec.get_encoding("rus"))
+    assert [line.text for line in rus.entries[0].lines] == ["Привет мир", "Снейк"]
+
+
+def test_layout_matches_hand_packed_bytes():
+    text = "Halo$Dunia\0".encode("iso-8859-1")
+    entry = (struct.pack("<HBBhhhh", 0x4C01, 2, 5, len(text), len(text) + 3, 7, 9)
+             + struct.pack("<HHHH", 1, 2, 3, 4) + text)
+    data = struct.pack("<hh", 0x0113, 1) + struct.pack("<II", 42, 12) + entry
+
+    subp = codec.decode_subp(data)
+    assert subp.entries == [SubpEntry(42, 5, 9, 7, 3, [SubpLine("Halo", SubpTiming(1, 2)),
+                                                       SubpLine("Dunia", SubpTiming(3, 4))])]
+    assert codec.encode_subp(subp) == data
+
+
+def test_xml_without_timing_encodes_zero_timing():
+    subp = codec.read_subp_xml(fixture("eng.xml"))
+    subp.entries[0].lines[0].timing = None
+    decoded = codec.decode_subp(codec.encode_subp(subp))
+    assert decoded.entries[0].lines[0].timing == SubpTiming(0, 0)
+
+
+def test_fake_subptool_matches_native_codec(tmp_path):
+    shutil.copy(fixture("rus.subp"), tmp_path / "pack.subp")
+    tool = os.path.join(REPO_ROOT, "tools", "fake_subptool.py")
+    subprocess.run([sys.executable, tool, "-rus", str(tmp_path / "pack.subp")], check=True)
+    assert read_bytes(tmp_path / "pack.xml") == read_bytes(fixture("rus.xml"))
+
+    os.remove(tmp_path / "pack.subp")
+    subprocess.run([sys.executable, tool, "-rus", str(tmp_path / "pack.xml")], check=True)
+    assert read_bytes(tmp_path / "pack.subp") == read_bytes(fixture("rus.subp"))
+
+
+def test_bad_magic_is_a_format_error():
+    data = bytearray(read_bytes(fixture("eng.subp")))
+    data[0] = 0
+    with pytest.raises(codec.SubpFormatError):
+        codec.decode_subp(bytes(data))
+
+
+def test_entry_text_too_long_is_a_format_error():
+    subp = SubpFile([SubpEntry(1, lines=[SubpLine("a" * 0x8000, SubpTiming())])])
+    with pytest.raises(codec.SubpFormatError):
+        codec.encode_subp(subp)
+
+
+def test_text_outside_the_encoding_is_a_format_error():
+    subp = SubpFile([SubpEntry(1, lines=[SubpLine("Снейк", SubpTiming())])])
+    with pytest.raises(codec.SubpFormatError):
+        codec.encode_subp(subp)
+    assert codec.decode_subp(codec.encode_subp(subp, "iso-8859-5"), "iso-8859-5") == subp
+
+
+def test_undecodable_text_is_a_format_error():
+    data = codec.encode_subp(SubpFile([SubpEntry(1, lines=[SubpLine("Café", SubpTiming())])]))
+    with pytest.raises(codec.SubpFormatError):
+        codec.decode_subp(data, codec.get_encoding("jpn"))
+
+
+def test_pack_blobs_from_single_entries_matches_fixture():
+    subp = codec.read_subp(fixture("eng.subp"))
+    blobs = [codec.encode_entry(entry) for entry in subp.entries]
+    assert codec.pack_blobs([entry.subtitle_id for entry in subp.entries], blobs) == \
+        read_bytes(fixture("eng.subp"))
+
+
+def test_truncated_pack_is_a_format_error(tmp_path):
+    # Regression: a failed decode kept slices of the map alive and closing it raised BufferError
+    from foxsubp.cache import DecodeCache
+    from foxsubp.mapped import MappedSubp
+
+    data = read_bytes(fixture("eng.subp"))
+    path = str(tmp_path / "cut.subp")
+    cache = DecodeCache(str(tmp_path / "cache"))
+    for length in range(len(data)):
+        with open(path, "wb") as f:
+            f.write(data[:length])
+        with pytest.raises(codec.SubpFormatError):
+            codec.read_subp(path)
+        with pytest.raises(codec.SubpFormatError):
+            cache.load_subp(path)
+        with pytest.raises(codec.SubpFormatError):
+            with MappedSubp(path) as pack:
+                pack.to_subp_file()
+
+
+def test_mapped_pack_matches_full_decode():
+    from foxsubp.mapped import MappedSubp
+
+    data = read_bytes(fixture("eng.subp"))
+    ids, offsets = codec.read_index(data)
+    assert list(ids) == [600831, 600832, 600833, 600834, 600834]
+    assert codec.decode_entry(data, offsets[0], ids[0]) == codec.decode_subp(data).entries[0]
+    with MappedSubp(fixture("eng.subp")) as pack:
+        assert pack.to_subp_file() == codec.decode_subp(data)
+        assert pack.get("600834").lines[0].text == "First {button} %s"
+        assert b"".join(pack.entry_bytes(i) for i in range(len(pack))) == data[offsets[0]:]
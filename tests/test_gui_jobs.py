@@ -0,0 +1,39 @@
+"""Background jobs of the GUI (Translator.py), run without a window."""
+import shutil
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+import Translator
+from foxsubp import batch, codec, memory
+from foxsubp.tasks import Task
+from tests.test_codec import fixture
+
+
+def test_rus_pack_is_decoded_encoded_and_remembered_as_rus(tmp_path, monkeypatch):
+    # Regression: the GUI used the pack language for the memory only and read and
+    # wrote rus packs as iso-8859-1
+    monkeypatch.setenv(memory.TM_PATH_ENV, str(tmp_path / "tm.sqlite"))
+    (tmp_path / "rus").mkdir()
+    path = str(tmp_path / "rus" / "pack.subp")
+    shutil.copy(fixture("rus.subp"), path)
+    language = batch.resolve_language(path)
+    task = Task("test")
+
+    _, _, workspace, model, extracted_xml, loaded_language = Translator.load_subp_for_editing(
+        task, path, 1, language)
+    try:
+        assert loaded_language == "rus"
+        assert [text for _, text in model.iter_line_texts()] == ["Привет мир", "Снейк"]
+        result = Translator.merge_translations_job(task, "[ID 700001] Снейк жив", {},
+                                                   extracted_xml, path, extracted_xml, model,
+                                                   language=loaded_language)
+    finally:
+        workspace.cleanup()
+
+    assert result["memory_added"] == 2
+    subp = codec.read_subp(path, codec.get_encoding("rus"))
+    assert [line.text for line in subp.entries[0].lines] == ["Снейк жив", "Снейк жив"]
+    with memory.TranslationMemory(language="rus") as tm:
+        assert tm.exact(["Привет мир"]) == {"Привет мир": "Снейк жив"}
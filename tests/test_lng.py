@@ -0,0 +1,44 @@
+"""LNG codec round trips (foxsubp.lng)."""
+import pytest
+
+from foxsubp import lng
+from foxsubp.cityhash import str_code32
+
+
+def sample_lang_file(endianness=lng.LITTLE_ENDIAN):
+    return lng.LangFile([lng.LangEntry(123, "tpp_menu_start", 1, "Mulai"),
+                         lng.LangEntry(456, None, 0, "Tanpa LangId & <xml>"),
+                         lng.LangEntry(789, None, -2, "")], endianness)
+
+
+@pytest.mark.parametrize("endianness", [lng.LITTLE_ENDIAN, lng.BIG_ENDIAN])
+def test_encode_decode_round_trip(endianness):
+    data = lng.encode_lng(sample_lang_file(endianness))
+    decoded = lng.decode_lng(data, {str_code32("tpp_menu_start"): "tpp_menu_start"})
+    assert decoded.endianness == endianness
+    assert [(e.key, e.lang_id, e.color, e.value) for e in decoded.entries] == [
+        (str_code32("tpp_menu_start"), "tpp_menu_start", 1, "Mulai"),
+        (456, None, 0, "Tanpa LangId & <xml>"),
+        (789, None, -2, "")]
+    assert lng.encode_lng(decoded) == data
+
+
+def test_encode_does_not_modify_entries():
+    lang_file = sample_lang_file()
+    lng.encode_lng(lang_file)
+    assert lang_file.entries[0].key == 123
+    assert lang_file == sample_lang_file()
+
+
+def test_xml_round_trip(tmp_path):
+    lang_file = lng.decode_lng(lng.encode_lng(sample_lang_file()))
+    xml_path = lng.write_lng_xml(lang_file, str(tmp_path / "x.lng.xml"))
+    assert lng.read_lng_xml(xml_path) == lang_file
+
+
+def test_bad_xml_number_is_a_format_error(tmp_path):
+    xml_path = tmp_path / "bad.lng.xml"
+    xml_path.write_text('<LangFile Endianess="LittleEndian"><Entries>'
+                        '<Entry Key="x" Color="0" Value="a" /></Entries></LangFile>', encoding="utf-8")
+    with pytest.raises(lng.LangFormatError):
+        lng.read_lng_xml(str(xml_path))
@@ -0,0 +1,58 @@
+"""Translation memory scoping and schema upgrade (foxsubp.memory)."""
+import sqlite3
+
+import pytest
+
+from foxsubp import memory
+
+SOURCE = "Kill the target before extraction."
+
+
+def test_languages_keep_their_own_translations(tmp_path):
+    # Regression: units were keyed by source text only, so a jpn build overwrote the rus one
+    path = str(tmp_path / "tm.sqlite")
+    with memory.TranslationMemory(path, "rus") as tm:
+        tm.add([(SOURCE, "Убей цель до эвакуации.")])
+    with memory.TranslationMemory(path, "jpn") as tm:
+        assert tm.suggest([SOURCE]) == {}
+        tm.add([(SOURCE, "脱出前に標的を倒せ。")])
+        assert tm.exact([SOURCE]) == {SOURCE: "脱出前に標的を倒せ。"}
+
+    with memory.TranslationMemory(path, "rus") as tm:
+        assert len(tm) == 1
+        assert tm.exact([SOURCE]) == {SOURCE: "Убей цель до эвакуации."}
+        fuzzy = tm.suggest(["Kill the target before the extraction."])
+        assert [s.target for s in fuzzy.values()] == ["Убей цель до эвакуации."]
+    with memory.TranslationMemory(path) as tm:
+        assert tm.suggest([SOURCE, "Kill the target before the extraction."]) == {}
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_older_memory_is_upgraded(tmp_path, version):
+    path = str(tmp_path / "tm.sqlite")
+    language = "language TEXT NOT NULL DEFAULT ''," if version == 2 else ""
+    connection = sqlite3.connect(path)
+    connection.executescript(f"""
+        CREATE TABLE units (id INTEGER PRIMARY KEY, {language} source_hash INTEGER NOT NULL,
+            source TEXT NOT NULL, target TEXT NOT NULL, gram_count INTEGER NOT NULL,
+            uses INTEGER NOT NULL, updated REAL NOT NULL);
+        CREATE INDEX units_source_hash ON units (source_hash);
+        CREATE TABLE gram_keys (key INTEGER NOT NULL, unit INTEGER NOT NULL,
+            PRIMARY KEY (key, unit)) WITHOUT ROWID;
+        PRAGMA user_version={version};
+    """)
+    connection.execute("INSERT INTO units (id, source_hash, source, target, gram_count, uses, "
+                       "updated) VALUES (1, ?, ?, 'Bunuh target.', ?, 1, 0)",
+                       (memory.text_hash(SOURCE), SOURCE, len(memory.text_grams(SOURCE))))
+    connection.executemany("INSERT INTO gram_keys VALUES (?, 1)",
+                           [(key,) for key in set(memory.gram_keys(SOURCE))])
+    connection.commit()
+    connection.close()
+
+    with memory.TranslationMemory(path) as tm:
+        assert tm.exact([SOURCE]) == {SOURCE: "Bunuh target."}
+        assert "Kill the target before the extraction." in tm.fuzzy(
+            ["Kill the target before the extraction."])
+    with memory.TranslationMemory(path, "rus") as tm:
+        assert len(tm) == 0
+        assert tm.connection.execute("PRAGMA user_version").fetchone()[0] == memory.SCHEMA_VERSION
@@ -0,0 +1,96 @@
+"""diff -> patch file -> apply round trips (foxsubp.patch)."""
+import struct
+
+import pytest
+
+from foxsubp import codec, patch
+from foxsubp.model import SubpEntry, SubpLine, SubpTiming
+from tests.test_codec import fixture, read_bytes
+
+
+def edited_pack():
+    """The eng fixture with a changed text, a changed timing, an added, a removed and a duplicate entry"""
+    subp = codec.read_subp(fixture("eng.subp"))
+    subp.entries[0].lines[1].text = "Café baru"
+    subp.entries[2].lines[0].timing = SubpTiming(7, 8)
+    subp.entries[4].lines[0].text = "Duplikat kedua"
+    del subp.entries[1]
+    subp.entries.insert(1, SubpEntry(600900, lines=[SubpLine("Baru", SubpTiming(1, 2))]))
+    subp.entries.append(SubpEntry(600900, lines=[SubpLine("Baru lagi", SubpTiming(3, 4))]))
+    return subp
+
+
+def write_unordered(subp, path):
+    """Write subp with its entries stored in reverse index order"""
+    blobs = codec.encode_entries(subp.entries)
+    offset = 4 + 8 * len(blobs)
+    offsets = []
+    for blob in reversed(blobs):
+        offsets.insert(0, offset)
+        offset += len(blob)
+    index = b"".join(struct.pack("<II", entry.subtitle_id, offset)
+                     for entry, offset in zip(subp.entries, offsets))
+    with open(path, "wb") as f:
+        f.write(struct.pack("<hh", codec.FILE_MAGIC, len(blobs)) + index + b"".join(reversed(blobs)))
+
+
+@pytest.mark.parametrize("patch_name", ["x.patch", "x.patch.gz"])
+def test_diff_apply_round_trip_is_byte_identical(tmp_path, patch_name):
+    new_path = codec.write_subp(edited_pack(), str(tmp_path / "new.subp"))
+    changes = patch.diff_files(fixture("eng.subp"), new_path)
+    assert patch.count_changes(changes) == {"changed": 3, "added": 2, "removed": 1}
+
+    patch_path = str(tmp_path / patch_name)
+    patch.write_patch(patch_path, patch.make_patch(changes))
+    _, ops = patch.read_patch(patch_path)
+    output = str(tmp_path / "out.subp")
+    result = patch.apply_patch_to_file(fixture("eng.subp"), ops, output)
+    assert result.ok
+    assert read_bytes(output) == read_bytes(new_path)
+
+    subp = codec.read_subp(fixture("eng.subp"))
+    assert patch.apply_patch(subp, ops).ok
+    assert codec.encode_subp(subp) == read_bytes(new_path)
+
+
+def test_apply_to_unordered_pack(tmp_path):
+    new_path = codec.write_subp(edited_pack(), str(tmp_path / "new.subp"))
+    ops = patch.make_patch(patch.diff_files(fixture("eng.subp"), new_path))
+    source = str(tmp_path / "unordered.subp")
+    write_unordered(codec.read_subp(fixture("eng.subp")), source)
+
+    output = str(tmp_path / "out.subp")
+    assert patch.apply_patch_to_file(source, ops, output).ok
+    assert codec.read_subp(output) == codec.read_subp(new_path)
+
+
+def test_conflict_stops_apply_unless_forced(tmp_path):
+    new_path = codec.write_subp(edited_pack(), str(tmp_path / "new.subp"))
+    ops = patch.make_patch(patch.diff_files(fixture("eng.subp"), new_path))
+    other = codec.read_subp(fixture("eng.subp"))
+    other.entries[0].lines[1].text = "Teks orang lain"
+    source = codec.write_subp(other, str(tmp_path / "other.subp"))
+
+    output = str(tmp_path / "out.subp")
+    with pytest.raises(patch.PatchError):
+        patch.apply_patch_to_file(source, ops, output)
+    result = patch.apply_patch_to_file(source, ops, output, force=True)
+    assert result.conflicts == []
+    assert codec.read_subp(output) == codec.read_subp(new_path)
+
+
+def test_splice_entries_matches_pack_blobs():
+    data = read_bytes(fixture("eng.subp"))
+    replacement = codec.encode_entry(SubpEntry(1, lines=[SubpLine("X", SubpTiming())]))
+    parts = [range(0, 2), (1, replacement), range(3, 5)]
+    subp = codec.decode_subp(data)
+    expected = codec.pack_blobs([600831, 600832, 1, 600834, 600834],
+                                [codec.encode_entry(subp.entries[i]) for i in (0, 1)] + [replacement]
+                                + [codec.encode_entry(subp.entries[i]) for i in (3, 4)])
+    assert codec.splice_entries(data, parts) == expected
+
+    blob = codec.encode_entry(subp.entries[0])
+    rewritten = codec.replace_entry_texts(blob, ["A", "B"])
+    subp.entries[0].lines[0].text, subp.entries[0].lines[1].text = "A", "B"
+    assert rewritten == codec.encode_entry(subp.entries[0])
+    assert codec.entry_line_texts(rewritten) == ["A", "B"]
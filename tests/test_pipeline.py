@@ -0,0 +1,76 @@
+"""Native codec first, SubpTool.exe as the fallback (foxsubp.pipeline)."""
+import shutil
+
+import pytest
+
+from foxsubp import codec, pipeline
+from foxsubp.cache import DecodeCache
+from tests.test_codec import fixture, read_bytes
+
+
+def test_truncated_pack_falls_back_to_subp_tool(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "decode_cache", DecodeCache(str(tmp_path / "cache")))
+    calls = []
+
+    def fake_tool(subp_path, temp_dir=None, language=None):
+        calls.append(subp_path)
+        xml_path = str(tmp_path / "tool.xml")
+        shutil.copy(fixture("eng.xml"), xml_path)
+        return xml_path
+
+    monkeypatch.setattr(pipeline, "extract_subp_to_xml_with_tool", fake_tool)
+    path = str(tmp_path / "cut.subp")
+    with open(fixture("eng.subp"), "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:len(data) // 2])
+
+    subp = pipeline.load_subp_model(path, temp_dir=str(tmp_path))
+    assert calls == [path]
+    assert subp.get(600831).lines[0].text == "Tembakan lengan."
+    assert pipeline.extract_subp_to_xml(path, str(tmp_path)) == str(tmp_path / "tool.xml")
+    assert len(calls) == 2
+
+
+def test_native_codec_needs_no_tool(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "decode_cache", DecodeCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(pipeline, "extract_subp_to_xml_with_tool", None)
+    subp = pipeline.load_subp_model(fixture("eng.subp"))
+    output = str(tmp_path / "out.subp")
+    pipeline.save_subp_model(subp, output)
+    with open(output, "rb") as f, open(fixture("eng.subp"), "rb") as g:
+        assert f.read() == g.read()
+
+
+
+def test_text_the_codec_cannot_encode_falls_back_to_subp_tool(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_tool(xml_path, output_subp_path, language=None):
+        calls.append(codec.read_subp_xml(xml_path).get(600831).lines[0].text)
+        return output_subp_path
+
+    monkeypatch.setattr(pipeline, "convert_xml_to_subp_with_tool", fake_tool)
+    subp = codec.read_subp(fixture("eng.subp"))
+    subp.get(600831).lines[0].text = "Tembakan lengan…"
+    output = str(tmp_path / "out.subp")
+    assert pipeline.save_subp_model(subp, output) == output
+    assert calls == ["Tembakan lengan…"]
+
+@pytest.mark.parametrize("nil_timing", [False, True])
+def test_streaming_merge_matches_tree_merge(tmp_path, nil_timing):
+    xml_path = str(tmp_path / "eng.xml")
+    if nil_timing:
+        subp = codec.read_subp_xml(fixture("eng.xml"))
+        subp.get(600831).lines[0].timing = None
+        codec.write_subp_xml(subp, xml_path)
+    else:
+        shutil.copy(fixture("eng.xml"), xml_path)
+    translations = {"600831": "Tembakan <lengan> & \"kaki\""}
+
+    tree = str(tmp_path / "tree.xml")
+    streamed = str(tmp_path / "streamed.xml")
+    assert pipeline.merge_translation_to_xml(xml_path, translations, False, tree)[0] > 0
+    pipeline.merge_translation_to_xml(xml_path, translations, True, streamed)
+    assert read_bytes(streamed) == read_bytes(tree)
+    assert (b'xmlns:xsi="' in read_bytes(tree)) == nil_timing
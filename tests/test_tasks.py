@@ -0,0 +1,60 @@
+"""Background task runner (foxsubp.tasks)."""
+import threading
+
+from foxsubp.tasks import TaskCancelled, TaskRunner
+
+
+class FlakyFuture:
+    """Future whose done() turns true between the first and the second call"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def done(self):
+        self.calls += 1
+        return self.calls > 1
+
+    def result(self):
+        return "selesai"
+
+
+def test_task_finishing_during_poll_still_calls_back():
+    runner = TaskRunner(workers=1)
+    try:
+        results = []
+        task = runner.submit("tunggu", lambda task: None, on_done=results.append)
+        task.future.result()
+        runner.poll()
+        # Regression: a task seen running by one scan and done by the next was dropped
+        task = runner.submit("flaky", lambda task: None, on_done=results.append)
+        task.future.result()
+        task.future = FlakyFuture()
+        assert runner.poll() == []
+        assert runner.poll() == [task]
+        assert results == [None, "selesai"]
+        assert runner.active == []
+    finally:
+        runner.shutdown(wait=True)
+
+
+def test_cancel_reports_task_cancelled():
+    runner = TaskRunner(workers=1)
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def work(task):
+        started.set()
+        release.wait(5)
+        task.check_cancelled()
+
+    try:
+        task = runner.submit("batal", work, on_error=errors.append)
+        started.wait(5)
+        task.cancel()
+        release.set()
+        task.future.exception(5)
+        assert runner.poll() == [task]
+        assert [type(e) for e in errors] == [TaskCancelled]
+    finally:
+        runner.shutdown(wait=True)
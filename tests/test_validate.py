@@ -0,0 +1,19 @@
+"""Command line checks of a translated pack against its source (foxsubp.validate)."""
+from foxsubp import codec, validate
+from tests.test_codec import fixture
+
+
+def test_unchanged_line_keeps_its_markup_in_the_entry(tmp_path):
+    # Regression: only changed lines were checked, so the markup of an unchanged
+    # line of the same entry was reported as missing
+    subp = codec.read_subp(fixture("eng.subp"))
+    subp.entries[0].lines[0].text = "Tembak lengannya."
+    translated = codec.write_subp(subp, str(tmp_path / "translated.subp"))
+    assert validate.main([fixture("eng.subp"), translated]) == 0
+
+    subp.entries[0].lines[1].text = "Kafe & ok"
+    codec.write_subp(subp, translated)
+    report_path = str(tmp_path / "report.json")
+    assert validate.main([fixture("eng.subp"), translated, "--json", report_path]) == 1
+    with open(report_path, encoding="utf-8") as f:
+        assert "markup_mismatch" in f.read()
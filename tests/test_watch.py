@@ -0,0 +1,33 @@
+"""Watch mode (foxsubp.watch): first build and rebuilds of the same tree."""
+import os
+import time
+
+from foxsubp.watch import Watcher
+from tests.test_batch import TRANSLATION, make_tree, output_texts
+
+
+def wait_for_build(watcher, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not watcher.builds:
+        assert time.monotonic() < deadline, "rebuild did not finish"
+        watcher.step()
+        time.sleep(0.01)
+    return watcher.builds[-1]
+
+
+def test_rebuild_uses_the_language_of_the_first_build(tmp_path):
+    data, translations, out = make_tree(tmp_path)
+    watcher = Watcher(data, translations, out, manifest_path=str(tmp_path / "manifest.json"),
+                      debounce=0)
+    try:
+        assert [r.status for r in watcher.initial_build(workers=1)] == ["ok"]
+        assert output_texts(out) == [TRANSLATION] * 2
+
+        with open(translations, "w", encoding="utf-8") as f:
+            f.write("[ID 700001] Оцелот\n")
+        os.utime(translations, ns=(time.time_ns(), time.time_ns() + 10**9))
+        build = wait_for_build(watcher)
+        assert [r.status for r in build.results] == ["ok"], build.error
+        assert output_texts(out) == ["Оцелот"] * 2
+    finally:
+        watcher.close()
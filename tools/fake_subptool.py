@@ -0,0 +1,47 @@
+"""Stand-in for SubpTool.exe with the same file-in/file-out contract.
+
+    python tools/fake_subptool.py [-lang] file.subp [file2.xml ...]
+
+Unpacks each .subp into <name>.xml and packs each .xml into <name>.subp
+next to the input, using the native codec. Unlike SubpTool.exe it accepts
+several files per run, which exercises batching in foxsubp.toolpool. Set
+FAKE_SUBPTOOL_DELAY (seconds) to simulate runtime start-up cost.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from foxsubp import codec
+
+
+def main(argv):
+    language = None
+    files = []
+    for arg in argv:
+        if arg.startswith("-"):
+            language = arg
+        else:
+            files.append(arg)
+    if not files:
+        print("Usage: fake_subptool.py [-lang] file.subp|file.xml ...")
+        return 0
+
+    time.sleep(float(os.environ.get("FAKE_SUBPTOOL_DELAY", "0")))
+    encoding = codec.get_encoding(language)
+    for path in files:
+        base, ext = os.path.splitext(path)
+        try:
+            if ext.lower() == ".subp":
+                codec.write_subp_xml(codec.read_subp(path, encoding), base + ".xml")
+            elif ext.lower() == ".xml":
+                codec.write_subp(codec.read_subp_xml(path), base + ".subp", encoding)
+        except (OSError, codec.SubpFormatError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))